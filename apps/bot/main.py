@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-import asyncio
+from typing import Any
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.helpers import escape_markdown
@@ -80,9 +80,7 @@ async def do_search(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             logger.error("stats_error", **safe_error(e))
 
     try:
-        result = await asyncio.to_thread(
-            service.search, query, limit=PAGE_SIZE, offset=page * PAGE_SIZE
-        )
+        result = await service.asearch(query, limit=PAGE_SIZE, offset=page * PAGE_SIZE)
         hits = result.get("hits", [])
 
         if not hits:
@@ -94,6 +92,8 @@ async def do_search(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             return
 
         response = format_results(hits)
+        if result.get("stale"):
+            response = "⚠️ 搜索服务暂时不可用，以下为缓存结果\n\n" + response
         keyboard = build_pagination_keyboard(page, len(hits))
 
         if update.callback_query:
@@ -190,6 +190,12 @@ async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text("获取统计信息失败")
 
 
+async def close_connections(app: Application[Any, Any, Any, Any, Any, Any]) -> None:
+    """Close the search service's async connection pool before the loop stops."""
+    if _search_service:
+        await _search_service.aclose()
+
+
 def main() -> None:
     """Run the bot."""
     config = load_config()
@@ -201,7 +207,12 @@ def main() -> None:
     if not config.meilisearch.api_key:
         logger.warning("meili_api_key_missing")
 
-    app = Application.builder().token(config.telegram.bot_token).build()
+    app = (
+        Application.builder()
+        .token(config.telegram.bot_token)
+        .post_shutdown(close_connections)
+        .build()
+    )
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("search", search))
     app.add_handler(CommandHandler("suggest", suggest))
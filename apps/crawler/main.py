@@ -6,17 +6,27 @@ import asyncio
 import argparse
 import signal
 import sys
+from pathlib import Path
 
 from telegram_search.config import load_config
 from telegram_search.logging import setup_logging, get_logger, safe_error
-from telegram_search.indexer.telethon_client import TelethonCrawler
+from telegram_search.indexer.session_pool import SessionPool
 from telegram_search.indexer.realtime_listener import RealtimeListener
 from telegram_search.indexer.historical_sync import HistoricalSync
 from telegram_search.indexer.channel_registry import ChannelRegistry
 from telegram_search.indexer.ingest_service import IngestService, IngestResult
-from telegram_search.indexer.state_store import StateStore
+from telegram_search.indexer.ingest_queue import IngestQueue
+from telegram_search.indexer.state_store import SqliteStateStore
+from telegram_search.indexer.task_tracker import TaskTracker
+from telegram_search.indexer.dedup_store import DedupStore
+from telegram_search.indexer.dead_letter import DeadLetterFile
+from telegram_search.indexer.spool import Spool, SpoolDrainer
+from telegram_search.indexer.sync_pipeline import SyncPipeline
+from telegram_search.models.schema import IndexSchema
+from telegram_search.pipeline import normalizer
 from telegram_search.pipeline.filters import MessageFilter
-from telegram_search.search.meili_client import MeiliClient
+from telegram_search.pipeline.parallel import TransformPool
+from telegram_search.search.meili_client import AsyncMeiliClient, MeiliClient
 
 logger = get_logger(__name__)
 
@@ -26,12 +36,21 @@ class Crawler:
 
     def __init__(self) -> None:
         self.config = load_config()
-        self.client: TelethonCrawler | None = None
+        self.client: SessionPool | None = None
         self.ingest: IngestService | None = None
+        self.ingest_queue: IngestQueue | None = None
         self.registry: ChannelRegistry | None = None
-        self.state_store: StateStore | None = None
+        self.state_store: SqliteStateStore | None = None
+        self.tasks: TaskTracker | None = None
+        self.meili_async: AsyncMeiliClient | None = None
+        self.spool: Spool | None = None
+        self.drainer: SpoolDrainer | None = None
         self._ingest_lock = asyncio.Lock()
         self._shutdown = False
+        self._listener: RealtimeListener | None = None
+        # Cleared while historical sync or the listener is running
+        self._idle = asyncio.Event()
+        self._idle.set()
 
     async def setup(self) -> None:
         """Initialize all components."""
@@ -44,22 +63,119 @@ class Crawler:
             logger.warning("meili_api_key_missing")
 
         # Initialize components
-        self.client = TelethonCrawler(self.config.telegram)
+        normalizer.configure_pinyin(
+            self.config.indexer.pinyin_table_path or None,
+            max_chars=self.config.indexer.pinyin_max_chars,
+            use_mmap=self.config.indexer.pinyin_mmap,
+        )
+        transform_pool = None
+        if self.config.indexer.transform_workers > 0:
+            # Fork workers before any thread (the state store writer,
+            # asyncio.to_thread) is started
+            transform_pool = TransformPool(self.config.indexer.transform_workers)
+            logger.info("transform_pool_started", workers=transform_pool.workers)
+        state_path = Path(self.config.indexer.state_path)
+        self.state_store = SqliteStateStore(
+            state_path,
+            flush_interval=self.config.indexer.state_flush_interval,
+            legacy_path=state_path.with_suffix(".json"),
+        )
+        self.client = SessionPool(self.config.telegram, state_store=self.state_store)
         meili = MeiliClient(self.config.meilisearch)
-        self.ingest = IngestService(meili, MessageFilter())
-        self.registry = ChannelRegistry()
-        self.state_store = StateStore(
-            flush_interval=self.config.indexer.state_flush_interval
+        dedup_store = None
+        if self.config.indexer.dedup_store_path:
+            dedup_store = DedupStore(
+                self.config.indexer.dedup_store_path,
+                capacity=self.config.indexer.dedup_window_size,
+            )
+        if self.config.indexer.spool_dir:
+            self.spool = Spool(
+                self.config.indexer.spool_dir,
+                segment_bytes=self.config.indexer.spool_segment_bytes,
+                fsync_interval=self.config.indexer.spool_fsync_interval,
+            )
+            logger.info(
+                "spool_opened",
+                path=self.config.indexer.spool_dir,
+                pending_bytes=self.spool.pending_bytes(),
+            )
+        self.ingest = IngestService(
+            meili,
+            MessageFilter(),
+            dedup_window_size=self.config.indexer.dedup_window_size,
+            dedup_store=dedup_store,
+            transform_pool=transform_pool,
+            schema=IndexSchema.from_config(self.config.meilisearch),
+            dead_letter=(
+                DeadLetterFile(self.config.indexer.dead_letter_path)
+                if self.config.indexer.dead_letter_path
+                else None
+            ),
+            spool=self.spool,
         )
+        # Task polling runs on the event loop; indexing itself shares the
+        # worker thread with the CPU-bound transform
+        self.meili_async = AsyncMeiliClient(self.config.meilisearch)
+        self.tasks = TaskTracker(
+            self.meili_async,
+            max_in_flight=self.config.indexer.max_inflight_tasks,
+            poll_interval=self.config.indexer.task_poll_interval,
+            resubmit=self.ingest.resubmit_failed,
+        )
+        if self.spool:
+            # Drains the spool (including segments left by a previous run)
+            # at whatever rate Meilisearch accepts, independently of crawling
+            self.drainer = SpoolDrainer(
+                self.spool,
+                self.ingest,
+                TaskTracker(
+                    self.meili_async,
+                    max_in_flight=self.config.indexer.max_inflight_tasks,
+                    poll_interval=self.config.indexer.task_poll_interval,
+                    resubmit=self.ingest.resubmit_failed,
+                ),
+                max_docs=self.config.indexer.spool_drain_batch_size,
+            )
+            self.drainer.start()
+        self.registry = ChannelRegistry()
+        self.client.entities.seed(self.registry.list_channels())
 
         await self.client.connect()
         logger.info("crawler_initialized")
 
-    async def shutdown(self) -> None:
-        """Graceful shutdown."""
+    async def stop(self) -> None:
+        """Ask historical sync and the listener to stop."""
         self._shutdown = True
+        if self._listener:
+            await self._listener.stop()
+
+    async def shutdown(self) -> None:
+        """Graceful shutdown.
+
+        Waits for historical sync and the listener to stop before closing
+        the stores and pools they write to.
+        """
+        await self.stop()
+        await self._idle.wait()
+        if self.ingest_queue:
+            await self.ingest_queue.close()
+        if self.drainer:
+            await self.drainer.stop()
+        if self.spool:
+            logger.info("spool_closed", pending_bytes=self.spool.pending_bytes())
+            self.spool.close()
         if self.state_store:
-            self.state_store.flush()
+            self.state_store.close()
+        if self.ingest:
+            logger.info(
+                "ingest_stats",
+                exact_duplicates=self.ingest.stats.exact_duplicates,
+                near_duplicates=self.ingest.stats.near_duplicates,
+                rejected=self.ingest.stats.rejected,
+            )
+            self.ingest.close()
+        if self.meili_async:
+            await self.meili_async.close()
         if self.client:
             await self.client.disconnect()
         logger.info("crawler_shutdown")
@@ -67,10 +183,9 @@ class Crawler:
     async def on_message(self, msg: dict) -> IngestResult:
         """Handle incoming message."""
         try:
-            if not self.ingest:
-                raise RuntimeError("Ingest service not initialized")
-            async with self._ingest_lock:
-                result = await asyncio.to_thread(self.ingest.ingest_message, msg)
+            if not self.ingest_queue:
+                raise RuntimeError("Ingest queue not initialized")
+            result = await self.ingest_queue.ingest(msg)
             if result == IngestResult.INDEXED:
                 logger.debug("message_indexed", msg_id=msg["msg_id"])
             elif result == IngestResult.SKIPPED:
@@ -80,33 +195,6 @@ class Crawler:
             logger.error("ingest_error", **safe_error(e))
             return IngestResult.ERROR
 
-    async def _ingest_batch(
-        self,
-        channel_id: int,
-        channel_name: str,
-        batch: list[dict],
-        last_msg_id: int | None,
-    ) -> bool:
-        """Ingest a batch and update state. Returns False on fatal error."""
-        if not self.ingest:
-            raise RuntimeError("Ingest service not initialized")
-
-        try:
-            await asyncio.to_thread(
-                self.ingest.ingest_batch, batch, raise_on_error=True
-            )
-        except Exception as e:
-            logger.error(
-                "batch_ingest_error",
-                channel=channel_name,
-                **safe_error(e),
-            )
-            return False
-
-        if self.state_store and last_msg_id is not None:
-            self.state_store.set_state(channel_id, last_msg_id)
-        return True
-
     async def run_realtime(self) -> None:
         """Run real-time listener."""
         if self._shutdown:
@@ -123,8 +211,50 @@ class Crawler:
             return
         logger.info("starting_realtime", channels=len(channel_ids))
 
-        listener = RealtimeListener(self.client, self.on_message)
-        await listener.start(channel_ids)
+        if not self.ingest:
+            raise RuntimeError("Ingest service not initialized")
+        if not self.client or not self.state_store or not self.meili_async:
+            raise RuntimeError("Crawler not initialized")
+        self.ingest_queue = IngestQueue(
+            self.ingest,
+            max_batch_size=self.config.indexer.realtime_batch_size,
+            max_latency=self.config.indexer.realtime_max_latency,
+            max_pending=self.config.indexer.realtime_max_pending,
+            lock=self._ingest_lock,
+            # The listener checkpoints what the queue reports indexed, so
+            # results wait for the spool fsync or the Meilisearch tasks
+            tracker=TaskTracker(
+                self.meili_async,
+                max_in_flight=self.config.indexer.max_inflight_tasks,
+                poll_interval=self.config.indexer.task_poll_interval,
+                resubmit=self.ingest.resubmit_failed,
+            ),
+            spool=self.spool,
+        )
+        self.ingest_queue.start()
+
+        listener = RealtimeListener(
+            self.client,
+            self.on_message,
+            sync=HistoricalSync(
+                self.client,
+                self.state_store,
+                rate_limit_delay=self.config.indexer.rate_limit_delay,
+            ),
+            state_store=self.state_store,
+            catch_up_concurrency=(
+                self.config.indexer.sync_concurrency * len(self.client.sessions)
+            ),
+            check_interval=self.config.indexer.reconnect_check_interval,
+            batch_size=self.config.indexer.realtime_batch_size,
+        )
+        self._listener = listener
+        self._idle.clear()
+        try:
+            await listener.start(channel_ids)
+        finally:
+            self._listener = None
+            self._idle.set()
 
     async def run_historical(self, limit: int = 1000) -> None:
         """Run historical sync for all channels."""
@@ -133,7 +263,7 @@ class Crawler:
             logger.warning("no_channels_configured")
             return
 
-        if not self.client or not self.state_store:
+        if not self.client or not self.state_store or not self.ingest or not self.tasks:
             raise RuntimeError("Crawler not initialized")
 
         sync = HistoricalSync(
@@ -141,67 +271,30 @@ class Crawler:
             self.state_store,
             rate_limit_delay=self.config.indexer.rate_limit_delay,
         )
-
-        batch_size = max(self.config.indexer.batch_size, 1)
-
-        for channel in channels:
-            if self._shutdown:
-                logger.info("crawler_shutdown_requested")
-                break
-            if not channel.enabled:
-                continue
-
-            logger.info("syncing_channel", channel=channel.username)
-
-            def progress(current):
-                logger.info("sync_progress",
-                           channel=channel.username,
-                           current=current, total=limit)
-
-            count = 0
-            batch: list[dict] = []
-            last_msg_id: int | None = None
-            async for msg in sync.sync_channel(
-                channel.channel_id,
-                limit=limit,
-                progress_callback=progress,
-            ):
-                if self._shutdown:
-                    logger.info("crawler_shutdown_requested")
-                    break
-                batch.append(msg)
-                msg_id = msg.get("msg_id")
-                if isinstance(msg_id, int):
-                    last_msg_id = msg_id
-                count += 1
-                if len(batch) >= batch_size:
-                    ok = await self._ingest_batch(
-                        channel.channel_id,
-                        channel.username,
-                        batch,
-                        last_msg_id,
-                    )
-                    batch = []
-                    if not ok:
-                        logger.error("ingest_error_stop", channel=channel.username, msg_id=msg.get("msg_id"))
-                        break
-
-            if not self._shutdown and batch:
-                ok = await self._ingest_batch(
-                    channel.channel_id,
-                    channel.username,
-                    batch,
-                    last_msg_id,
-                )
-                if not ok:
-                    logger.error("ingest_error_stop", channel=channel.username, msg_id=last_msg_id)
-
-            logger.info("channel_synced",
-                       channel=channel.username,
-                       messages=count)
-
-        if self.state_store:
+        pipeline = SyncPipeline(
+            sync,
+            self.ingest,
+            self.tasks,
+            self.state_store,
+            batch_size=self.config.indexer.batch_size,
+            queue_size=self.config.indexer.pipeline_queue_size,
+            transform_concurrency=(
+                self.config.indexer.pipeline_transform_concurrency
+                or max(self.config.indexer.transform_workers, 1)
+            ),
+            # Per session, so throughput scales with the number of accounts
+            fetch_concurrency=(
+                max(self.config.indexer.sync_concurrency, 1) * len(self.client.sessions)
+            ),
+            spool=self.spool,
+            should_stop=lambda: self._shutdown,
+        )
+        self._idle.clear()
+        try:
+            await pipeline.run([c for c in channels if c.enabled], limit=limit)
+        finally:
             self.state_store.flush()
+            self._idle.set()
 
 
 async def main() -> None:
@@ -234,7 +327,7 @@ async def main() -> None:
     for sig in (signal.SIGTERM, signal.SIGINT):
         loop.add_signal_handler(
             sig,
-            lambda: asyncio.create_task(crawler.shutdown())
+            lambda: asyncio.create_task(crawler.stop())
         )
 
     try:
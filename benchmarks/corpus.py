@@ -0,0 +1,58 @@
+"""Synthetic message corpus shared by the benchmarks."""
+
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from typing import Any
+
+_ZH_SIMP = [
+    "今天天气不错，我们去公园散步吧",
+    "重要通知：服务器将于今晚十点进行维护",
+    "这款软件的最新版本修复了多个安全问题",
+    "长江流域的经济发展速度明显加快",
+    "银行行长表示利率将保持稳定",
+    "欢迎关注我们的频道获取最新资讯",
+]
+_ZH_TRAD = [
+    "電腦軟體的發展歷史非常悠久",
+    "台灣的夜市小吃種類繁多",
+    "請大家注意網路安全，不要點擊陌生連結",
+    "這個問題已經在最新版本中解決",
+]
+_OTHER = [
+    "Breaking: markets rally as inflation cools",
+    "New release v2.3.1 is out, see the changelog",
+    "Привет всем, новый пост уже на канале",
+    "https://example.com/article/12345",
+    "Join our giveaway and win a free subscription",
+]
+
+
+def make_messages(count: int, seed: int = 0, repeat_ratio: float = 0.1) -> list[dict[str, Any]]:
+    """Generate raw message dictionaries shaped like crawler output.
+
+    Args:
+        count: Number of messages.
+        seed: Random seed.
+        repeat_ratio: Fraction of messages that repeat an earlier text verbatim.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    messages: list[dict[str, Any]] = []
+    for i in range(count):
+        if messages and rng.random() < repeat_ratio:
+            text = rng.choice(messages)["text"]
+        else:
+            pool = rng.choice([_ZH_SIMP, _ZH_SIMP, _ZH_TRAD, _OTHER])
+            parts = rng.sample(pool, k=min(len(pool), rng.randint(1, 3)))
+            text = "。".join(parts) + f" #{rng.randint(0, 10**6)}"
+        messages.append(
+            {
+                "chat_id": -1001000000000 - rng.randint(0, 50),
+                "msg_id": i + 1,
+                "text": text,
+                "date": start + timedelta(seconds=i),
+            }
+        )
+    return messages
@@ -0,0 +1,89 @@
+"""Benchmark SimhashIndex against linear dedup window scans.
+
+Usage:
+    python -m benchmarks.dedup_index
+    python -m benchmarks.dedup_index --sizes 1000 100000 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from collections import deque
+
+from telegram_search.pipeline import deduper
+from telegram_search.pipeline.simhash_index import SimhashIndex
+
+
+def _linear_scan(window: deque[str], query: str, threshold: int) -> bool:
+    """Previous IngestService._is_duplicate implementation."""
+    for seen_hash in window:
+        if deduper.is_duplicate(query, seen_hash, threshold):
+            return True
+    return False
+
+
+def _time_per_query(func, queries: list) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def run(size: int, queries: int, threshold: int, seed: int) -> None:
+    rng = random.Random(seed)
+    fingerprints = [rng.getrandbits(64) for _ in range(size)]
+
+    # Half near-duplicates of indexed entries, half random misses
+    sample = [
+        fp ^ (1 << rng.randrange(64))
+        for fp in rng.sample(fingerprints, min(queries // 2, size))
+    ]
+    sample += [rng.getrandbits(64) for _ in range(queries - len(sample))]
+
+    window: deque[str] = deque(maxlen=size)
+    start = time.perf_counter()
+    for fp in fingerprints:
+        window.append(hex(fp))
+    scan_build = time.perf_counter() - start
+
+    index = SimhashIndex(max_size=size, threshold=threshold)
+    start = time.perf_counter()
+    for fp in fingerprints:
+        index.add(fp)
+    index_build = time.perf_counter() - start
+
+    # The linear scan is O(window); cap its query count at large sizes
+    scan_queries = [hex(q) for q in sample[: max(3, min(queries, 2_000_000 // size))]]
+    scan_time = _time_per_query(lambda q: _linear_scan(window, q, threshold), scan_queries)
+    index_time = _time_per_query(index.contains_near, sample)
+    vector_time = _time_per_query(
+        lambda q: bool((index.distances(q) <= threshold).any()),
+        sample[: max(10, min(queries, 200_000_000 // size))],
+    )
+
+    print(
+        f"{size:>10,} | "
+        f"build scan {scan_build:7.2f}s  index {index_build:7.2f}s | "
+        f"query scan {scan_time * 1e6:12.1f}us  vectorized {vector_time * 1e6:9.1f}us  "
+        f"index {index_time * 1e6:8.1f}us | "
+        f"speedup {scan_time / index_time:10.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--threshold", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"threshold={args.threshold} queries={args.queries}")
+    for size in args.sizes:
+        run(size, args.queries, args.threshold, args.seed)
+
+
+if __name__ == "__main__":
+    main()
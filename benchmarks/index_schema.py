@@ -0,0 +1,119 @@
+"""Report index size and indexing time of the full vs lean document schema.
+
+Without ``--host`` only the documents are measured (JSON payload and bytes of
+searchable text, which is what the inverted index grows with). With a
+Meilisearch host, the corpus is indexed into two scratch indexes and their
+on-disk size and indexing time are compared.
+
+Usage:
+    python -m benchmarks.index_schema
+    python -m benchmarks.index_schema --size 50000 --host http://localhost:7700 --api-key KEY
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any
+
+from benchmarks.corpus import make_messages
+from telegram_search.models.schema import VARIANT_FIELDS, IndexSchema
+from telegram_search.pipeline import transformer
+
+
+def _searchable_bytes(docs: list[dict[str, Any]], schema: IndexSchema) -> int:
+    fields = schema.searchable_attributes()
+    return sum(len(str(doc.get(f) or "").encode("utf-8")) for doc in docs for f in fields)
+
+
+def _payload_bytes(docs: list[dict[str, Any]]) -> int:
+    return sum(len(json.dumps(doc, ensure_ascii=False).encode("utf-8")) for doc in docs)
+
+
+def _index(client, uid: str, docs: list[dict], settings: dict, batch_size: int) -> dict[str, Any]:
+    """Index ``docs`` into a fresh index and return its size and indexing time."""
+    client.wait_for_task(client.create_index(uid, {"primaryKey": "id"}).task_uid)
+    index = client.index(uid)
+    client.wait_for_task(index.update_settings(settings).task_uid, timeout_in_ms=60_000)
+
+    start = time.perf_counter()
+    tasks = [
+        index.add_documents(docs[i : i + batch_size]).task_uid
+        for i in range(0, len(docs), batch_size)
+    ]
+    for task_uid in tasks:
+        client.wait_for_task(task_uid, timeout_in_ms=600_000, interval_in_ms=200)
+    elapsed = time.perf_counter() - start
+
+    stats = client.get_all_stats()["indexes"][uid]
+    return {"seconds": elapsed, "raw_document_bytes": stats.get("rawDocumentDbSize")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--repeat-ratio", type=float, default=0.1)
+    parser.add_argument("--stored", nargs="*", default=list(VARIANT_FIELDS))
+    parser.add_argument("--searchable", nargs="*", default=list(VARIANT_FIELDS))
+    parser.add_argument("--settings", default="configs/meilisearch.json")
+    parser.add_argument("--host", help="Meilisearch host to index into")
+    parser.add_argument("--api-key", default="")
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    args = parser.parse_args()
+
+    docs = list(
+        transformer.transform_messages(make_messages(args.size, repeat_ratio=args.repeat_ratio))
+    )
+    schemas = {
+        "full": IndexSchema(),
+        "lean": IndexSchema("lean", args.stored, args.searchable),
+    }
+    shaped = {name: [schema.shape(doc) for doc in docs] for name, schema in schemas.items()}
+
+    print(f"{len(docs):,} documents, stored={args.stored}, searchable={args.searchable}")
+    for field in VARIANT_FIELDS:
+        kept = sum(field in doc for doc in shaped["lean"])
+        print(f"  {field:<6} kept in {kept / len(docs):6.1%} of lean documents")
+
+    full_payload = _payload_bytes(shaped["full"])
+    full_text = _searchable_bytes(shaped["full"], schemas["full"])
+    for name, schema in schemas.items():
+        payload = _payload_bytes(shaped[name])
+        text = _searchable_bytes(shaped[name], schema)
+        print(
+            f"{name:<5} | payload {payload / 2**20:8.2f} MB ({payload / full_payload:6.1%}) | "
+            f"searchable text {text / 2**20:8.2f} MB ({text / full_text:6.1%})"
+        )
+
+    if not args.host:
+        return
+
+    import meilisearch
+
+    with open(args.settings, encoding="utf-8") as f:
+        base_settings = json.load(f)
+    client = meilisearch.Client(args.host, args.api_key)
+    results = {}
+    for name, schema in schemas.items():
+        uid = f"schema_bench_{name}_{int(time.time())}"
+        try:
+            results[name] = _index(
+                client, uid, shaped[name], schema.index_settings(base_settings), args.batch_size
+            )
+        finally:
+            client.delete_index(uid)
+
+    full = results["full"]
+    for name, result in results.items():
+        seconds = result["seconds"]
+        line = f"{name:<5} | indexing {seconds:8.2f} s ({seconds / full['seconds']:6.1%})"
+        size = result["raw_document_bytes"]
+        if size and full["raw_document_bytes"]:
+            ratio = size / full["raw_document_bytes"]
+            line += f" | documents on disk {size / 2**20:8.2f} MB ({ratio:6.1%})"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
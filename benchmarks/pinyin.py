@@ -0,0 +1,61 @@
+"""Benchmark pypinyin's lazy_pinyin against the table-driven PinyinEngine.
+
+Usage:
+    python -m benchmarks.pinyin
+    python -m benchmarks.pinyin --size 50000 --max-chars 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.corpus import make_messages
+from telegram_search.pipeline.pinyin import PinyinEngine
+
+
+def _latency(convert, texts: list[str], rounds: int) -> float:
+    """Best per-text latency in microseconds."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for text in texts:
+            convert(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--repeat-ratio", type=float, default=0.1)
+    parser.add_argument("--max-chars", type=int, default=0)
+    args = parser.parse_args()
+
+    texts = [m["text"] for m in make_messages(args.size, repeat_ratio=args.repeat_ratio)]
+    print(f"{len(texts):,} texts, repeat_ratio={args.repeat_ratio}, max_chars={args.max_chars}")
+
+    from pypinyin import lazy_pinyin
+
+    before = _latency(lambda t: " ".join(lazy_pinyin(t)), texts, args.rounds)
+    print(f"lazy_pinyin      {before:8.1f} us/msg")
+
+    for use_mmap in (True, False):
+        start = time.perf_counter()
+        engine = PinyinEngine.from_file(use_mmap=use_mmap, max_chars=args.max_chars)
+        load = (time.perf_counter() - start) * 1000
+        uncached = PinyinEngine.from_file(
+            use_mmap=use_mmap, max_chars=args.max_chars, cache_size=0
+        )
+        label = "engine (mmap)" if use_mmap else "engine (dict)"
+        cold = _latency(uncached.convert, texts, args.rounds)
+        warm = _latency(engine.convert, texts, args.rounds)
+        print(
+            f"{label:<16} {cold:8.1f} us/msg ({before / cold:5.1f}x) | "
+            f"with cache {warm:6.1f} us/msg ({before / warm:5.1f}x) | load {load:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
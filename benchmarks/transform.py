@@ -0,0 +1,67 @@
+"""Benchmark per-message transform against the batch transform API.
+
+Usage:
+    python -m benchmarks.transform
+    python -m benchmarks.transform --sizes 100 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.corpus import make_messages
+from telegram_search.pipeline import transformer
+from telegram_search.pipeline.parallel import TransformPool
+
+
+def _per_message(messages: list[dict]) -> list[dict]:
+    return [transformer.transform_message(**m).to_index_dict() for m in messages]
+
+
+def _batch(messages: list[dict]) -> list[dict]:
+    return list(transformer.transform_messages(messages))
+
+
+def _rate(func, messages: list[dict], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(messages)
+        best = min(best, time.perf_counter() - start)
+    return len(messages) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--repeat-ratio", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=0, help="Also time a TransformPool")
+    args = parser.parse_args()
+
+    pool = TransformPool(args.workers) if args.workers > 0 else None
+
+    # Warm converters and dictionaries outside the timed region
+    _batch(make_messages(10))
+
+    print(f"repeat_ratio={args.repeat_ratio}")
+    for size in args.sizes:
+        messages = make_messages(size, repeat_ratio=args.repeat_ratio)
+        before = _rate(_per_message, messages, args.rounds)
+        after = _rate(_batch, messages, args.rounds)
+        line = (
+            f"{size:>7,} msgs | per-message {before:9.0f} msg/s | "
+            f"batch {after:9.0f} msg/s | {after / before:5.2f}x"
+        )
+        if pool is not None:
+            pooled = _rate(lambda m: list(pool.transform_messages(m)), messages, args.rounds)
+            line += f" | {args.workers} workers {pooled:9.0f} msg/s | {pooled / before:5.2f}x"
+        print(line)
+
+    if pool is not None:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Compare JSON-array and streaming NDJSON (gzip/deflate) document uploads.
+
+Each mode runs in a fresh subprocess so its peak RSS can be reported. The
+JSON mode mirrors the current path: the batch is materialized as a list and
+serialized to one string, which the HTTP client encodes again. The NDJSON
+modes serialize a document generator incrementally. Without ``--host`` only
+encoding is measured; with a Meilisearch host each body is also uploaded and
+timed until its task has succeeded.
+
+Usage:
+    python -m benchmarks.upload_payload
+    python -m benchmarks.upload_payload --size 200000 --host http://localhost:7700 --api-key KEY
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Iterator
+
+from benchmarks.corpus import make_messages
+from telegram_search.models.schema import IndexSchema
+from telegram_search.pipeline import transformer
+from telegram_search.search.payload import encode_documents
+
+MODES = ("json", "ndjson", "ndjson+gzip", "ndjson+deflate")
+
+
+def _docs(size: int, distinct: int = 2_000) -> Iterator[dict[str, Any]]:
+    """Yield ``size`` index documents built from a small transformed corpus."""
+    schema = IndexSchema()
+    base = [
+        schema.shape(doc)
+        for doc in transformer.transform_messages(make_messages(min(size, distinct)))
+    ]
+    for i, doc in zip(range(size), itertools.cycle(base)):
+        yield {**doc, "id": f"bench_{i}"}
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _upload(host: str, api_key: str, body: bytes, headers: dict[str, str]) -> float:
+    """Upload a body into a scratch index; seconds until its task succeeded."""
+    import meilisearch
+    import requests
+
+    client = meilisearch.Client(host, api_key)
+    uid = f"upload_bench_{int(time.time() * 1000)}"
+    client.wait_for_task(client.create_index(uid, {"primaryKey": "id"}).task_uid)
+    try:
+        if api_key:
+            headers = {**headers, "Authorization": f"Bearer {api_key}"}
+        start = time.perf_counter()
+        resp = requests.post(f"{host}/indexes/{uid}/documents", data=body, headers=headers)
+        resp.raise_for_status()
+        client.wait_for_task(resp.json()["taskUid"], timeout_in_ms=600_000, interval_in_ms=100)
+        return time.perf_counter() - start
+    finally:
+        client.delete_index(uid)
+
+
+def run_mode(mode: str, size: int, host: str | None, api_key: str) -> dict[str, Any]:
+    docs = _docs(size)
+    first = next(docs)  # warm up the transform corpus before measuring
+    docs = itertools.chain([first], docs)
+    baseline = _peak_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "json":
+        batch = list(docs)
+        body = json.dumps(batch).encode("utf-8")
+        raw = len(body)
+        headers = {"Content-Type": "application/json"}
+    else:
+        encoding = mode.partition("+")[2]
+        body, _ = encode_documents(docs, encoding)
+        raw = None
+        headers = {"Content-Type": "application/x-ndjson"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "mode": mode,
+        "seconds": elapsed,
+        "body_bytes": len(body),
+        "raw_bytes": raw,
+        "peak_rss_mb": _peak_rss_mb() - baseline,
+    }
+    if host:
+        result["upload_seconds"] = _upload(host, api_key, body, headers)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--host", help="Meilisearch host to upload into")
+    parser.add_argument("--api-key", default="")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.size, args.host, args.api_key)))
+        return
+
+    results = []
+    for mode in MODES:
+        cmd = [sys.executable, "-m", "benchmarks.upload_payload", "--mode", mode,
+               "--size", str(args.size), "--api-key", args.api_key]
+        if args.host:
+            cmd += ["--host", args.host]
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    # Throughput is measured against the uncompressed NDJSON size
+    raw_mb = next(r for r in results if r["mode"] == "ndjson")["body_bytes"] / 2**20
+    print(f"{args.size:,} documents, {raw_mb:.1f} MB of NDJSON")
+    for r in results:
+        line = (
+            f"{r['mode']:<15} | encode {raw_mb / r['seconds']:7.1f} MB/s | "
+            f"body {r['body_bytes'] / 2**20:7.2f} MB | peak RSS +{r['peak_rss_mb']:7.1f} MB"
+        )
+        if "upload_seconds" in r:
+            line += f" | upload+index {r['upload_seconds']:7.2f} s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark Traditional/Simplified conversion throughput per MB of text.
+
+Usage:
+    python -m benchmarks.zhconv
+    python -m benchmarks.zhconv --megabytes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from opencc import OpenCC
+
+from benchmarks.corpus import make_messages
+from telegram_search.pipeline.zhconv import ChineseConverter
+
+
+def _corpus(megabytes: float, repeat_ratio: float) -> list[str]:
+    target = int(megabytes * 1024 * 1024)
+    texts: list[str] = []
+    size = 0
+    seed = 0
+    while size < target:
+        for msg in make_messages(1_000, seed=seed, repeat_ratio=repeat_ratio):
+            texts.append(msg["text"])
+            size += len(msg["text"].encode("utf-8"))
+        seed += 1
+    return texts
+
+
+def _throughput(convert, texts: list[str], megabytes: float, rounds: int, reset=None) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        for text in texts:
+            convert(text)
+        best = min(best, time.perf_counter() - start)
+    return megabytes / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=1.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--repeat-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    texts = _corpus(args.megabytes, args.repeat_ratio)
+    megabytes = sum(len(t.encode("utf-8")) for t in texts) / (1024 * 1024)
+    print(f"{len(texts):,} texts, {megabytes:.2f} MB, repeat_ratio={args.repeat_ratio}")
+
+    for conversion in ("s2t", "t2s"):
+        reference = OpenCC(conversion)
+        start = time.perf_counter()
+        converter = ChineseConverter.from_opencc(conversion)
+        build = time.perf_counter() - start
+
+        before = _throughput(reference.convert, texts, megabytes, args.rounds)
+        cold = _throughput(
+            converter.convert, texts, megabytes, args.rounds, reset=converter.cache_clear
+        )
+        warm = _throughput(converter.convert, texts, megabytes, args.rounds)
+        print(
+            f"{conversion} | opencc {before:7.2f} MB/s | table {cold:7.2f} MB/s "
+            f"({cold / before:5.1f}x) | table, warm cache {warm:7.2f} MB/s "
+            f"({warm / before:5.1f}x) | build {build * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
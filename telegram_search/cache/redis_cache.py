@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import hashlib
 import json
-from typing import Any, Callable
+from collections.abc import Callable
+from typing import Any
 
 import redis
 from redis.backoff import ExponentialBackoff
@@ -37,6 +38,7 @@ class RedisCache:
             retry_on_error=[ConnectionError, TimeoutError],
         )
         self._ttl = config.cache_ttl
+        self._stale_ttl = config.stale_ttl
 
     @staticmethod
     def _make_key(query: str, **kwargs: Any) -> str:
@@ -65,15 +67,38 @@ class RedisCache:
         result: dict,
         **kwargs: Any,
     ) -> None:
-        """Cache search result."""
+        """Cache search result.
+
+        A second copy is kept for ``stale_ttl`` seconds so :meth:`get_stale`
+        can still answer after the fresh entry has expired.
+        """
         try:
             key = self._make_key(query, **kwargs)
-            self._client.setex(key, self._ttl, json.dumps(result))
+            data = json.dumps(result)
+            self._client.setex(key, self._ttl, data)
+            if self._stale_ttl > 0:
+                self._client.set(f"stale:{key}", data, ex=self._stale_ttl)
         except RedisError as e:
             logger.warning("redis_set_failed", **safe_error(e))
         except Exception as e:
             logger.error("redis_set_unexpected_error", **safe_error(e))
 
+    def get_stale(self, query: str, **kwargs: Any) -> dict[str, Any] | None:
+        """Get the last cached result even if its fresh entry has expired.
+
+        Meant as a fallback while the search backend is unavailable.
+        """
+        try:
+            data = self._client.get(f"stale:{self._make_key(query, **kwargs)}")
+            if data:
+                result: dict[str, Any] = json.loads(data)
+                return result
+        except RedisError as e:
+            logger.warning("redis_get_failed", **safe_error(e))
+        except Exception as e:
+            logger.error("redis_get_unexpected_error", **safe_error(e))
+        return None
+
     def get_or_compute(
         self,
         query: str,
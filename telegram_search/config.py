@@ -18,6 +18,15 @@ class TelegramConfig(BaseSettings):
     bot_token: str = Field(default="", alias="TELEGRAM_BOT_TOKEN")
     api_id: int = Field(default=0, alias="TELEGRAM_API_ID")
     api_hash: str = Field(default="", alias="TELEGRAM_API_HASH")
+    request_rate: float = Field(default=2.0, alias="TELEGRAM_REQUEST_RATE")
+    request_burst: int = Field(default=5, alias="TELEGRAM_REQUEST_BURST")
+    min_request_rate: float = Field(default=0.1, alias="TELEGRAM_MIN_REQUEST_RATE")
+    max_request_rate: float = Field(default=20.0, alias="TELEGRAM_MAX_REQUEST_RATE")
+    rate_increase: float = Field(default=0.05, alias="TELEGRAM_RATE_INCREASE")
+    rate_decrease: float = Field(default=0.5, alias="TELEGRAM_RATE_DECREASE")
+    page_size: int = Field(default=100, alias="TELEGRAM_PAGE_SIZE")
+    entity_ttl: float = Field(default=86400.0, alias="TELEGRAM_ENTITY_TTL")
+    sessions: list[str] = Field(default_factory=lambda: ["session"], alias="TELEGRAM_SESSIONS")
 
 
 class MeilisearchConfig(BaseSettings):
@@ -30,6 +39,22 @@ class MeilisearchConfig(BaseSettings):
     index_name: str = Field(default="telegram_messages", alias="MEILI_INDEX")
     timeout: int = Field(default=5, alias="MEILI_TIMEOUT")
     max_retries: int = Field(default=3, alias="MEILI_MAX_RETRIES")
+    pool_size: int = Field(default=100, alias="MEILI_POOL_SIZE")
+    keepalive_timeout: float = Field(default=30.0, alias="MEILI_KEEPALIVE_TIMEOUT")
+    upload_format: str = Field(default="json", alias="MEILI_UPLOAD_FORMAT")
+    upload_compression: str = Field(default="", alias="MEILI_UPLOAD_COMPRESSION")
+    breaker_failure_rate: float = Field(default=0.5, alias="MEILI_BREAKER_FAILURE_RATE")
+    breaker_window: int = Field(default=20, alias="MEILI_BREAKER_WINDOW")
+    breaker_min_calls: int = Field(default=10, alias="MEILI_BREAKER_MIN_CALLS")
+    breaker_slow_call: float = Field(default=2.0, alias="MEILI_BREAKER_SLOW_CALL")
+    breaker_open_timeout: float = Field(default=30.0, alias="MEILI_BREAKER_OPEN_TIMEOUT")
+    schema_mode: str = Field(default="full", alias="MEILI_SCHEMA_MODE")
+    stored_variants: list[str] = Field(
+        default_factory=lambda: ["pinyin", "trad", "simp"], alias="MEILI_STORED_VARIANTS"
+    )
+    searchable_variants: list[str] = Field(
+        default_factory=lambda: ["pinyin", "trad", "simp"], alias="MEILI_SEARCHABLE_VARIANTS"
+    )
 
 
 class RedisConfig(BaseSettings):
@@ -41,6 +66,7 @@ class RedisConfig(BaseSettings):
     port: int = Field(default=6379, alias="REDIS_PORT")
     db: int = Field(default=0, alias="REDIS_DB")
     cache_ttl: int = Field(default=3600, alias="REDIS_CACHE_TTL")
+    stale_ttl: int = Field(default=86400, alias="REDIS_STALE_TTL")
     socket_timeout: int = Field(default=5, alias="REDIS_SOCKET_TIMEOUT")
     socket_connect_timeout: int = Field(default=5, alias="REDIS_CONNECT_TIMEOUT")
     max_retries: int = Field(default=3, alias="REDIS_MAX_RETRIES")
@@ -61,8 +87,31 @@ class IndexerConfig(BaseSettings):
     model_config = SettingsConfigDict(extra="ignore", populate_by_name=True)
 
     batch_size: int = Field(default=100)
-    rate_limit_delay: float = Field(default=1.0)
+    rate_limit_delay: float = Field(default=0.0)
+    sync_concurrency: int = Field(default=4, alias="SYNC_CONCURRENCY")
+    state_path: str = Field(default="state.db", alias="STATE_PATH")
     state_flush_interval: float = Field(default=1.0, alias="STATE_FLUSH_INTERVAL")
+    dedup_window_size: int = Field(default=1000, alias="DEDUP_WINDOW_SIZE")
+    dedup_store_path: str = Field(default="", alias="DEDUP_STORE_PATH")
+    transform_workers: int = Field(default=0, alias="TRANSFORM_WORKERS")
+    realtime_batch_size: int = Field(default=100, alias="REALTIME_BATCH_SIZE")
+    realtime_max_latency: float = Field(default=0.2, alias="REALTIME_MAX_LATENCY")
+    realtime_max_pending: int = Field(default=10000, alias="REALTIME_MAX_PENDING")
+    reconnect_check_interval: float = Field(default=5.0, alias="RECONNECT_CHECK_INTERVAL")
+    max_inflight_tasks: int = Field(default=4, alias="MAX_INFLIGHT_TASKS")
+    task_poll_interval: float = Field(default=0.1, alias="TASK_POLL_INTERVAL")
+    dead_letter_path: str = Field(default="", alias="DEAD_LETTER_PATH")
+    pipeline_queue_size: int = Field(default=4, alias="PIPELINE_QUEUE_SIZE")
+    pipeline_transform_concurrency: int = Field(
+        default=0, alias="PIPELINE_TRANSFORM_CONCURRENCY"
+    )
+    spool_dir: str = Field(default="", alias="SPOOL_DIR")
+    spool_segment_bytes: int = Field(default=64 * 2**20, alias="SPOOL_SEGMENT_BYTES")
+    spool_fsync_interval: float = Field(default=0.2, alias="SPOOL_FSYNC_INTERVAL")
+    spool_drain_batch_size: int = Field(default=1000, alias="SPOOL_DRAIN_BATCH_SIZE")
+    pinyin_table_path: str = Field(default="", alias="PINYIN_TABLE_PATH")
+    pinyin_max_chars: int = Field(default=0, alias="PINYIN_MAX_CHARS")
+    pinyin_mmap: bool = Field(default=True, alias="PINYIN_MMAP")
 
 
 class AppConfig(BaseSettings):
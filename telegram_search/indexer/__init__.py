@@ -1,22 +1,51 @@
 """Indexer module."""
 
 from .telethon_client import TelethonCrawler
+from .session_pool import HashRing, SessionPool
+from .rate_limiter import AdaptiveRateLimiter, TokenBucket
 from .importer import import_file, import_json, import_csv
 from .realtime_listener import RealtimeListener
 from .historical_sync import HistoricalSync
 from .channel_registry import ChannelRegistry
-from .state_store import StateStore
-from .ingest_service import IngestService, IngestResult
+from .entity_cache import ChatInfo, EntityCache
+from .state_store import SqliteStateStore, StateStore
+from .id_ranges import IdRangeSet
+from .dedup_store import DedupStore
+from .dead_letter import DeadLetterFile
+from .spool import Spool, SpoolDrainer
+from .ingest_service import IngestService, IngestResult, IngestStats, PreparedBatch
+from .ingest_queue import IngestQueue
+from .task_tracker import IndexTask, TaskTracker, TaskFailedError
+from .sync_pipeline import SyncPipeline
 
 __all__ = [
     "TelethonCrawler",
+    "HashRing",
+    "SessionPool",
+    "TokenBucket",
+    "AdaptiveRateLimiter",
     "import_file",
     "import_json",
     "import_csv",
     "RealtimeListener",
     "HistoricalSync",
     "ChannelRegistry",
+    "ChatInfo",
+    "EntityCache",
     "StateStore",
+    "SqliteStateStore",
+    "IdRangeSet",
+    "DedupStore",
+    "DeadLetterFile",
+    "Spool",
+    "SpoolDrainer",
     "IngestService",
     "IngestResult",
+    "IngestStats",
+    "PreparedBatch",
+    "IngestQueue",
+    "IndexTask",
+    "TaskTracker",
+    "TaskFailedError",
+    "SyncPipeline",
 ]
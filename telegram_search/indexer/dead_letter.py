@@ -0,0 +1,63 @@
+"""Append-only file of documents Meilisearch refused to index."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from telegram_search.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class DeadLetterFile:
+    """JSON Lines file collecting rejected documents for later inspection.
+
+    Each line holds the rejected document together with the error Meilisearch
+    returned and when it happened, so a bad message can be fixed and
+    re-imported without replaying the batch it came in.
+    """
+
+    def __init__(self, file_path: str | Path) -> None:
+        """Initialize dead-letter file.
+
+        Args:
+            file_path: Path of the JSON Lines file; created on first write.
+        """
+        self.file_path = Path(file_path)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, doc: dict[str, Any], error: Any) -> None:
+        """Append a rejected document.
+
+        Args:
+            doc: Document as it was sent to the index.
+            error: Error reported for it (exception or Meilisearch error object).
+        """
+        record = {
+            "time": time.time(),
+            "error": error if isinstance(error, (dict, str)) or error is None else repr(error),
+            "doc": doc,
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self.file_path.parent != Path("."):
+                self.file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self.count += 1
+        logger.error("document_dead_lettered", doc_id=doc.get("id"), path=str(self.file_path))
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the records written so far."""
+        if not self.file_path.exists():
+            return
+        with open(self.file_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -0,0 +1,219 @@
+"""Memory-mapped persistence for the dedup fingerprint window."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from telegram_search.logging import get_logger, safe_error
+
+logger = get_logger(__name__)
+
+_MAGIC = b"TSDW"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIQ")  # magic, version, record count
+_HEADER_SIZE = 64
+
+RECORD_DTYPE = np.dtype(
+    [("fingerprint", "<u8"), ("date", "<i8"), ("chat_id", "<i8")]
+)
+
+
+class DedupStore:
+    """Append-only file of recent fingerprints, read through ``mmap``.
+
+    Records are fixed-size ``(fingerprint, date, chat_id)`` tuples, so loading
+    the window is a slice of the mapped file rather than a parse. The file grows
+    as records are appended and is periodically rewritten to keep only the last
+    ``capacity`` records.
+    """
+
+    def __init__(
+        self,
+        file_path: str | Path,
+        capacity: int,
+        max_age: float | None = None,
+    ) -> None:
+        """Initialize store.
+
+        Args:
+            file_path: Path to the fingerprint file.
+            capacity: Number of most recent records that make up the window.
+            max_age: Optional age in seconds after which records are ignored.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be a positive integer")
+
+        self.file_path = Path(file_path)
+        self.capacity = capacity
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._compactor: threading.Thread | None = None
+        self._fd = -1
+        self._mm: mmap.mmap | None = None
+        self._count = 0
+        self._open()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def _open(self) -> None:
+        """Map the file, creating or resetting it when missing or invalid."""
+        if self.file_path.parent != Path("."):
+            self.file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._fd = os.open(self.file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self._fd).st_size
+        count = 0
+        if size >= _HEADER_SIZE:
+            magic, version, count = _HEADER.unpack(os.pread(self._fd, _HEADER.size, 0))
+            if magic != _MAGIC or version != _VERSION:
+                logger.warning("dedup_store_invalid_header", path=str(self.file_path))
+                count = 0
+                size = 0
+            elif _HEADER_SIZE + count * RECORD_DTYPE.itemsize > size:
+                # Header written ahead of a truncated tail; keep what is intact
+                count = (size - _HEADER_SIZE) // RECORD_DTYPE.itemsize
+
+        if size < _HEADER_SIZE:
+            size = self._grow_size(0)
+            os.ftruncate(self._fd, size)
+
+        self._mm = mmap.mmap(self._fd, size)
+        self._count = count
+        self._write_header()
+
+    def _grow_size(self, records: int) -> int:
+        chunk = max(self.capacity // 4, 1024)
+        return _HEADER_SIZE + (records + chunk) * RECORD_DTYPE.itemsize
+
+    def _write_header(self) -> None:
+        assert self._mm is not None
+        self._mm[: _HEADER.size] = _HEADER.pack(_MAGIC, _VERSION, self._count)
+
+    def _records(self, start: int, stop: int) -> np.ndarray:
+        assert self._mm is not None
+        return np.frombuffer(
+            self._mm,
+            dtype=RECORD_DTYPE,
+            count=stop - start,
+            offset=_HEADER_SIZE + start * RECORD_DTYPE.itemsize,
+        )
+
+    def _remap(self, size: int) -> None:
+        assert self._mm is not None
+        self._mm.flush()
+        self._mm.close()
+        os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+
+    def fingerprints(self) -> np.ndarray:
+        """Return the window's fingerprints, oldest first.
+
+        The result is a copy of a single column of the mapped file, so this
+        costs a memcpy regardless of how the file was written.
+        """
+        with self._lock:
+            start = max(self._count - self.capacity, 0)
+            records = self._records(start, self._count)
+            if self.max_age is not None:
+                records = records[records["date"] >= int(time.time() - self.max_age)]
+            return records["fingerprint"].copy()
+
+    def append(self, records: Iterable[tuple[int, int, int]]) -> None:
+        """Append ``(fingerprint, date, chat_id)`` records to the window."""
+        rows = np.array(list(records), dtype=RECORD_DTYPE)
+        if not len(rows):
+            return
+
+        with self._lock:
+            assert self._mm is not None
+            needed = _HEADER_SIZE + (self._count + len(rows)) * RECORD_DTYPE.itemsize
+            if needed > len(self._mm):
+                self._remap(self._grow_size(self._count + len(rows)))
+            self._records(self._count, self._count + len(rows))[:] = rows
+            self._count += len(rows)
+            # Header last, so a crash never exposes unwritten records
+            self._write_header()
+
+        if self.needs_compaction:
+            self.compact_in_background()
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Whether the file holds at least twice as many records as the window."""
+        return self._count >= 2 * self.capacity
+
+    def compact(self) -> None:
+        """Rewrite the file so it only holds the current window.
+
+        The bulk copy runs without holding the lock; only records appended while
+        copying and the final file swap are done under it.
+        """
+        with self._lock:
+            snapshot_end = self._count
+            start = max(snapshot_end - self.capacity, 0)
+            tail = self._records(start, snapshot_end).tobytes()
+
+        tmp_path = self.file_path.with_suffix(self.file_path.suffix + ".tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(bytes(_HEADER_SIZE))
+                f.write(tail)
+
+                with self._lock:
+                    assert self._mm is not None
+                    extra = self._records(snapshot_end, self._count).tobytes()
+                    f.write(extra)
+                    count = (len(tail) + len(extra)) // RECORD_DTYPE.itemsize
+                    f.seek(0)
+                    f.write(_HEADER.pack(_MAGIC, _VERSION, count))
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                    self._mm.close()
+                    os.close(self._fd)
+                    os.replace(tmp_path, self.file_path)
+                    self._open()
+        except OSError as e:
+            logger.error("dedup_store_compact_failed", **safe_error(e))
+            return
+
+        logger.debug("dedup_store_compacted", records=count)
+
+    def compact_in_background(self) -> None:
+        """Start compaction in a daemon thread unless one is already running."""
+        if self._compactor and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(
+            target=self.compact,
+            name="dedup-store-compact",
+            daemon=True,
+        )
+        self._compactor.start()
+
+    def flush(self) -> None:
+        """Flush mapped pages to disk."""
+        with self._lock:
+            if self._mm is not None:
+                self._mm.flush()
+
+    def close(self) -> None:
+        """Wait for compaction, flush and unmap the file."""
+        if self._compactor:
+            self._compactor.join()
+        with self._lock:
+            if self._mm is not None:
+                self._mm.flush()
+                self._mm.close()
+                self._mm = None
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
@@ -0,0 +1,149 @@
+"""Cache of chat metadata used to enrich fetched messages."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from telethon.tl.types import PeerChannel
+from telethon.utils import resolve_id
+
+from telegram_search.indexer.channel_registry import Channel
+from telegram_search.indexer.state_store import StateStore
+from telegram_search.logging import get_logger, safe_error
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class ChatInfo:
+    """Display metadata of a chat."""
+
+    title: str
+    username: str = ""
+    # time.time() of the last refresh from Telegram
+    updated_at: float = 0.0
+
+
+def chat_key(chat_id: int) -> int:
+    """Bare chat id: strips Telethon's ``-100`` channel marker."""
+    return resolve_id(chat_id)[0] if chat_id < 0 else chat_id
+
+
+class EntityCache:
+    """Chat title and username by chat id, resolved once per chat.
+
+    Entries are looked up in memory first, then in the state store, and
+    only when missing or older than ``ttl`` refreshed through ``resolver``
+    (normally TelethonCrawler.get_chat_info). Concurrent lookups of one chat
+    share a single refresh, and a chat whose refresh failed is not retried
+    for ``retry_interval`` seconds, so a batch of messages costs at most one
+    API call per chat. A stale entry is still used when a refresh fails.
+
+    Entries of registry channels are persisted under their registry
+    ``channel_id``, next to the channel's synced ranges; other chats under
+    their bare id.
+    """
+
+    def __init__(
+        self,
+        state_store: StateStore | None = None,
+        ttl: float = 86400.0,
+        resolver: Callable[[int], Awaitable[ChatInfo | None]] | None = None,
+        retry_interval: float = 60.0,
+    ) -> None:
+        """Initialize cache.
+
+        Args:
+            state_store: Store persisting resolved entries across restarts.
+            ttl: Seconds before an entry is refreshed; 0 never refreshes.
+            resolver: Fetches the metadata of a chat id from Telegram.
+            retry_interval: Seconds to wait before retrying a failed refresh.
+        """
+        self._state_store = state_store
+        self.ttl = ttl
+        self._resolver = resolver
+        self.retry_interval = retry_interval
+        self._entries: dict[int, ChatInfo] = {}
+        # Bare chat id -> registry channel id, the key used in the state store
+        self._keys: dict[int, int] = {}
+        self._failed: dict[int, float] = {}
+        self._inflight: dict[int, asyncio.Future[ChatInfo | None]] = {}
+
+    def seed(self, channels: Iterable[Channel]) -> None:
+        """Fill in chats without an entry from the channel registry."""
+        now = time.time()
+        for channel in channels:
+            key = chat_key(channel.channel_id)
+            self._keys[key] = channel.channel_id
+            if self.get(key) is None:
+                self._entries[key] = ChatInfo(channel.title, channel.username, now)
+
+    def get(self, chat_id: int) -> ChatInfo | None:
+        """Cached metadata of a chat, without contacting Telegram."""
+        key = chat_key(chat_id)
+        info = self._entries.get(key)
+        if info is None and self._state_store is not None:
+            stored = self._state_store.get_entity(self._keys.get(key, key))
+            if stored:
+                info = self._entries[key] = ChatInfo(**stored)
+        return info
+
+    def put(self, chat_id: int, info: ChatInfo) -> None:
+        """Store metadata of a chat."""
+        key = chat_key(chat_id)
+        self._entries[key] = info
+        if self._state_store is not None:
+            self._state_store.set_entity(self._keys.get(key, key), asdict(info))
+
+    async def resolve(self, chat_id: int) -> ChatInfo | None:
+        """Metadata of a chat, refreshing it if missing or expired."""
+        key = chat_key(chat_id)
+        info = self.get(key)
+        now = time.time()
+        if info is not None and (self.ttl <= 0 or now - info.updated_at < self.ttl):
+            return info
+        if self._resolver is None or now - self._failed.get(key, 0.0) < self.retry_interval:
+            return info
+        if key not in self._inflight:
+            self._inflight[key] = asyncio.ensure_future(self._refresh(chat_id, key))
+        return await asyncio.shield(self._inflight[key]) or info
+
+    async def _refresh(self, chat_id: int, key: int) -> ChatInfo | None:
+        assert self._resolver is not None
+        try:
+            info = await self._resolver(chat_id)
+        except Exception as e:
+            self._failed[key] = time.time()
+            logger.warning("entity_resolve_failed", chat_id=chat_id, **safe_error(e))
+            return None
+        finally:
+            self._inflight.pop(key, None)
+        if info is not None:
+            self._failed.pop(key, None)
+            self.put(key, info)
+            logger.debug("entity_resolved", chat_id=chat_id, username=info.username)
+        return info
+
+    async def enrich(self, msg: dict[str, Any]) -> dict[str, Any]:
+        """Add ``chat_title``, ``chat_username`` and ``url`` to a message.
+
+        Fields already set are kept. Chats without a username get a
+        ``t.me/c/`` link, which opens for members of private channels.
+        """
+        info = await self.resolve(msg["chat_id"])
+        if info is None:
+            return msg
+        if not msg.get("chat_title"):
+            msg["chat_title"] = info.title
+        if not msg.get("chat_username"):
+            msg["chat_username"] = info.username
+        if not msg.get("url"):
+            if msg["chat_username"]:
+                msg["url"] = f"https://t.me/{msg['chat_username']}/{msg['msg_id']}"
+            elif msg["chat_id"] < 0 and resolve_id(msg["chat_id"])[1] is PeerChannel:
+                msg["url"] = f"https://t.me/c/{chat_key(msg['chat_id'])}/{msg['msg_id']}"
+        return msg
@@ -3,8 +3,11 @@
 from __future__ import annotations
 
 import asyncio
-from typing import AsyncIterator, Callable, Optional
+from collections.abc import AsyncIterator, Callable
+from typing import Any, Optional
 
+from telegram_search.indexer.id_ranges import Range
+from telegram_search.indexer.session_pool import SessionPool
 from telegram_search.indexer.state_store import StateStore
 from telegram_search.indexer.telethon_client import TelethonCrawler
 
@@ -14,14 +17,14 @@ class HistoricalSync:
 
     def __init__(
         self,
-        crawler: TelethonCrawler,
+        crawler: TelethonCrawler | SessionPool,
         state_store: StateStore,
         rate_limit_delay: float = 0.0,
     ) -> None:
         """Initialize sync service.
 
         Args:
-            crawler: Telethon crawler instance.
+            crawler: Telethon crawler or session pool.
             state_store: State persistence store.
             rate_limit_delay: Optional delay between messages to reduce API pressure.
         """
@@ -34,12 +37,12 @@ class HistoricalSync:
         channel_id: str | int,
         limit: int = 100,
         progress_callback: Optional[Callable[[int], None]] = None,
-    ) -> AsyncIterator[dict]:
+    ) -> AsyncIterator[dict[str, Any]]:
         """Sync messages from channel incrementally.
 
         Fetches messages starting from the last known message ID (min_id).
         Uses reverse=True to fetch from oldest to newest. The caller should
-        persist progress as messages are processed.
+        persist progress with StateStore.set_state as messages are processed.
 
         Args:
             channel_id: Channel identifier.
@@ -67,3 +70,52 @@ class HistoricalSync:
 
             if self.rate_limit_delay:
                 await asyncio.sleep(self.rate_limit_delay)
+
+    async def plan_gaps(self, channel_id: str | int, since: int = 1) -> list[Range]:
+        """Message-id ranges of a channel that are not synced yet, newest first.
+
+        The range above the newest synced message (new posts) comes first,
+        followed by holes left by earlier partial runs and the unsynced
+        history below the oldest synced message.
+
+        Args:
+            channel_id: Channel identifier.
+            since: Lowest message id to consider.
+
+        Returns:
+            Inclusive ``(start, end)`` id ranges.
+        """
+        head = await self.crawler.get_latest_message_id(channel_id)
+        gaps = self.state_store.get_ranges(channel_id).gaps(since, head)
+        return sorted(gaps, reverse=True)
+
+    async def sync_range(
+        self,
+        channel_id: str | int,
+        start: int,
+        end: int,
+        limit: int = 100,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Fetch messages with ids in ``[start, end]``, newest first.
+
+        The caller records progress with StateStore.add_range; an
+        interrupted range resumes below the oldest message it covered.
+
+        Args:
+            channel_id: Channel identifier.
+            start: Lowest message id to fetch.
+            end: Highest message id to fetch.
+            limit: Maximum number of messages to fetch.
+
+        Yields:
+            Message dictionaries.
+        """
+        async for msg in self.crawler.fetch_messages(
+            channel_id,
+            limit=limit,
+            min_id=start - 1,
+            offset_id=end + 1,
+        ):
+            yield msg
+            if self.rate_limit_delay:
+                await asyncio.sleep(self.rate_limit_delay)
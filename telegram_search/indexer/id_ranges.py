@@ -0,0 +1,75 @@
+"""Sets of message-id intervals."""
+
+from __future__ import annotations
+
+import bisect
+from collections.abc import Iterable, Iterator
+
+Range = tuple[int, int]
+
+
+class IdRangeSet:
+    """Disjoint, sorted, inclusive ``[start, end]`` message-id intervals.
+
+    Overlapping and adjacent intervals are merged on insert, so the set is
+    always in its most compact form and ``[[1, 100], [101, 200]]`` is stored
+    as ``[[1, 200]]``.
+    """
+
+    def __init__(self, ranges: Iterable[Iterable[int]] = ()) -> None:
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+        for start, end in ranges:
+            self.add(start, end)
+
+    def add(self, start: int, end: int) -> None:
+        """Insert ``[start, end]``, merging it with touching intervals."""
+        if start > end:
+            return
+        # First interval that could touch: its end reaches start - 1
+        lo = bisect.bisect_left(self._ends, start - 1)
+        # One past the last interval that could touch: its start is <= end + 1
+        hi = bisect.bisect_right(self._starts, end + 1)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def gaps(self, start: int, end: int) -> list[Range]:
+        """Uncovered intervals inside ``[start, end]``, in ascending order."""
+        gaps: list[Range] = []
+        cursor = start
+        i = bisect.bisect_left(self._ends, start)
+        while cursor <= end and i < len(self._starts):
+            if self._starts[i] > end:
+                break
+            if self._starts[i] > cursor:
+                gaps.append((cursor, self._starts[i] - 1))
+            cursor = max(cursor, self._ends[i] + 1)
+            i += 1
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+    def __contains__(self, msg_id: int) -> bool:
+        i = bisect.bisect_right(self._starts, msg_id) - 1
+        return i >= 0 and msg_id <= self._ends[i]
+
+    def __iter__(self) -> Iterator[Range]:
+        return iter(zip(self._starts, self._ends, strict=True))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, IdRangeSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __repr__(self) -> str:
+        return f"IdRangeSet({self.to_list()})"
+
+    def to_list(self) -> list[list[int]]:
+        """JSON-friendly ``[[start, end], ...]`` form."""
+        return [[start, end] for start, end in self]
@@ -0,0 +1,225 @@
+"""Micro-batching queue in front of IngestService for realtime messages."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import itertools
+from collections.abc import Awaitable
+from typing import Any
+
+from telegram_search.indexer.ingest_service import IngestResult, IngestService
+from telegram_search.indexer.spool import Spool
+from telegram_search.indexer.task_tracker import IndexTask, TaskFailedError, TaskTracker
+from telegram_search.logging import get_logger, safe_error
+
+logger = get_logger(__name__)
+
+_Item = tuple[dict[str, Any], "asyncio.Future[IngestResult]"]
+_CLOSE = None
+
+
+class IngestQueue:
+    """Coalesce messages into IngestService.ingest_batch_results calls.
+
+    A batch is flushed once it holds ``max_batch_size`` messages or
+    ``max_latency`` seconds after its first message arrived, whichever comes
+    first, so a burst costs one index task per batch instead of one per
+    message. Each submitted message gets a future resolved with its
+    IngestResult. The queue is bounded: when indexing falls behind,
+    :meth:`submit` waits for room instead of buffering without limit.
+
+    With a ``tracker`` or a ``spool``, a future is only resolved once its
+    batch is durable: its Meilisearch tasks (and those of earlier batches)
+    succeeded, or the spool was fsynced. Callers can then checkpoint every
+    message reported INDEXED; a failed task turns its batch's results into
+    IngestResult.ERROR.
+    """
+
+    def __init__(
+        self,
+        ingest: IngestService,
+        max_batch_size: int = 100,
+        max_latency: float = 0.2,
+        max_pending: int = 10_000,
+        lock: asyncio.Lock | None = None,
+        tracker: TaskTracker | None = None,
+        spool: Spool | None = None,
+    ) -> None:
+        """Initialize queue.
+
+        Args:
+            ingest: Service the batches are handed to.
+            max_batch_size: Flush once this many messages are buffered.
+            max_latency: Flush this many seconds after a batch's first message.
+            max_pending: Messages queued before submit starts waiting.
+            lock: Optional lock held while a batch is ingested, for sharing the
+                service with other async callers.
+            tracker: Tracker the batches' indexing tasks are waited on with.
+            spool: Spool the ingest service writes to; fsynced before a
+                batch's futures are resolved.
+        """
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be a positive integer")
+        if max_pending <= 0:
+            raise ValueError("max_pending must be a positive integer")
+
+        self._ingest = ingest
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._lock = lock
+        self._tracker = tracker
+        self._spool = spool
+        # Batches whose tasks the tracker is still waiting on, by tracker key
+        self._waiting: dict[int, tuple[list[_Item], list[IngestResult]]] = {}
+        self._batch_ids = itertools.count()
+        self._queue: asyncio.Queue[_Item | None] = asyncio.Queue(maxsize=max_pending)
+        self._worker: asyncio.Task[None] | None = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run(), name="ingest-queue")
+
+    async def submit(self, msg_data: dict[str, Any]) -> asyncio.Future[IngestResult]:
+        """Queue a message, waiting while the queue is full.
+
+        Returns:
+            Future resolved with the message's IngestResult once its batch
+            has been ingested.
+        """
+        if self._closed:
+            raise RuntimeError("IngestQueue is closed")
+        self.start()
+        future: asyncio.Future[IngestResult] = asyncio.get_running_loop().create_future()
+        await self._queue.put((msg_data, future))
+        return future
+
+    async def ingest(self, msg_data: dict[str, Any]) -> IngestResult:
+        """Queue a message and wait for its result."""
+        return await (await self.submit(msg_data))
+
+    async def close(self) -> None:
+        """Flush queued messages and stop the flush task."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._worker is None:
+            return
+        await self._queue.put(_CLOSE)
+        await self._worker
+        if self._tracker is None:
+            return
+        while self._waiting:
+            try:
+                await self._tracker.drain()
+            except TaskFailedError as e:
+                self._settle(e.key, failed=True)
+            except Exception as e:
+                logger.error(
+                    "ingest_queue_drain_error", batches=len(self._waiting), **safe_error(e)
+                )
+                self._tracker.discard()
+                for key in list(self._waiting):
+                    self._settle(key, failed=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._next()
+            if item is _CLOSE:
+                return
+
+            batch: list[_Item] = [item]
+            closing = False
+            deadline = loop.time() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                if item is _CLOSE:
+                    closing = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if closing:
+                return
+
+    async def _next(self) -> _Item | None:
+        """Wait for the next item, meanwhile polling the tasks of earlier batches."""
+        while self._tracker is not None and self._waiting:
+            try:
+                return await asyncio.wait_for(self._queue.get(), self._tracker.poll_interval)
+            except TimeoutError:
+                await self._track(self._tracker.poll())
+        return await self._queue.get()
+
+    async def _flush(self, batch: list[_Item]) -> None:
+        messages = [msg_data for msg_data, _ in batch]
+        tasks: list[IndexTask] = []
+        try:
+            async with self._lock or contextlib.nullcontext():
+                if self._tracker is None:
+                    results = await asyncio.to_thread(self._ingest.ingest_batch_results, messages)
+                else:
+                    results, tasks = await asyncio.to_thread(
+                        self._ingest.ingest_batch_tasks, messages
+                    )
+                if self._spool is not None and IngestResult.INDEXED in results:
+                    await asyncio.to_thread(self._spool.sync)
+        except Exception as e:
+            logger.error("ingest_queue_flush_error", count=len(batch), **safe_error(e))
+            results = [IngestResult.ERROR] * len(batch)
+            tasks = []
+
+        logger.debug(
+            "ingest_queue_flushed",
+            count=len(batch),
+            indexed=results.count(IngestResult.INDEXED),
+            pending=self._queue.qsize(),
+        )
+        if self._tracker is None:
+            _resolve(batch, results)
+            return
+        key = next(self._batch_ids)
+        self._waiting[key] = (batch, results)
+        await self._track(
+            self._tracker.track(tasks, functools.partial(self._settle, key), key=key)
+        )
+
+    async def _track(self, call: Awaitable[None]) -> None:
+        """Await a tracker call, failing the batch whose task failed."""
+        try:
+            await call
+        except TaskFailedError as e:
+            self._settle(e.key, failed=True)
+        except Exception as e:
+            # Still tracked; polled again on the next call
+            logger.error("ingest_queue_poll_error", **safe_error(e))
+
+    def _settle(self, key: int, failed: bool = False) -> None:
+        batch, results = self._waiting.pop(key)
+        if failed:
+            results = [
+                IngestResult.ERROR if r is IngestResult.INDEXED else r for r in results
+            ]
+        _resolve(batch, results)
+
+
+def _resolve(batch: list[_Item], results: list[IngestResult]) -> None:
+    for (_, future), result in zip(batch, results, strict=True):
+        if not future.done():
+            future.set_result(result)
@@ -2,15 +2,25 @@
 
 from __future__ import annotations
 
-from collections import deque
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Deque, List
+from typing import Any
 
+import numpy as np
 import structlog
 
-from telegram_search.pipeline import deduper, transformer
+from telegram_search.indexer.dead_letter import DeadLetterFile
+from telegram_search.indexer.dedup_store import DedupStore
+from telegram_search.indexer.spool import Spool
+from telegram_search.indexer.task_tracker import IndexTask, TaskFailedError
+from telegram_search.models.schema import IndexSchema
+from telegram_search.pipeline import deduper, normalizer, transformer
 from telegram_search.pipeline.filters import MessageFilter
-from telegram_search.search.meili_client import MeiliClient
+from telegram_search.pipeline.parallel import TransformPool
+from telegram_search.pipeline.simhash_index import SimhashIndex
+from telegram_search.search.meili_client import MeiliClient, is_backend_failure
 from telegram_search.logging import safe_error
 
 logger = structlog.get_logger()
@@ -24,6 +34,31 @@ class IngestResult(str, Enum):
     ERROR = "error"
 
 
+@dataclass
+class IngestStats:
+    """Counters for messages skipped as duplicates or rejected by the index."""
+
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    rejected: int = 0
+
+
+@dataclass
+class PreparedBatch:
+    """A batch between the stages of IngestService batch ingestion.
+
+    ``results`` covers every input message; the other fields describe the
+    documents still in the running, with their input positions, content
+    digests and simhash fingerprints.
+    """
+
+    results: list[IngestResult]
+    docs: list[dict[str, Any]] = field(default_factory=list)
+    positions: list[int] = field(default_factory=list)
+    digests: list[int] = field(default_factory=list)
+    hashes: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.uint64))
+
+
 class IngestService:
     """Service for ingesting messages into search index."""
 
@@ -32,6 +67,12 @@ class IngestService:
         meili_client: MeiliClient,
         message_filter: MessageFilter,
         dedup_window_size: int = 1000,
+        dedup_threshold: int = 3,
+        dedup_store: DedupStore | None = None,
+        transform_pool: TransformPool | None = None,
+        schema: IndexSchema | None = None,
+        dead_letter: DeadLetterFile | None = None,
+        spool: Spool | None = None,
     ) -> None:
         """Initialize ingest service.
 
@@ -39,19 +80,73 @@ class IngestService:
             meili_client: Client for search index.
             message_filter: Filter for messages.
             dedup_window_size: Number of recent hashes to keep for deduplication.
+            dedup_threshold: Max Hamming distance treated as a near-duplicate.
+            dedup_store: Optional persistent store the dedup window is loaded
+                from and appended to, so it survives restarts.
+            transform_pool: Optional worker pool for batch transforms.
+            schema: Document schema applied before indexing (default: full).
+            dead_letter: Optional file receiving documents Meilisearch rejects
+                after a failed batch has been bisected.
+            spool: Optional spool that accepted documents are appended to
+                instead of being sent to Meilisearch; a SpoolDrainer indexes
+                them from there.
         """
         self._client = meili_client
         self._filter = message_filter
-        self._seen_hashes: Deque[str] = deque(maxlen=dedup_window_size)
+        self._dedup_threshold = dedup_threshold
+        self._seen_hashes = SimhashIndex(dedup_window_size, threshold=dedup_threshold)
+        self._seen_digests = deduper.DigestWindow(dedup_window_size)
+        self._dedup_store = dedup_store
+        self._transform_pool = transform_pool
+        self._schema = schema or IndexSchema()
+        self._dead_letter = dead_letter
+        self._spool = spool
+        # Guards the dedup windows when pipeline stages run in separate threads
+        self._window_lock = threading.Lock()
+        self.stats = IngestStats()
+        self._stats_lock = threading.Lock()
+        if dedup_store is not None:
+            self._seen_hashes.load(dedup_store.fingerprints())
+            logger.info("dedup_window_loaded", size=len(self._seen_hashes))
+
+    def _remember(
+        self,
+        docs: list[dict[str, Any]],
+        fingerprints: list[int],
+        digests: list[int],
+    ) -> None:
+        """Add indexed fingerprints to the dedup windows and the store."""
+        with self._window_lock:
+            for fingerprint in fingerprints:
+                self._seen_hashes.add(fingerprint)
+            for digest in digests:
+                self._seen_digests.add(digest)
+        if self._dedup_store is None:
+            return
+        try:
+            self._dedup_store.append(
+                (fingerprint, doc["date"], doc["chat_id"])
+                for fingerprint, doc in zip(fingerprints, docs, strict=True)
+            )
+        except Exception as e:
+            # The in-memory window is still correct; only persistence is lost
+            logger.error("dedup_store_error", **safe_error(e))
 
-    def _is_duplicate(self, simhash: str) -> bool:
+    def _count(self, counter: str) -> None:
+        """Increment one of the ``stats`` counters from any worker thread."""
+        with self._stats_lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+
+    def close(self) -> None:
+        """Release resources held by the service."""
+        if self._transform_pool is not None:
+            self._transform_pool.close()
+        if self._dedup_store is not None:
+            self._dedup_store.close()
+
+    def _is_duplicate(self, simhash: int) -> bool:
         """Check if simhash is a near-duplicate of recently seen messages."""
-        # Linear scan is acceptable for small window sizes (e.g. 1000).
-        # For larger scales, a specialized index would be needed.
-        for seen_hash in self._seen_hashes:
-            if deduper.is_duplicate(simhash, seen_hash):
-                return True
-        return False
+        return self._seen_hashes.contains_near(simhash)
 
     def ingest_message(self, msg_data: dict[str, Any]) -> IngestResult:
         """Ingest a single message.
@@ -66,8 +161,16 @@ class IngestService:
         if not isinstance(text, str) or not text.strip():
             return IngestResult.SKIPPED
 
+        # Verbatim reposts are rejected before the expensive conversions run
+        text_norm = normalizer.normalize(text)
+        digest = deduper.content_digest(text_norm)
+        if digest in self._seen_digests:
+            self._count("exact_duplicates")
+            logger.debug("exact_duplicate_skipped", msg_id=msg_data.get("msg_id"))
+            return IngestResult.SKIPPED
+
         try:
-            doc = transformer.transform_message(**msg_data)
+            doc = transformer.transform_message(**msg_data, text_norm=text_norm)
         except Exception as e:
             logger.error("transform_error", msg_id=msg_data.get("msg_id"), **safe_error(e))
             return IngestResult.ERROR
@@ -76,12 +179,17 @@ class IngestService:
             return IngestResult.SKIPPED
 
         if self._is_duplicate(doc.simhash):
+            self._count("near_duplicates")
             logger.debug("duplicate_message_skipped", msg_id=doc.id)
             return IngestResult.SKIPPED
 
         try:
-            self._client.add_documents([doc.to_index_dict()])
-            self._seen_hashes.append(doc.simhash)
+            index_doc = doc.to_index_dict()
+            if self._spool is not None:
+                self._spool.append([self._schema.shape(index_doc)])
+            else:
+                self._client.add_documents([self._schema.shape(index_doc)])
+            self._remember([index_doc], [doc.simhash], [digest])
             return IngestResult.INDEXED
         except Exception as e:
             logger.error("index_error", msg_id=doc.id, **safe_error(e))
@@ -89,7 +197,7 @@ class IngestService:
 
     def ingest_batch(
         self,
-        msgs_data: List[dict[str, Any]],
+        msgs_data: list[dict[str, Any]],
         *,
         raise_on_error: bool = False,
     ) -> int:
@@ -102,51 +210,303 @@ class IngestService:
         Returns:
             Number of messages successfully indexed.
         """
-        docs_to_index: List[dict[str, Any]] = []
-        batch_hashes: List[str] = []
+        results = self.ingest_batch_results(msgs_data, raise_on_error=raise_on_error)
+        return results.count(IngestResult.INDEXED)
 
-        for msg_data in msgs_data:
-            text = msg_data.get("text")
-            if not isinstance(text, str) or not text.strip():
-                continue
+    def ingest_batch_results(
+        self,
+        msgs_data: list[dict[str, Any]],
+        *,
+        raise_on_error: bool = False,
+    ) -> list[IngestResult]:
+        """Ingest a batch of messages, reporting the outcome of each one.
 
-            try:
-                doc = transformer.transform_message(**msg_data)
-            except Exception as e:
-                logger.error("transform_error", msg_id=msg_data.get("msg_id"), **safe_error(e))
-                continue
+        Args:
+            msgs_data: List of raw message dictionaries.
+            raise_on_error: Whether to raise on indexing failures.
+
+        Returns:
+            One IngestResult per input message, in input order.
+        """
+        return self._ingest_batch(msgs_data, raise_on_error=raise_on_error)[0]
+
+    def ingest_batch_tasks(
+        self, msgs_data: list[dict[str, Any]]
+    ) -> tuple[list[IngestResult], list[IndexTask]]:
+        """Ingest a batch of messages, reporting each outcome and the tasks covering it.
+
+        Like :meth:`ingest_batch_results`, but INDEXED messages are only
+        durable once the returned tasks have succeeded.
+
+        Args:
+            msgs_data: List of raw message dictionaries.
+
+        Returns:
+            One IngestResult per input message, and the indexing tasks
+            (empty if the documents went to the spool).
+        """
+        return self._ingest_batch(msgs_data, raise_on_error=False)
+
+    def submit_batch(self, msgs_data: list[dict[str, Any]]) -> list[IndexTask]:
+        """Ingest a batch of messages and return the tasks covering it.
+
+        Indexing is asynchronous on the Meilisearch side: the messages are
+        only durable once the returned tasks have succeeded, so callers that
+        checkpoint progress should wait for them (see TaskTracker). A batch
+        Meilisearch rejects is split, so it may be covered by several tasks.
+
+        Args:
+            msgs_data: List of raw message dictionaries.
+
+        Returns:
+            Indexing tasks; empty if no message needed indexing or the
+            documents went to the spool.
+
+        Raises:
+            Exception: If the documents could not be enqueued.
+        """
+        return self._ingest_batch(msgs_data, raise_on_error=True)[1]
+
+    def _ingest_batch(
+        self,
+        msgs_data: list[dict[str, Any]],
+        *,
+        raise_on_error: bool,
+    ) -> tuple[list[IngestResult], list[IndexTask]]:
+        batch = self.dedupe_batch(self.prepare_batch(msgs_data))
+        tasks = self.index_batch(batch, raise_on_error=raise_on_error)
+        return batch.results, tasks
+
+    def prepare_batch(self, msgs_data: list[dict[str, Any]]) -> PreparedBatch:
+        """Filter and transform a batch of messages (first pipeline stage).
+
+        Verbatim reposts of already indexed messages are dropped before the
+        transform runs. Only reads the dedup windows, so several batches can
+        be prepared concurrently.
 
-            if not self._filter.apply_all(doc):
+        Args:
+            msgs_data: List of raw message dictionaries.
+
+        Returns:
+            Transformed batch, to be passed to :meth:`dedupe_batch`.
+        """
+        batch = PreparedBatch([IngestResult.SKIPPED] * len(msgs_data))
+
+        # Cheap checks first: filters and exact digests on the raw messages
+        candidates: list[dict[str, Any]] = []
+        candidate_positions: list[int] = []
+        candidate_digests: list[int] = []
+        batch_digest_set: set[int] = set()
+
+        for position, msg_data in enumerate(msgs_data):
+            if not self._filter.apply_all_raw(msg_data):
                 continue
 
-            if self._is_duplicate(doc.simhash):
-                logger.debug("duplicate_message_skipped", msg_id=doc.id)
+            text_norm = normalizer.normalize(msg_data["text"])
+            digest = deduper.content_digest(text_norm)
+            if digest in self._seen_digests or digest in batch_digest_set:
+                self._count("exact_duplicates")
+                logger.debug("exact_duplicate_skipped", msg_id=msg_data.get("msg_id"))
                 continue
 
-            # Check duplicates within current batch
-            is_batch_dup = any(
-                deduper.is_duplicate(doc.simhash, seen_hash)
-                for seen_hash in batch_hashes
-            )
-            if is_batch_dup:
-                logger.debug("duplicate_message_skipped", msg_id=doc.id)
+            candidates.append({**msg_data, "text_norm": text_norm})
+            candidate_positions.append(position)
+            candidate_digests.append(digest)
+            batch_digest_set.add(digest)
+
+        failed: set[int] = set()
+
+        def on_error(msg_data: dict[str, Any], e: Exception) -> None:
+            failed.add(id(msg_data))
+            logger.error("transform_error", msg_id=msg_data.get("msg_id"), **safe_error(e))
+
+        transform = (self._transform_pool or transformer).transform_messages
+        transformed = iter(list(transform(candidates, on_error=on_error)))
+        for msg_data, position, digest in zip(
+            candidates, candidate_positions, candidate_digests, strict=True
+        ):
+            if id(msg_data) in failed:
+                batch.results[position] = IngestResult.ERROR
                 continue
+            batch.docs.append(next(transformed))
+            batch.positions.append(position)
+            batch.digests.append(digest)
+        batch.hashes = np.array(
+            [doc["simhash"] for doc in batch.docs], dtype=np.uint64
+        )
+        return batch
 
-            # Add to list and update batch state immediately to dedupe within batch
-            docs_to_index.append(doc.to_index_dict())
-            batch_hashes.append(doc.simhash)
+    def dedupe_batch(
+        self,
+        batch: PreparedBatch,
+        pending: Sequence[PreparedBatch] = (),
+    ) -> PreparedBatch:
+        """Drop near-duplicates from a prepared batch (second pipeline stage).
+
+        Batches must be deduped one at a time, in order. ``pending`` lists
+        batches already deduped but not yet indexed; their documents only
+        enter the dedup windows in :meth:`index_batch`, so they are checked
+        here as well.
+
+        Returns:
+            The batch, keeping only documents to index.
+        """
+        kept = PreparedBatch(batch.results)
+        pending_digests = {d for p in pending for d in p.digests}
+        window = np.concatenate([p.hashes for p in pending] + [np.empty(0, np.uint64)])
+        batch_hashes = np.zeros(len(batch.docs), dtype=np.uint64)
+        batch_count = 0
+
+        with self._window_lock:
+            for doc, position, digest, simhash in zip(
+                batch.docs, batch.positions, batch.digests, batch.hashes.tolist(), strict=True
+            ):
+                if digest in self._seen_digests or digest in pending_digests:
+                    # Reposted while this batch was being prepared
+                    self._count("exact_duplicates")
+                    logger.debug("exact_duplicate_skipped", msg_id=doc["id"])
+                    continue
+
+                near_pending = len(window) and (
+                    deduper.distances(window, simhash).min() <= self._dedup_threshold
+                )
+                if self._is_duplicate(simhash) or near_pending:
+                    self._count("near_duplicates")
+                    logger.debug("duplicate_message_skipped", msg_id=doc["id"])
+                    continue
+
+                # Check duplicates within current batch in one vectorized pass
+                if batch_count and deduper.distances(
+                    batch_hashes[:batch_count], simhash
+                ).min() <= self._dedup_threshold:
+                    self._count("near_duplicates")
+                    logger.debug("duplicate_message_skipped", msg_id=doc["id"])
+                    continue
+
+                # Add to list and update batch state immediately to dedupe within batch
+                kept.docs.append(doc)
+                batch_hashes[batch_count] = simhash
+                batch_count += 1
+                kept.positions.append(position)
+                kept.digests.append(digest)
+        kept.hashes = batch_hashes[:batch_count]
+        return kept
+
+    def index_batch(self, batch: PreparedBatch, *, raise_on_error: bool = True) -> list[IndexTask]:
+        """Send a deduped batch to the spool or the index (last pipeline stage).
+
+        Accepted documents are added to the dedup windows and their results
+        set in ``batch.results``.
+
+        Args:
+            batch: Batch returned by :meth:`dedupe_batch`.
+            raise_on_error: Whether to raise on indexing failures.
 
-        if not docs_to_index:
-            return 0
+        Returns:
+            Indexing tasks; empty if no message needed indexing or the
+            documents went to the spool.
+        """
+        if not batch.docs:
+            return []
 
         try:
-            self._client.add_documents(docs_to_index)
-            # Update local state only after successful indexing
-            for simhash in batch_hashes:
-                self._seen_hashes.append(simhash)
-            return len(docs_to_index)
+            shaped = [self._schema.shape(d) for d in batch.docs]
+            if self._spool is not None:
+                self._spool.append(shaped)
+                tasks: list[IndexTask] = []
+                rejected: list[dict[str, Any]] = []
+            else:
+                tasks, rejected = self._add_with_bisection(shaped)
         except Exception as e:
-            logger.error("batch_index_error", count=len(docs_to_index), **safe_error(e))
+            logger.error("batch_index_error", count=len(batch.docs), **safe_error(e))
             if raise_on_error:
                 raise
-            return 0
+            for position in batch.positions:
+                batch.results[position] = IngestResult.ERROR
+            return []
+
+        # Update local state only for documents that were accepted
+        rejected_ids = {doc["id"] for doc in rejected}
+        accepted = [i for i, doc in enumerate(batch.docs) if doc["id"] not in rejected_ids]
+        self._remember(
+            [batch.docs[i] for i in accepted],
+            batch.hashes[accepted].tolist(),
+            [batch.digests[i] for i in accepted],
+        )
+        for doc, position in zip(batch.docs, batch.positions, strict=True):
+            rejected_doc = doc["id"] in rejected_ids
+            batch.results[position] = IngestResult.ERROR if rejected_doc else IngestResult.INDEXED
+        return tasks
+
+    def _add_with_bisection(
+        self,
+        docs: list[dict[str, Any]],
+    ) -> tuple[list[IndexTask], list[dict[str, Any]]]:
+        """Enqueue documents, splitting the batch while Meilisearch rejects it.
+
+        A rejected request (4xx: malformed or oversized payload) is retried as
+        two halves until the offending documents are isolated and written to
+        the dead-letter file; backend failures are raised unchanged.
+
+        Returns:
+            Tuple of (enqueued tasks, rejected documents).
+        """
+        try:
+            task_uid = self._client.add_documents(docs)
+        except Exception as e:
+            if is_backend_failure(e):
+                raise
+            if len(docs) == 1:
+                self._reject(docs[0], e)
+                return [], docs
+            mid = len(docs) // 2
+            logger.warning("batch_bisected", count=len(docs), **safe_error(e))
+            left_tasks, left_rejected = self._add_with_bisection(docs[:mid])
+            right_tasks, right_rejected = self._add_with_bisection(docs[mid:])
+            return left_tasks + right_tasks, left_rejected + right_rejected
+        return ([IndexTask(task_uid, docs)] if task_uid is not None else []), []
+
+    def index_documents(self, docs: list[dict[str, Any]]) -> list[IndexTask]:
+        """Enqueue already shaped documents, e.g. ones read back from the spool.
+
+        Rejected documents are isolated by bisection and dead-lettered.
+
+        Returns:
+            Tasks covering the accepted documents.
+        """
+        return self._add_with_bisection(docs)[0]
+
+    def resubmit_failed(self, task: IndexTask, error: Any) -> list[IndexTask]:
+        """Bisect a batch whose indexing task failed inside Meilisearch.
+
+        Meilisearch fails a whole document-addition task when one document is
+        invalid. The task's documents are re-sent as two halves; a failed task
+        covering a single document sends it to the dead-letter file. Meant as
+        the TaskTracker ``resubmit`` callback.
+
+        Returns:
+            Tasks replacing the failed one.
+
+        Raises:
+            TaskFailedError: If the failure is not caused by the documents
+                (e.g. the index ran out of disk), so bisecting would not help.
+        """
+        if not isinstance(error, dict) or error.get("type") != "invalid_request":
+            raise TaskFailedError(task.uid, "failed", error)
+        if len(task.docs) <= 1:
+            for doc in task.docs:
+                self._reject(doc, error)
+            return []
+        mid = len(task.docs) // 2
+        tasks: list[IndexTask] = []
+        for half in (task.docs[:mid], task.docs[mid:]):
+            tasks.extend(self._add_with_bisection(half)[0])
+        return tasks
+
+    def _reject(self, doc: dict[str, Any], error: Any) -> None:
+        """Set a document Meilisearch refused aside."""
+        self._count("rejected")
+        if self._dead_letter is not None:
+            self._dead_letter.write(doc, error if isinstance(error, dict) else safe_error(error))
+        else:
+            logger.error("document_rejected", doc_id=doc.get("id"))
@@ -0,0 +1,136 @@
+"""Token-bucket limiter for Telegram API requests."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+
+from telegram_search.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket metering requests to ``rate`` per second.
+
+    Up to ``burst`` tokens accumulate while idle. Waiters are served strictly
+    in arrival order (asyncio.Lock is FIFO), so channel workers that each
+    request one page at a time get pages round-robin and a busy channel
+    cannot starve the others.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Initialize bucket, starting full.
+
+        Args:
+            rate: Tokens added per second; 0 or less disables limiting.
+            burst: Bucket capacity.
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now <= self._updated:
+            # Paused: nothing accrues until the pause is over
+            return
+        if self.rate > 0:
+            self._tokens = min(self._tokens + (now - self._updated) * self.rate, self.burst)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait until ``tokens`` are available and take them.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        start = time.monotonic()
+        if self.rate <= 0 and self._paused_until <= start:
+            return 0.0
+        async with self._lock:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                    continue
+                if self.rate <= 0:
+                    break
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+        return time.monotonic() - start
+
+    def pause(self, seconds: float) -> None:
+        """Hold every acquirer for ``seconds`` and empty the bucket."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket whose rate is tuned by AIMD from Telegram's feedback.
+
+    Every successful request raises the rate by ``increase`` (additive
+    increase, up to ``max_rate``); a FloodWaitError multiplies it by
+    ``decrease`` (multiplicative decrease, down to ``min_rate``) and pauses
+    the bucket for the requested wait. The rate therefore settles just below
+    the limit Telegram actually enforces. ``on_change`` receives every new
+    rate so it can be persisted and used as the starting rate next time.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        min_rate: float = 0.1,
+        max_rate: float = 20.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        on_change: Callable[[float], None] | None = None,
+    ) -> None:
+        """Initialize limiter.
+
+        Args:
+            rate: Starting rate in requests per second.
+            burst: Bucket capacity.
+            min_rate: Lower bound after decreases.
+            max_rate: Upper bound after increases.
+            increase: Requests per second added per successful request.
+            decrease: Factor (0, 1) applied on a flood wait.
+            on_change: Called with the new rate whenever it changes.
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be in (0, 1)")
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("rates must satisfy 0 < min_rate <= max_rate")
+        super().__init__(min(max(rate, min_rate), max_rate), burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._on_change = on_change
+
+    def record_success(self) -> None:
+        """Additively increase the rate after a successful request."""
+        self._set_rate(min(self.rate + self.increase, self.max_rate))
+
+    def record_flood_wait(self, seconds: float) -> None:
+        """Multiplicatively decrease the rate and wait out the flood wait."""
+        self.pause(seconds)
+        self._set_rate(max(self.rate * self.decrease, self.min_rate))
+        logger.warning("rate_decreased", rate=round(self.rate, 3), wait=seconds)
+
+    def _set_rate(self, rate: float) -> None:
+        if rate == self.rate:
+            return
+        self._refill()
+        self.rate = rate
+        if self._on_change is not None:
+            self._on_change(rate)
@@ -3,11 +3,18 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Awaitable, Callable, List, Union
+from collections.abc import Awaitable, Callable
+from typing import Any, Union
 
 from telethon import events
 from telethon.tl.types import Message
 
+from telegram_search.indexer.entity_cache import chat_key
+from telegram_search.indexer.historical_sync import HistoricalSync
+from telegram_search.indexer.id_ranges import Range
+from telegram_search.indexer.ingest_service import IngestResult
+from telegram_search.indexer.session_pool import SessionPool
+from telegram_search.indexer.state_store import StateStore
 from telegram_search.indexer.telethon_client import TelethonCrawler
 from telegram_search.logging import get_logger, safe_error
 
@@ -15,31 +22,70 @@ logger = get_logger(__name__)
 
 
 class RealtimeListener:
-    """Listener for real-time Telegram messages."""
+    """Listener for real-time Telegram messages.
+
+    With a ``sync`` and ``state_store`` the listener also catches up on
+    messages it missed. Every live message handled is recorded as a synced
+    id range; on start and whenever the client reconnects, the ids between
+    the newest message synced before the listener started and each
+    channel's current head that are still uncovered are backfilled through
+    HistoricalSync, several gaps at a time, while live events keep being
+    handled. A backfilled message that also arrived live is skipped, and
+    documents are keyed ``{chat_id}_{msg_id}``, so any overlap is merged by
+    Meilisearch instead of indexed twice.
+
+    Ranges are stored under the channel ids the listener was started with
+    (the registry's ``channel_id``, as used by SyncPipeline), whatever form
+    of the id Telegram reports, so live and historical sync share them.
+    """
 
     def __init__(
         self,
-        client: TelethonCrawler,
-        callback: Callable[[dict[str, Any]], Awaitable[None] | None],
+        client: TelethonCrawler | SessionPool,
+        callback: Callable[[dict[str, Any]], Awaitable[Any] | Any],
+        sync: HistoricalSync | None = None,
+        state_store: StateStore | None = None,
+        catch_up_concurrency: int = 4,
+        check_interval: float = 5.0,
+        batch_size: int = 100,
     ) -> None:
         """Initialize listener.
 
         Args:
-            client: The Telethon client wrapper.
+            client: The Telethon client wrapper or session pool.
             callback: Function to call when a new message is received.
-                      Receives a dict with message data.
+                      Receives a dict with message data; returning
+                      IngestResult.ERROR leaves the message unsynced.
+                      Anything else is recorded at once, so it should
+                      only return once the message is durable (see
+                      IngestQueue's ``tracker`` and ``spool``).
+            sync: Fetches missed messages; None disables catch-up.
+            state_store: Store recording handled message ids.
+            catch_up_concurrency: Gaps backfilled at the same time.
+            check_interval: Seconds between connection checks.
+            batch_size: Backfilled messages handed to ``callback`` at once.
         """
         self._client = client
         self._callback = callback
-        self._channels: List[Union[str, int]] = []
-
-    async def start(self, channels: List[Union[str, int]]) -> None:
+        self._sync = sync
+        self._state_store = state_store
+        self.catch_up_concurrency = max(catch_up_concurrency, 1)
+        self.check_interval = check_interval
+        self.batch_size = max(batch_size, 1)
+        self._channels: list[Union[str, int]] = []
+        # Bare chat id -> channel id the listener was started with
+        self._keys: dict[int, int] = {}
+        # Per channel id: newest synced id when the listener started
+        self._floors: dict[int, int] = {}
+
+    async def start(self, channels: list[Union[str, int]]) -> None:
         """Start listening to specified channels.
 
         Args:
             channels: List of channel usernames or IDs to listen to.
         """
         self._channels = channels
+        self._keys = {chat_key(c): c for c in channels if isinstance(c, int)}
         await self._client.connect()
 
         self._client.add_event_handler(
@@ -48,24 +94,149 @@ class RealtimeListener:
         )
 
         logger.info("realtime_listening_started", channels=len(channels))
-        await self._client.run_until_disconnected()
+        watcher = None
+        if self._sync is not None and self._state_store is not None:
+            self._floors = self._load_floors()
+            watcher = asyncio.create_task(self._watch_connection(), name="realtime-catch-up")
+        try:
+            await self._client.run_until_disconnected()
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+                await asyncio.gather(watcher, return_exceptions=True)
+
+    async def stop(self) -> None:
+        """Stop listening; start() returns once the client has disconnected."""
+        await self._client.disconnect()
 
     async def _handle_new_message(self, event: events.NewMessage.Event) -> None:
         """Handle incoming new message event."""
         try:
             msg = event.message
-            if isinstance(msg, Message) and msg.text:
-                data = {
+            if not isinstance(msg, Message):
+                return
+            if not msg.text:
+                # Nothing to index, but the id is not missing either
+                self._record(msg.chat_id, msg.id, msg.id)
+                return
+            data = await self._client.entities.enrich(
+                {
                     "chat_id": msg.chat_id,
                     "msg_id": msg.id,
                     "text": msg.text,
                     "date": msg.date,
                 }
-                logger.debug("realtime_message_received", chat_id=msg.chat_id, msg_id=msg.id)
+            )
+            logger.debug("realtime_message_received", chat_id=msg.chat_id, msg_id=msg.id)
 
-                result = self._callback(data)
-                if asyncio.iscoroutine(result) or asyncio.isfuture(result):
-                    await result
+            result = await self._deliver(data)
+            if result is not IngestResult.ERROR:
+                self._record(msg.chat_id, msg.id, msg.id)
 
         except Exception as e:
             logger.error("realtime_message_error", **safe_error(e))
+
+    async def _deliver(self, data: dict[str, Any]) -> Any:
+        result = self._callback(data)
+        if asyncio.iscoroutine(result) or asyncio.isfuture(result):
+            result = await result
+        return result
+
+    def _key(self, chat_id: int) -> int:
+        """StateStore key of a chat: its registry channel id when listened to by id."""
+        return self._keys.get(chat_key(chat_id), chat_id)
+
+    def _record(self, chat_id: int, start: int, end: int) -> None:
+        if self._state_store is None:
+            return
+        key = self._key(chat_id)
+        self._state_store.add_range(key, start, end)
+        if self._sync is not None:
+            # First message of a channel never synced before
+            self._floors.setdefault(key, end)
+
+    def _load_floors(self) -> dict[int, int]:
+        assert self._state_store is not None
+        floors = {}
+        for channel in self._keys.values():
+            ranges = list(self._state_store.get_ranges(channel))
+            # Never synced: backfilling its history is historical sync's job
+            if ranges:
+                floors[channel] = ranges[-1][1]
+        return floors
+
+    async def _watch_connection(self) -> None:
+        """Catch up once connected, and again after every reconnect."""
+        connected = False
+        while True:
+            if self._client.is_connected():
+                if not connected:
+                    connected = True
+                    await self.catch_up()
+            elif connected:
+                connected = False
+                logger.warning("realtime_disconnected")
+            await asyncio.sleep(self.check_interval)
+
+    async def catch_up(self) -> None:
+        """Backfill messages missed since the listener started or went offline."""
+        if self._sync is None:
+            return
+        work: list[tuple[int, Range]] = []
+        for channel, floor in list(self._floors.items()):
+            try:
+                gaps = await self._sync.plan_gaps(channel, since=floor + 1)
+            except Exception as e:
+                logger.error("catch_up_plan_error", channel=channel, **safe_error(e))
+                continue
+            work.extend((channel, gap) for gap in gaps)
+        if not work:
+            return
+        logger.info("catch_up_started", gaps=len(work))
+        slots = asyncio.Semaphore(self.catch_up_concurrency)
+
+        async def backfill(channel: int, gap: Range) -> int:
+            async with slots:
+                return await self._backfill(channel, gap)
+
+        counts = await asyncio.gather(
+            *(backfill(channel, gap) for channel, gap in work), return_exceptions=True
+        )
+        for (channel, gap), count in zip(work, counts, strict=True):
+            if isinstance(count, Exception):
+                logger.error("catch_up_error", channel=channel, gap=gap, **safe_error(count))
+        logger.info(
+            "catch_up_finished",
+            gaps=len(work),
+            messages=sum(c for c in counts if isinstance(c, int)),
+        )
+
+    async def _backfill(self, channel: int, gap: Range) -> int:
+        """Fetch one gap newest first, recording the ids covered per batch."""
+        assert self._sync is not None and self._state_store is not None
+        start, end = gap
+        high = end
+        batch: list[dict[str, Any]] = []
+        count = 0
+
+        async def flush(low: int) -> None:
+            nonlocal high, batch
+            # Handed over together so the ingest queue can batch them
+            results = await asyncio.gather(*(self._deliver(msg) for msg in batch))
+            if IngestResult.ERROR in results:
+                raise RuntimeError(f"{results.count(IngestResult.ERROR)} messages failed")
+            self._record(channel, low, high)
+            high = low - 1
+            batch = []
+
+        async for msg in self._sync.sync_range(channel, start, end, limit=0):
+            if msg["msg_id"] in self._state_store.get_ranges(channel):
+                # Arrived live meanwhile
+                continue
+            batch.append(msg)
+            count += 1
+            if len(batch) >= self.batch_size:
+                await flush(msg["msg_id"])
+        # Exhausted: ids down to the gap start are deleted or never existed
+        await flush(start)
+        return count
@@ -0,0 +1,188 @@
+"""Pool of Telegram sessions sharing the crawl across accounts."""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+from collections.abc import AsyncIterator, Callable, Iterable
+from typing import Any
+
+from telethon import events
+
+from telegram_search.config import TelegramConfig
+from telegram_search.indexer.entity_cache import ChatInfo, EntityCache, chat_key
+from telegram_search.indexer.state_store import StateStore
+from telegram_search.indexer.telethon_client import TelethonCrawler
+from telegram_search.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to nodes.
+
+    Each node is placed on the ring ``replicas`` times, so keys spread
+    evenly, and adding or removing a node only moves the keys between it and
+    its neighbours (about ``1 / len(nodes)`` of them) instead of reshuffling
+    everything.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 100) -> None:
+        """Initialize ring.
+
+        Args:
+            nodes: Initial nodes.
+            replicas: Points per node on the ring.
+        """
+        self.replicas = max(replicas, 1)
+        self._points: list[tuple[int, str]] = []
+        self._nodes: list[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> list[str]:
+        """Nodes in insertion order."""
+        return list(self._nodes)
+
+    def add(self, node: str) -> None:
+        """Place a node on the ring."""
+        if node in self._nodes:
+            return
+        self._nodes.append(node)
+        for i in range(self.replicas):
+            bisect.insort(self._points, (_hash(f"{node}#{i}"), node))
+
+    def remove(self, node: str) -> None:
+        """Take a node off the ring."""
+        if node not in self._nodes:
+            return
+        self._nodes.remove(node)
+        self._points = [point for point in self._points if point[1] != node]
+
+    def node_for(self, key: str) -> str:
+        """Node owning ``key``: the first point clockwise from its hash."""
+        if not self._points:
+            raise LookupError("hash ring is empty")
+        i = bisect.bisect(self._points, (_hash(key), ""))
+        return self._points[i % len(self._points)][1]
+
+
+def _channel_key(channel: str | int) -> str:
+    # Marked (-100...) and bare ids of a channel must land on the same session
+    if isinstance(channel, int):
+        return str(chat_key(channel))
+    return channel.lower()
+
+
+class SessionPool:
+    """Telethon sessions (accounts) with channels sharded between them.
+
+    Channels are assigned to sessions by consistent hashing, so every
+    history fetch, entity lookup and live update of a channel goes through
+    the same account, and adding or removing a session only moves the
+    channels it gains or loses. The sessions are fixed for the pool's
+    lifetime, since event handlers are split between them when registered;
+    changing them means changing the configuration and restarting. Each
+    session is a TelethonCrawler with its own rate limiters and FloodWait
+    handling, so a flood wait pauses one account only and aggregate
+    throughput grows with the number of sessions. The pool exposes the
+    TelethonCrawler methods used by HistoricalSync and RealtimeListener and
+    can be passed in its place.
+    """
+
+    def __init__(
+        self,
+        config: TelegramConfig,
+        state_store: StateStore | None = None,
+        sessions: Iterable[str] | None = None,
+    ) -> None:
+        """Initialize pool.
+
+        Args:
+            config: Telegram configuration.
+            state_store: Store shared by the sessions' rate limiters and
+                the chat metadata cache.
+            sessions: Session names; defaults to ``config.sessions``.
+        """
+        self._config = config
+        self._state_store = state_store
+        self.entities = EntityCache(state_store, ttl=config.entity_ttl, resolver=self.get_chat_info)
+        self._crawlers: dict[str, TelethonCrawler] = {}
+        self._ring = HashRing()
+        for session in sessions or config.sessions or ["session"]:
+            self._add(session)
+
+    @property
+    def sessions(self) -> list[str]:
+        """Session names in the pool."""
+        return self._ring.nodes
+
+    def _add(self, session: str) -> None:
+        self._crawlers[session] = TelethonCrawler(
+            self._config, state_store=self._state_store, session=session, entities=self.entities
+        )
+        self._ring.add(session)
+
+    def crawler_for(self, channel: str | int) -> TelethonCrawler:
+        """Session crawler that owns a channel."""
+        return self._crawlers[self._ring.node_for(_channel_key(channel))]
+
+    async def connect(self) -> None:
+        """Connect every session."""
+        await asyncio.gather(*(crawler.connect() for crawler in self._crawlers.values()))
+
+    async def start(self) -> None:
+        """Start every session."""
+        await self.connect()
+
+    async def disconnect(self) -> None:
+        """Disconnect every session."""
+        await asyncio.gather(*(crawler.disconnect() for crawler in self._crawlers.values()))
+
+    def is_connected(self) -> bool:
+        """Whether every session is connected."""
+        return all(crawler.is_connected() for crawler in self._crawlers.values())
+
+    def add_event_handler(self, callback: Callable[..., Any], event: Any) -> None:
+        """Add an event handler.
+
+        A NewMessage filter on ``chats`` is split so each session only
+        listens to the channels it owns; other events go to every session.
+        """
+        chats = getattr(event, "chats", None)
+        if not isinstance(event, events.NewMessage) or not chats:
+            for crawler in self._crawlers.values():
+                crawler.add_event_handler(callback, event)
+            return
+        shards: dict[str, list[str | int]] = {}
+        for chat in chats:
+            shards.setdefault(self._ring.node_for(_channel_key(chat)), []).append(chat)
+        for session, shard in shards.items():
+            self._crawlers[session].add_event_handler(callback, events.NewMessage(chats=shard))
+
+    async def run_until_disconnected(self) -> None:
+        """Run until every session is disconnected."""
+        await asyncio.gather(
+            *(crawler.run_until_disconnected() for crawler in self._crawlers.values())
+        )
+
+    async def get_latest_message_id(self, channel: str | int) -> int:
+        """Id of the newest message in a channel, via its session."""
+        return await self.crawler_for(channel).get_latest_message_id(channel)
+
+    async def get_chat_info(self, chat_id: int) -> ChatInfo | None:
+        """Title and username of a chat, via its session."""
+        return await self.crawler_for(chat_id).get_chat_info(chat_id)
+
+    async def fetch_messages(
+        self, channel: str | int, **kwargs: Any
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Fetch messages from a channel, via its session."""
+        async for msg in self.crawler_for(channel).fetch_messages(channel, **kwargs):
+            yield msg
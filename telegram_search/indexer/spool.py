@@ -0,0 +1,367 @@
+"""Durable, segment-based spool between the crawler and Meilisearch."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import os
+import random
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, NamedTuple
+
+from telegram_search.indexer.task_tracker import TaskTracker
+from telegram_search.logging import get_logger, safe_error
+
+if TYPE_CHECKING:
+    from telegram_search.indexer.ingest_service import IngestService
+
+logger = get_logger(__name__)
+
+_RECORD = struct.Struct("<II")  # payload length, crc32
+_ACK = struct.Struct("<QQ")  # segment id, offset
+_SUFFIX = ".seg"
+_ACK_FILE = "ACK"
+
+
+class SpoolPosition(NamedTuple):
+    """Byte position in the spool: segment id and offset inside it."""
+
+    segment: int
+    offset: int
+
+
+@dataclass
+class SpoolRecord:
+    """A batch of documents read back from the spool."""
+
+    docs: list[dict[str, Any]]
+    end: SpoolPosition
+
+
+class Spool:
+    """Append-only write-ahead log of documents waiting to be indexed.
+
+    Records (one per appended batch) are length-prefixed and checksummed, and
+    written to numbered segment files that roll over at ``segment_bytes``.
+    Appends are group-committed: the segment is fsynced at most every
+    ``fsync_interval`` seconds, or on :meth:`sync`. A consumer reads records
+    from a position and calls :meth:`ack` once they are safely indexed; the
+    acknowledged position is persisted and segments entirely before it are
+    deleted. After a restart reading resumes from the last acknowledged
+    position, and a torn record at the end of the log is cut off.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        segment_bytes: int = 64 * 2**20,
+        fsync_interval: float = 0.2,
+    ) -> None:
+        """Open or create a spool.
+
+        Args:
+            directory: Directory holding the segment files.
+            segment_bytes: Size after which a new segment is started.
+            fsync_interval: Maximum seconds an append may stay unsynced;
+                0 fsyncs every append.
+        """
+        if segment_bytes <= 0:
+            raise ValueError("segment_bytes must be a positive integer")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._last_sync = time.monotonic()
+        self._dirty = False
+
+        segments = self._segments()
+        self._acked = self._load_ack(segments)
+        if not segments:
+            segments = [max(self._acked.segment, 1)]
+        self._active = segments[-1]
+        self._fd = os.open(self._path(self._active), os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+        self._size = self._recover(self._active)
+
+    # -- files -----------------------------------------------------------------
+
+    def _path(self, segment: int) -> Path:
+        return self.directory / f"{segment:020d}{_SUFFIX}"
+
+    def _segments(self) -> list[int]:
+        return sorted(int(p.stem) for p in self.directory.glob(f"*{_SUFFIX}"))
+
+    def _load_ack(self, segments: list[int]) -> SpoolPosition:
+        try:
+            data = (self.directory / _ACK_FILE).read_bytes()
+            acked = SpoolPosition(*_ACK.unpack(data))
+        except (OSError, struct.error):
+            acked = SpoolPosition(segments[0] if segments else 1, 0)
+        if segments and acked.segment < segments[0]:
+            acked = SpoolPosition(segments[0], 0)
+        return acked
+
+    def _recover(self, segment: int) -> int:
+        """Cut a torn record off the end of the active segment."""
+        valid = 0
+        with open(self._path(segment), "rb") as f:
+            while self._read_record(f) is not None:
+                valid = f.tell()
+            size = f.seek(0, os.SEEK_END)
+        if valid < size:
+            logger.warning("spool_torn_tail_truncated", segment=segment, bytes=size - valid)
+            os.truncate(self._path(segment), valid)
+        return valid
+
+    @staticmethod
+    def _read_record(f: BinaryIO) -> bytes | None:
+        header = f.read(_RECORD.size)
+        if len(header) < _RECORD.size:
+            return None
+        length, crc = _RECORD.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return None
+        return payload
+
+    # -- writer ----------------------------------------------------------------
+
+    def append(self, docs: list[dict[str, Any]]) -> SpoolPosition:
+        """Append a batch of documents.
+
+        Returns:
+            Position just after the record.
+        """
+        payload = json.dumps(docs, ensure_ascii=False, default=str).encode("utf-8")
+        record = _RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            if self._size and self._size + len(record) > self.segment_bytes:
+                self._roll()
+            os.write(self._fd, record)
+            self._size += len(record)
+            self._dirty = True
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+            return SpoolPosition(self._active, self._size)
+
+    def sync(self) -> None:
+        """Fsync everything appended so far."""
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        if self._dirty:
+            os.fsync(self._fd)
+            self._dirty = False
+        self._last_sync = time.monotonic()
+
+    def _roll(self) -> None:
+        self._sync()
+        os.close(self._fd)
+        self._active += 1
+        self._size = 0
+        self._fd = os.open(self._path(self._active), os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+        logger.debug("spool_segment_started", segment=self._active)
+
+    def close(self) -> None:
+        """Fsync and close the active segment."""
+        with self._lock:
+            if self._fd < 0:
+                return
+            self._sync()
+            os.close(self._fd)
+            self._fd = -1
+
+    # -- consumer --------------------------------------------------------------
+
+    @property
+    def acked(self) -> SpoolPosition:
+        """Position up to which records have been acknowledged."""
+        return self._acked
+
+    def pending_bytes(self) -> int:
+        """Bytes written but not yet acknowledged."""
+        with self._lock:
+            segments = [s for s in self._segments() if s >= self._acked.segment]
+            total = 0
+            for segment in segments:
+                size = self._size if segment == self._active else self._file_size(segment)
+                total += size
+            return max(total - self._acked.offset, 0)
+
+    def _file_size(self, segment: int) -> int:
+        try:
+            return self._path(segment).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def read(self, position: SpoolPosition, max_docs: int = 1000) -> list[SpoolRecord]:
+        """Read records after ``position``.
+
+        Stops after the record that brings the total to ``max_docs``
+        documents, at the end of the written data, or at an incomplete
+        record still being written.
+        """
+        records: list[SpoolRecord] = []
+        count = 0
+        segment, offset = position
+        while count < max_docs:
+            with self._lock:
+                active = self._active
+            try:
+                with open(self._path(segment), "rb") as f:
+                    f.seek(offset)
+                    while count < max_docs:
+                        payload = self._read_record(f)
+                        if payload is None:
+                            break
+                        offset = f.tell()
+                        docs = json.loads(payload)
+                        records.append(SpoolRecord(docs, SpoolPosition(segment, offset)))
+                        count += len(docs)
+                    at_end = f.tell() >= os.fstat(f.fileno()).st_size
+            except FileNotFoundError:
+                if segment >= active:
+                    break
+                segment, offset = segment + 1, 0
+                continue
+            if count >= max_docs or segment >= active:
+                break
+            if not at_end:
+                # Corrupt record in a sealed segment; nothing after it is readable
+                logger.error("spool_corrupt_segment_skipped", segment=segment, offset=offset)
+            segment, offset = segment + 1, 0
+        return records
+
+    def ack(self, position: SpoolPosition) -> None:
+        """Acknowledge everything up to ``position`` and drop finished segments."""
+        with self._lock:
+            if position <= self._acked:
+                return
+            self._acked = position
+            tmp = self.directory / f"{_ACK_FILE}.tmp"
+            tmp.write_bytes(_ACK.pack(*position))
+            os.replace(tmp, self.directory / _ACK_FILE)
+            active = self._active
+        for segment in self._segments():
+            sealed_and_done = (
+                segment == position.segment
+                and segment < active
+                and position.offset >= self._file_size(segment)
+            )
+            if segment < position.segment or sealed_and_done:
+                self._path(segment).unlink(missing_ok=True)
+
+
+class SpoolDrainer:
+    """Feed spooled documents to Meilisearch at the rate it accepts them.
+
+    Records are read in chunks of up to ``max_docs`` documents, indexed
+    through IngestService (so rejected batches are bisected) and tracked with
+    a TaskTracker; the spool is acknowledged as tasks succeed. On any failure
+    reading restarts from the last acknowledged position after a jittered,
+    capped exponential backoff, so an outage only makes the spool grow.
+    """
+
+    def __init__(
+        self,
+        spool: Spool,
+        ingest: IngestService,
+        tracker: TaskTracker,
+        max_docs: int = 1000,
+        idle_interval: float = 0.2,
+        max_backoff: float = 30.0,
+    ) -> None:
+        """Initialize drainer.
+
+        Args:
+            spool: Spool to drain.
+            ingest: Service sending documents to the index.
+            tracker: Tracker for the resulting indexing tasks.
+            max_docs: Documents per indexing request.
+            idle_interval: Seconds to wait when the spool is empty.
+            max_backoff: Upper bound of the retry delay after a failure.
+        """
+        self._spool = spool
+        self._ingest = ingest
+        self._tracker = tracker
+        self.max_docs = max_docs
+        self.idle_interval = idle_interval
+        self.max_backoff = max_backoff
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start draining in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="spool-drainer")
+
+    async def stop(self) -> None:
+        """Stop draining; unacknowledged records are replayed on next start."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def run(self) -> None:
+        """Drain forever."""
+        failures = 0
+        while True:
+            try:
+                drained = await self.drain_once()
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._tracker.discard()
+                failures += 1
+                delay = random.uniform(0, min(self.max_backoff, 0.5 * 2 ** failures))
+                logger.warning(
+                    "spool_drain_failed",
+                    attempt=failures,
+                    retry_in=round(delay, 2),
+                    pending_bytes=self._spool.pending_bytes(),
+                    **safe_error(e),
+                )
+                await asyncio.sleep(delay)
+                continue
+            if not drained:
+                await asyncio.sleep(self.idle_interval)
+
+    async def drain_once(self) -> int:
+        """Index everything currently in the spool and wait for it.
+
+        Returns:
+            Number of documents drained.
+        """
+        position = self._spool.acked
+        total = 0
+        while True:
+            records = await asyncio.to_thread(self._spool.read, position, self.max_docs)
+            if not records:
+                break
+            docs = [doc for record in records for doc in record.docs]
+            position = records[-1].end
+            tasks = await asyncio.to_thread(self._ingest.index_documents, docs)
+            await self._tracker.track(tasks, _Ack(self._spool, position))
+            total += len(docs)
+        await self._tracker.drain()
+        if total:
+            logger.debug("spool_drained", count=total)
+        return total
+
+
+@dataclass
+class _Ack:
+    spool: Spool
+    position: SpoolPosition
+
+    def __call__(self) -> None:
+        self.spool.ack(self.position)
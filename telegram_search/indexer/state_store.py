@@ -4,10 +4,21 @@ from __future__ import annotations
 
 import json
 import os
+import queue
+import sqlite3
+import threading
 import time
 from pathlib import Path
 from typing import Any
 
+from telegram_search.indexer.id_ranges import IdRangeSet
+from telegram_search.logging import get_logger, safe_error
+
+logger = get_logger(__name__)
+
+# Top-level key holding learned API request rates; channel keys are numeric
+_RATES_KEY = "_rates"
+
 
 class StateStore:
     """Persist synchronization state for channels."""
@@ -64,39 +75,283 @@ class StateStore:
     def get_state(self, channel_id: str | int) -> int:
         """Get last synchronized message ID for a channel.
 
+        Derived from the synced ranges: the end of the newest one.
+
         Args:
             channel_id: Channel identifier.
 
         Returns:
             Last message ID or 0 if not found.
         """
-        key = str(channel_id)
-        return self._state.get(key, {}).get("last_msg_id", 0)
+        ranges = list(self.get_ranges(channel_id))
+        return ranges[-1][1] if ranges else 0
 
     def set_state(self, channel_id: str | int, msg_id: int) -> None:
         """Set last synchronized message ID for a channel.
 
+        Forward sync (HistoricalSync.sync_channel) fetches every message
+        after :meth:`get_state`, so the ids up to ``msg_id`` are recorded as
+        a synced range.
+
         Args:
             channel_id: Channel identifier.
             msg_id: Last message ID.
         """
-        key = str(channel_id)
-        if key not in self._state:
-            self._state[key] = {}
-        
         # Only update if new ID is greater than existing
-        current_id = self._state[key].get("last_msg_id", 0)
+        current_id = self.get_state(channel_id)
         if msg_id > current_id:
-            self._state[key]["last_msg_id"] = msg_id
-            self._dirty = True
-            if self.flush_interval <= 0:
+            self.add_range(channel_id, current_id + 1, msg_id)
+
+    def get_ranges(self, channel_id: str | int) -> IdRangeSet:
+        """Get the message-id intervals of a channel that are already synced.
+
+        State written before ranges were tracked only has ``last_msg_id``;
+        forward sync started at the beginning of the channel, so it counts
+        as ``[1, last_msg_id]``.
+
+        Args:
+            channel_id: Channel identifier.
+
+        Returns:
+            A copy of the channel's covered intervals.
+        """
+        entry = self._state.get(str(channel_id), {})
+        ranges = IdRangeSet(entry.get("ranges", []))
+        if entry.get("last_msg_id"):
+            ranges.add(1, entry["last_msg_id"])
+        return ranges
+
+    def add_range(self, channel_id: str | int, start: int, end: int) -> None:
+        """Mark message ids ``start`` to ``end`` of a channel as synced.
+
+        The interval is merged into the stored ones, so the list stays as
+        short as the coverage allows.
+
+        Args:
+            channel_id: Channel identifier.
+            start: First message id covered.
+            end: Last message id covered.
+        """
+        ranges = self.get_ranges(channel_id)
+        before = ranges.to_list()
+        ranges.add(start, end)
+        if ranges.to_list() == before:
+            return
+        key = str(channel_id)
+        self._state.setdefault(key, {})["ranges"] = ranges.to_list()
+        self._mark_dirty(key)
+
+    def get_entity(self, channel_id: str | int) -> dict[str, Any] | None:
+        """Get the cached chat metadata of a channel.
+
+        Args:
+            channel_id: Channel identifier.
+
+        Returns:
+            The dict saved by set_entity, or None.
+        """
+        entity: dict[str, Any] | None = self._state.get(str(channel_id), {}).get("entity")
+        return entity
+
+    def set_entity(self, channel_id: str | int, entity: dict[str, Any]) -> None:
+        """Cache chat metadata (title, username) of a channel.
+
+        Args:
+            channel_id: Channel identifier.
+            entity: JSON-serializable metadata.
+        """
+        key = str(channel_id)
+        self._state.setdefault(key, {})["entity"] = entity
+        self._mark_dirty(key)
+
+    def get_rate(self, session: str, method: str) -> float | None:
+        """Get the request rate learned for an API method of a session.
+
+        Args:
+            session: Telegram session name.
+            method: API method name.
+
+        Returns:
+            Requests per second, or None if nothing was learned yet.
+        """
+        rate: float | None = self._state.get(_RATES_KEY, {}).get(session, {}).get(method)
+        return rate
+
+    def set_rate(self, session: str, method: str, rate: float) -> None:
+        """Remember the request rate learned for an API method of a session.
+
+        Args:
+            session: Telegram session name.
+            method: API method name.
+            rate: Requests per second.
+        """
+        self._state.setdefault(_RATES_KEY, {}).setdefault(session, {})[method] = rate
+        self._mark_dirty(_RATES_KEY)
+
+    def _mark_dirty(self, key: str) -> None:
+        """Record a change to ``key``, saving now or once ``flush_interval`` has passed."""
+        self._dirty = True
+        if self.flush_interval <= 0:
+            self._save()
+        else:
+            now = time.monotonic()
+            if now - self._last_flush >= self.flush_interval:
                 self._save()
-            else:
-                now = time.monotonic()
-                if now - self._last_flush >= self.flush_interval:
-                    self._save()
 
     def flush(self) -> None:
         """Force persist state to disk."""
         if self._dirty:
             self._save()
+
+    def close(self) -> None:
+        """Persist pending changes and release the store."""
+        self.flush()
+
+
+class SqliteStateStore(StateStore):
+    """StateStore persisted to an SQLite database in WAL mode.
+
+    Every top-level key (a channel, or the learned rates) is one row holding
+    its JSON entry, so a save writes only the keys changed since the last
+    one instead of rewriting the whole state. Saves hand the changed rows to
+    a writer thread, which commits everything queued in one transaction;
+    callers on the event loop never wait for the disk. Reads are served from
+    memory.
+
+    A legacy JSON state file is imported on first open and renamed with a
+    ``.migrated`` suffix.
+    """
+
+    def __init__(
+        self,
+        file_path: str | Path = "state.db",
+        flush_interval: float = 0.0,
+        legacy_path: str | Path | None = None,
+    ) -> None:
+        """Initialize state store.
+
+        Args:
+            file_path: Path to the SQLite database.
+            flush_interval: Minimum seconds between saves. 0 means immediate.
+            legacy_path: JSON state file to import when the database is empty.
+        """
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._changed: set[str] = set()
+        self._writes: queue.Queue[dict[str, str] | None] = queue.Queue()
+        self._closed = False
+        path = Path(file_path)
+        if path.parent != Path("."):
+            path.parent.mkdir(parents=True, exist_ok=True)
+        # Used by __init__ and then only by the writer thread
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        super().__init__(path, flush_interval)
+        self._writer = threading.Thread(
+            target=self._write_loop,
+            name="state-store-writer",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def _load(self) -> None:
+        """Set up the database, importing the legacy JSON file if it is empty."""
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._state = {
+            key: json.loads(value)
+            for key, value in self._conn.execute("SELECT key, value FROM state")
+        }
+        if not self._state and self.legacy_path and self.legacy_path.exists():
+            self._migrate(self.legacy_path)
+        self._last_flush = time.monotonic()
+
+    def _migrate(self, path: Path) -> None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error("state_migration_failed", path=str(path), **safe_error(e))
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in state.items()],
+            )
+        self._state = state
+        os.replace(path, path.with_suffix(path.suffix + ".migrated"))
+        logger.info("state_migrated", path=str(path), keys=len(state))
+
+    def _mark_dirty(self, key: str) -> None:
+        self._changed.add(key)
+        super()._mark_dirty(key)
+
+    def _save(self) -> None:
+        """Queue the changed rows for the writer thread."""
+        if self._closed:
+            # The writer is gone; the change only lives in memory
+            logger.warning("state_store_closed", keys=len(self._changed))
+            self._changed.clear()
+            self._dirty = False
+            return
+        rows = {key: json.dumps(self._state[key]) for key in self._changed}
+        self._changed.clear()
+        self._writes.put(rows)
+        self._last_flush = time.monotonic()
+        self._dirty = False
+
+    def _write_loop(self) -> None:
+        failed: dict[str, str] = {}
+        while True:
+            batch = [self._writes.get()]
+            while True:
+                try:
+                    batch.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            rows = dict(failed)
+            for item in batch:
+                rows.update(item or {})
+            try:
+                if rows:
+                    with self._conn:
+                        self._conn.executemany(
+                            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                            rows.items(),
+                        )
+                failed = {}
+            except sqlite3.Error as e:
+                # Kept and retried with the next batch
+                failed = rows
+                logger.error("state_write_failed", keys=len(rows), **safe_error(e))
+            for _ in batch:
+                self._writes.task_done()
+            if None in batch:
+                return
+
+    def flush(self) -> None:
+        """Persist pending changes and wait until they are committed.
+
+        After close() changes are no longer persisted and this returns at once.
+        """
+        if self._closed:
+            return
+        super().flush()
+        if self._writer.is_alive():
+            self._writes.join()
+
+    def close(self) -> None:
+        """Commit pending changes, stop the writer and close the database.
+
+        Later changes are kept in memory only.
+        """
+        if self._closed:
+            return
+        # A dead writer cannot commit anything; still release the database
+        if self._writer.is_alive():
+            self.flush()
+            self._writes.put(None)
+            self._writer.join()
+        self._closed = True
+        self._conn.close()
@@ -0,0 +1,344 @@
+"""Staged asyncio pipeline for historical sync."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from telegram_search.indexer.channel_registry import Channel
+from telegram_search.indexer.historical_sync import HistoricalSync
+from telegram_search.indexer.id_ranges import Range
+from telegram_search.indexer.ingest_service import IngestService, PreparedBatch
+from telegram_search.indexer.spool import Spool
+from telegram_search.indexer.state_store import StateStore
+from telegram_search.indexer.task_tracker import IndexTask, TaskFailedError, TaskTracker
+from telegram_search.logging import get_logger, safe_error
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Batch:
+    channel: Channel
+    msgs: list[dict[str, Any]]
+    # Message ids low..high are covered once the batch is indexed
+    low: int
+    high: int
+    prepared: PreparedBatch | None = None
+    # Set when the transform raised; the batch's channel is then failed
+    error: Exception | None = None
+
+
+@dataclass
+class _ChannelEnd:
+    channel: Channel
+    count: int
+
+
+# Items passed between the stages; None ends the stream
+_Transforming = asyncio.Task[_Batch] | _ChannelEnd | None
+_Deduped = _Batch | _ChannelEnd | None
+
+
+class SyncPipeline:
+    """Historical sync as fetch, transform, dedup and index stages.
+
+    The stages run as separate tasks connected by bounded queues, so
+    Telegram fetches, the CPU-bound transform and Meilisearch writes overlap
+    and a backfill runs at the speed of its slowest stage:
+
+    - fetch: ``fetch_concurrency`` workers page messages from Telegram (the
+      crawler's rate limiter shares the request budget between them) and
+      cut them into batches of ``batch_size``. Work is split into the gaps
+      of each channel's synced id ranges, newest first: new posts above the
+      head are fetched while older holes and deep history are backfilled
+      by other workers;
+    - transform: ``transform_concurrency`` batches filtered and transformed
+      at once in worker threads (IngestService.prepare_batch);
+    - dedup: one batch at a time, in fetch order (IngestService.dedupe_batch);
+    - index: sends batches to the spool or Meilisearch, with up to the
+      tracker's ``max_in_flight`` tasks pending.
+
+    A full queue blocks the stage feeding it. Each batch covers a contiguous
+    id range, which is added to the channel's synced ranges
+    (StateStore.add_range) once the TaskTracker has seen it and every
+    earlier batch succeed; an interrupted gap therefore resumes exactly
+    below the last covered message. A batch that fails to index stops its
+    channel; later batches of that channel are dropped without being
+    checkpointed, while other channels carry on (tracker entries are keyed
+    by channel id).
+    """
+
+    def __init__(
+        self,
+        sync: HistoricalSync,
+        ingest: IngestService,
+        tracker: TaskTracker,
+        state_store: StateStore,
+        batch_size: int = 100,
+        queue_size: int = 4,
+        transform_concurrency: int = 1,
+        fetch_concurrency: int = 1,
+        spool: Spool | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> None:
+        """Initialize pipeline.
+
+        Args:
+            sync: Source of channel messages.
+            ingest: Service running the transform, dedup and index steps.
+            tracker: Tracker committing checkpoints once tasks succeed.
+            state_store: Store receiving the channel checkpoints.
+            batch_size: Messages per batch.
+            queue_size: Batches buffered between two stages.
+            transform_concurrency: Batches transformed at the same time.
+            fetch_concurrency: Channels fetched at the same time.
+            spool: Spool the ingest service writes to; fsynced before a
+                batch is checkpointed.
+            should_stop: Polled by the fetch stage; once it returns True no
+                more messages are fetched and queued batches are finished.
+        """
+        if min(queue_size, transform_concurrency, fetch_concurrency) <= 0:
+            raise ValueError("queue sizes and concurrency levels must be positive integers")
+        self._sync = sync
+        self._ingest = ingest
+        self._tracker = tracker
+        self._state_store = state_store
+        self.batch_size = max(batch_size, 1)
+        self.queue_size = queue_size
+        self.transform_concurrency = transform_concurrency
+        self.fetch_concurrency = fetch_concurrency
+        self._spool = spool
+        self._should_stop = should_stop or (lambda: False)
+        self._failed: set[int] = set()
+        self._channels: dict[int, Channel] = {}
+        self._counts: dict[int, int] = {}
+        self._budget: dict[int, int] = {}
+        # Deduped batches whose documents are not in the dedup windows yet
+        self._pending: deque[PreparedBatch] = deque()
+
+    async def run(self, channels: Sequence[Channel], limit: int = 1000) -> None:
+        """Sync up to ``limit`` not yet synced messages from each channel."""
+        self._failed.clear()
+        self._channels = {channel.channel_id: channel for channel in channels}
+        self._counts = {channel.channel_id: 0 for channel in channels}
+        self._budget = {channel.channel_id: limit for channel in channels}
+        self._pending.clear()
+        transform_q: asyncio.Queue[_Transforming] = asyncio.Queue(self.queue_size)
+        index_q: asyncio.Queue[_Deduped] = asyncio.Queue(self.queue_size)
+        stages = [
+            asyncio.create_task(self._fetch(channels, limit, transform_q)),
+            asyncio.create_task(self._dedupe(transform_q, index_q)),
+            asyncio.create_task(self._index(index_q)),
+        ]
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+
+    async def _fetch(
+        self,
+        channels: Sequence[Channel],
+        limit: int,
+        out: asyncio.Queue[_Transforming],
+    ) -> None:
+        slots = asyncio.Semaphore(self.transform_concurrency)
+        # Work units: (channel, None) plans a channel, (channel, gap) syncs a gap
+        work: asyncio.Queue[tuple[Channel, Range | None]] = asyncio.Queue()
+        units = {channel.channel_id: 1 for channel in channels}
+        for channel in channels:
+            work.put_nowait((channel, None))
+
+        async def put(batch: _Batch) -> None:
+            # Queued as a task so batches are transformed concurrently but
+            # handed to the dedup stage in fetch order
+            await slots.acquire()
+            task = asyncio.create_task(self._transform(batch))
+            task.add_done_callback(lambda _: slots.release())
+            await out.put(task)
+
+        async def worker() -> None:
+            while True:
+                channel, gap = await work.get()
+                try:
+                    if self._should_stop() or channel.channel_id in self._failed:
+                        continue
+                    if gap is None:
+                        gaps = await self._sync.plan_gaps(channel.channel_id)
+                        logger.info("syncing_channel", channel=channel.username, gaps=len(gaps))
+                        units[channel.channel_id] += len(gaps)
+                        for gap in gaps:
+                            work.put_nowait((channel, gap))
+                    else:
+                        await self._fetch_range(channel, gap, put)
+                except Exception as e:
+                    self._failed.add(channel.channel_id)
+                    logger.error("channel_sync_error", channel=channel.username, **safe_error(e))
+                finally:
+                    units[channel.channel_id] -= 1
+                    if not units[channel.channel_id]:
+                        await out.put(_ChannelEnd(channel, self._counts[channel.channel_id]))
+                    work.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.fetch_concurrency)]
+        try:
+            await work.join()
+            if self._should_stop():
+                logger.info("crawler_shutdown_requested")
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await out.put(None)
+
+    async def _fetch_range(
+        self,
+        channel: Channel,
+        gap: Range,
+        put: Callable[[_Batch], Awaitable[None]],
+    ) -> None:
+        """Fetch one gap newest first, cutting batches that cover id ranges."""
+        channel_id = channel.channel_id
+        limit = self._budget[channel_id]
+        if limit <= 0:
+            return
+        start, end = gap
+        fetched = 0
+        exhausted = False
+        batch = _Batch(channel, [], low=end + 1, high=end)
+        async for msg in self._sync.sync_range(channel_id, start, end, limit=limit):
+            # The budget is shared with the channel's other gaps being fetched
+            if self._should_stop() or channel_id in self._failed or self._budget[channel_id] <= 0:
+                break
+            batch.msgs.append(msg)
+            batch.low = msg["msg_id"]
+            fetched += 1
+            self._budget[channel_id] -= 1
+            self._counts[channel_id] += 1
+            if len(batch.msgs) >= self.batch_size:
+                await put(batch)
+                logger.info(
+                    "sync_progress",
+                    channel=channel.username,
+                    current=self._counts[channel_id],
+                    oldest=batch.low,
+                )
+                batch = _Batch(channel, [], low=batch.low, high=batch.low - 1)
+        else:
+            # sync_range ran out before the limit: ids down to the gap start
+            # are deleted or never existed
+            exhausted = fetched < limit
+        if channel_id in self._failed:
+            return
+        if exhausted:
+            batch.low = start
+        if batch.msgs or batch.low <= batch.high:
+            await put(batch)
+
+    async def _transform(self, batch: _Batch) -> _Batch:
+        try:
+            batch.prepared = await asyncio.to_thread(self._ingest.prepare_batch, batch.msgs)
+        except Exception as e:
+            batch.error = e
+        return batch
+
+    async def _dedupe(
+        self, source: asyncio.Queue[_Transforming], out: asyncio.Queue[_Deduped]
+    ) -> None:
+        while True:
+            item = await source.get()
+            if item is None:
+                await out.put(None)
+                return
+            if isinstance(item, _ChannelEnd):
+                await out.put(item)
+                continue
+            batch: _Batch = await item
+            if batch.channel.channel_id in self._failed:
+                continue
+            if batch.error is not None:
+                logger.error(
+                    "batch_transform_error",
+                    channel=batch.channel.username,
+                    **safe_error(batch.error),
+                )
+                self._fail(batch.channel, batch.low, batch.error)
+                continue
+            assert batch.prepared is not None
+            prepared = await asyncio.to_thread(
+                self._ingest.dedupe_batch, batch.prepared, list(self._pending)
+            )
+            batch.prepared = prepared
+            self._pending.append(prepared)
+            await out.put(batch)
+
+    async def _index(self, source: asyncio.Queue[_Deduped]) -> None:
+        while True:
+            item = await source.get()
+            if item is None:
+                break
+            if isinstance(item, _ChannelEnd):
+                await self._track(item.channel, [], functools.partial(self._channel_synced, item))
+                continue
+            try:
+                await self._index_batch(item)
+            finally:
+                self._pending.popleft()
+        while True:
+            try:
+                await self._tracker.drain()
+                return
+            except TaskFailedError as e:
+                # Batches of other channels are still tracked
+                self._fail(self._channels[e.key], None, e)
+            except Exception as e:
+                logger.error("batch_ingest_error", **safe_error(e))
+                return
+
+    async def _index_batch(self, batch: _Batch) -> None:
+        channel = batch.channel
+        if channel.channel_id in self._failed:
+            return
+        try:
+            assert batch.prepared is not None
+            tasks = await asyncio.to_thread(self._ingest.index_batch, batch.prepared)
+            if self._spool is not None:
+                await asyncio.to_thread(self._spool.sync)
+        except Exception as e:
+            self._fail(channel, batch.low, e)
+            return
+        checkpoint = functools.partial(
+            self._state_store.add_range, channel.channel_id, batch.low, batch.high
+        )
+        await self._track(channel, tasks, checkpoint, batch.low)
+
+    async def _track(
+        self,
+        channel: Channel,
+        tasks: Sequence[IndexTask],
+        on_success: Callable[[], None] | None,
+        msg_id: int | None = None,
+    ) -> None:
+        try:
+            await self._tracker.track(tasks, on_success, key=channel.channel_id)
+        except TaskFailedError as e:
+            # The failed task may belong to another channel than this batch
+            failed = self._channels.get(e.key, channel)
+            self._fail(failed, msg_id if failed is channel else None, e)
+        except Exception as e:
+            self._fail(channel, msg_id, e)
+
+    def _fail(self, channel: Channel, msg_id: int | None, e: Exception) -> None:
+        self._failed.add(channel.channel_id)
+        logger.error("batch_ingest_error", channel=channel.username, **safe_error(e))
+        logger.error("ingest_error_stop", channel=channel.username, msg_id=msg_id)
+
+    def _channel_synced(self, end: _ChannelEnd) -> None:
+        if end.channel.channel_id not in self._failed:
+            logger.info("channel_synced", channel=end.channel.username, messages=end.count)
@@ -0,0 +1,223 @@
+"""Track in-flight Meilisearch indexing tasks and commit progress in order."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Hashable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from telegram_search.logging import get_logger
+from telegram_search.search.meili_client import AsyncMeiliClient, MeiliClient
+
+logger = get_logger(__name__)
+
+_DONE = "succeeded"
+_FAILED = ("failed", "canceled")
+
+
+class TaskFailedError(RuntimeError):
+    """Raised when a tracked indexing task did not succeed."""
+
+    def __init__(
+        self,
+        task_uid: int,
+        status: str,
+        error: Any = None,
+        key: Any = None,
+    ) -> None:
+        super().__init__(f"Meilisearch task {task_uid} {status}: {error}")
+        self.task_uid = task_uid
+        self.status = status
+        self.error = error
+        # Key of the batch the task belonged to (see TaskTracker.track)
+        self.key = key
+
+
+@dataclass
+class IndexTask:
+    """An enqueued indexing task and the documents it covers."""
+
+    uid: int
+    docs: list[dict[str, Any]] = field(default_factory=list, repr=False)
+
+
+@dataclass
+class _Entry:
+    tasks: list[IndexTask]
+    on_success: Callable[[], None] | None
+    key: Hashable = None
+    statuses: dict[int, str] = field(default_factory=dict)
+    failed: tuple[int, str, Any] | None = None
+
+    @property
+    def done(self) -> bool:
+        return all(self.statuses.get(task.uid) == _DONE for task in self.tasks)
+
+
+Resubmit = Callable[[IndexTask, Any], Sequence[IndexTask]]
+
+
+class TaskTracker:
+    """Keep a bounded number of indexing batches in flight.
+
+    Each tracked batch carries an ``on_success`` callback (typically a state
+    checkpoint). Callbacks run strictly in submission order, and only once all
+    of the batch's tasks and every batch submitted before it have succeeded,
+    so a checkpoint never covers messages that are not in the index. Statuses
+    of all pending tasks are fetched with a single tasks-endpoint request per
+    poll.
+
+    With a ``resubmit`` callback, a failed task is handed back (with the error
+    Meilisearch reported) and replaced by the tasks it returns, which is how
+    IngestService bisects a batch down to the documents Meilisearch rejects.
+
+    Batches can be tagged with a ``key`` (e.g. a channel id) when one
+    tracker serves several independent streams: a failed task then only
+    drops the pending batches with its key, and the others keep committing.
+    """
+
+    def __init__(
+        self,
+        client: MeiliClient | AsyncMeiliClient,
+        max_in_flight: int = 4,
+        poll_interval: float = 0.1,
+        resubmit: Resubmit | None = None,
+    ) -> None:
+        """Initialize tracker.
+
+        Args:
+            client: Client used to poll task statuses.
+            max_in_flight: Batches allowed to be pending before track() waits.
+            poll_interval: Seconds between status polls while waiting.
+            resubmit: Optional blocking callable (run in a worker thread)
+                replacing a failed task with new ones.
+        """
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be a positive integer")
+        self._client = client
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self._resubmit = resubmit
+        self._pending: deque[_Entry] = deque()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def track(
+        self,
+        tasks: Sequence[IndexTask],
+        on_success: Callable[[], None] | None = None,
+        key: Hashable = None,
+    ) -> None:
+        """Track a batch, waiting while ``max_in_flight`` batches are pending.
+
+        Args:
+            tasks: Tasks the batch was split into. An empty list stands for a
+                batch that needed no indexing; its callback still waits for
+                the batches before it.
+            on_success: Called once the tasks and all earlier ones succeeded.
+            key: Stream the batch belongs to; a failure only drops the
+                pending batches of its own key.
+
+        Raises:
+            TaskFailedError: If this or an earlier tracked task failed; its
+                ``key`` tells which stream the failed task belonged to.
+        """
+        self._pending.append(_Entry(list(tasks), on_success, key))
+        self._commit()
+        while len(self._pending) > self.max_in_flight:
+            await self._wait()
+
+    async def drain(self) -> None:
+        """Wait until every tracked batch has completed.
+
+        Raises:
+            TaskFailedError: If a tracked task failed.
+        """
+        self._commit()
+        while self._pending:
+            await self._wait()
+
+    async def poll(self) -> None:
+        """Fetch the pending statuses once and run the callbacks that are due.
+
+        Raises:
+            TaskFailedError: If a tracked task failed.
+        """
+        await self._poll()
+        self._commit()
+
+    def discard(self) -> None:
+        """Forget pending batches without running their callbacks."""
+        self._pending.clear()
+
+    async def _wait(self) -> None:
+        await asyncio.sleep(self.poll_interval)
+        await self._poll()
+        self._commit()
+
+    async def _poll(self) -> None:
+        uids = [
+            task.uid
+            for entry in self._pending
+            for task in entry.tasks
+            if entry.statuses.get(task.uid) != _DONE
+        ]
+        if not uids:
+            return
+        if isinstance(self._client, AsyncMeiliClient):
+            statuses = await self._client.get_task_statuses(uids)
+        else:
+            statuses = await asyncio.to_thread(self._client.get_task_statuses, uids)
+
+        for entry in self._pending:
+            for task in list(entry.tasks):
+                info = statuses.get(task.uid)
+                if info is None:
+                    continue
+                entry.statuses[task.uid] = info["status"]
+                if info["status"] in _FAILED and entry.failed is None:
+                    await self._handle_failure(entry, task, info["status"], info.get("error"))
+
+    async def _handle_failure(
+        self,
+        entry: _Entry,
+        task: IndexTask,
+        status: str,
+        error: Any,
+    ) -> None:
+        if self._resubmit is None or status != "failed":
+            entry.failed = (task.uid, status, error)
+            return
+        try:
+            replacements = await asyncio.to_thread(self._resubmit, task, error)
+        except Exception as e:
+            entry.failed = (task.uid, status, repr(e))
+            return
+        entry.tasks.remove(task)
+        entry.tasks.extend(replacements)
+        logger.warning(
+            "index_task_resubmitted",
+            task_uid=task.uid,
+            replacements=[t.uid for t in replacements],
+            error=error,
+        )
+
+    def _commit(self) -> None:
+        while self._pending and self._pending[0].done:
+            entry = self._pending.popleft()
+            if entry.on_success is not None:
+                entry.on_success()
+
+        failed = next((e for e in self._pending if e.failed), None)
+        if failed is None or failed.failed is None:
+            return
+        # Checkpoints after the failed batch would cover it; drop its stream
+        self._pending = deque(e for e in self._pending if e.key != failed.key)
+        task_uid, status, error = failed.failed
+        logger.error(
+            "index_task_failed", task_uid=task_uid, status=status, error=error, key=failed.key
+        )
+        raise TaskFailedError(task_uid, status, error, failed.key)
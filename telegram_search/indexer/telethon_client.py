@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-import asyncio
+import functools
+import time
 from typing import Any, AsyncIterator, Callable, TypeVar
 
 from telethon import TelegramClient
@@ -10,20 +11,72 @@ from telethon.errors import FloodWaitError
 from telethon.tl.types import Message
 
 from telegram_search.config import TelegramConfig
+from telegram_search.indexer.entity_cache import ChatInfo, EntityCache
+from telegram_search.indexer.rate_limiter import AdaptiveRateLimiter
+from telegram_search.indexer.state_store import StateStore
 from telegram_search.logging import get_logger, safe_error
 
 T = TypeVar("T")
 
 logger = get_logger(__name__)
 
+HISTORY_METHOD = "messages.getHistory"
+ENTITY_METHOD = "channels.getChannels"
+
 
 class TelethonCrawler:
     """Crawler for Telegram channels."""
 
-    def __init__(self, config: TelegramConfig) -> None:
-        """Initialize Telethon client."""
+    def __init__(
+        self,
+        config: TelegramConfig,
+        state_store: StateStore | None = None,
+        session: str = "session",
+        entities: EntityCache | None = None,
+    ) -> None:
+        """Initialize Telethon client.
+
+        Args:
+            config: Telegram configuration.
+            state_store: Optional store the learned request rates and chat
+                metadata are loaded from and saved to.
+            session: Telethon session name.
+            entities: Chat metadata cache to share; by default the crawler
+                creates its own, resolved through this session.
+        """
         self._config = config
         self._client: TelegramClient | None = None
+        self._state_store = state_store
+        self.session = session
+        self.page_size = max(min(config.page_size, 100), 1)
+        self._limiters: dict[str, AdaptiveRateLimiter] = {}
+        self.entities = entities or EntityCache(
+            state_store, ttl=config.entity_ttl, resolver=self.get_chat_info
+        )
+
+    def limiter(self, method: str) -> AdaptiveRateLimiter:
+        """Rate limiter for an API method, shared by all calls of this session.
+
+        Starts from the rate learned in a previous run if the state store
+        has one, otherwise from ``request_rate``.
+        """
+        if method not in self._limiters:
+            rate = self._config.request_rate
+            on_change = None
+            if self._state_store is not None:
+                rate = self._state_store.get_rate(self.session, method) or rate
+                on_change = functools.partial(self._state_store.set_rate, self.session, method)
+            self._limiters[method] = AdaptiveRateLimiter(
+                rate,
+                burst=self._config.request_burst,
+                min_rate=self._config.min_request_rate,
+                max_rate=self._config.max_request_rate,
+                increase=self._config.rate_increase,
+                decrease=self._config.rate_decrease,
+                on_change=on_change,
+            )
+            logger.info("rate_limiter_created", session=self.session, method=method, rate=rate)
+        return self._limiters[method]
 
     async def connect(self) -> None:
         """Connect to Telegram."""
@@ -31,7 +84,7 @@ class TelethonCrawler:
             return
 
         self._client = TelegramClient(
-            "session",
+            self.session,
             self._config.api_id,
             self._config.api_hash,
         )
@@ -52,6 +105,10 @@ class TelethonCrawler:
             await self._client.disconnect()
             self._client = None
 
+    def is_connected(self) -> bool:
+        """Whether the client currently has a connection to Telegram."""
+        return self._client is not None and self._client.is_connected()
+
     def add_event_handler(self, callback: Callable[..., T], event: Any) -> None:
         """Add an event handler."""
         if not self._client:
@@ -64,47 +121,88 @@ class TelethonCrawler:
             raise RuntimeError("Client not connected")
         await self._client.run_until_disconnected()
 
+    async def get_latest_message_id(self, channel: str | int) -> int:
+        """Id of the newest message in a channel (0 if it has none)."""
+        if not self._client:
+            raise RuntimeError("Client not connected")
+        limiter = self.limiter(HISTORY_METHOD)
+        while True:
+            await limiter.acquire()
+            try:
+                messages = await self._client.get_messages(channel, limit=1)
+            except FloodWaitError as e:
+                wait_for = max(int(e.seconds), 1)
+                logger.warning("telegram_flood_wait", seconds=wait_for, channel=channel)
+                limiter.record_flood_wait(wait_for)
+                continue
+            limiter.record_success()
+            return messages[0].id if messages else 0
+
+    async def get_chat_info(self, chat_id: int) -> ChatInfo | None:
+        """Title and username of a chat, from Telethon's entity cache or the API."""
+        if not self._client:
+            raise RuntimeError("Client not connected")
+        limiter = self.limiter(ENTITY_METHOD)
+        while True:
+            await limiter.acquire()
+            try:
+                entity = await self._client.get_entity(chat_id)
+            except FloodWaitError as e:
+                wait_for = max(int(e.seconds), 1)
+                logger.warning("telegram_flood_wait", seconds=wait_for, channel=chat_id)
+                limiter.record_flood_wait(wait_for)
+                continue
+            limiter.record_success()
+            break
+        title = getattr(entity, "title", None) or " ".join(
+            filter(None, [getattr(entity, "first_name", None), getattr(entity, "last_name", None)])
+        )
+        return ChatInfo(title, getattr(entity, "username", None) or "", time.time())
+
     async def fetch_messages(
         self,
         channel: str | int,
         limit: int = 100,
         min_id: int = 0,
         reverse: bool = False,
+        offset_id: int = 0,
     ) -> AsyncIterator[dict]:
-        """Fetch messages from channel."""
+        """Fetch messages from channel.
+
+        Without ``reverse`` messages come newest first, starting below
+        ``offset_id`` (0: the newest message) and stopping above ``min_id``;
+        with it they come oldest first, starting above ``min_id``.
+
+        Messages are requested one page (a single API call of up to
+        ``page_size`` messages) at a time, and each page first takes a token
+        from the history rate limiter, so concurrent fetches share one
+        request budget. The limiter speeds up while pages succeed and backs
+        off on FloodWaitError. Messages carry the chat title, username and
+        permalink from the entity cache.
+        """
         if not self._client:
             raise RuntimeError("Client not connected")
 
+        limiter = self.limiter(HISTORY_METHOD)
         fetched = 0
-        last_id = min_id
-
-        while True:
-            if limit and fetched >= limit:
-                break
+        # Oldest->newest pages continue above the last id, newest->oldest below it
+        last_id = min_id if reverse else offset_id
 
-            remaining = None
-            if limit:
-                remaining = max(limit - fetched, 0)
-                if remaining == 0:
-                    break
+        while not limit or fetched < limit:
+            page_limit = min(self.page_size, limit - fetched) if limit else self.page_size
+            if reverse:
+                params = {"min_id": last_id, "reverse": True}
+            else:
+                params = {"min_id": min_id, "offset_id": last_id}
 
+            await limiter.acquire()
             try:
-                async for msg in self._client.iter_messages(
-                    channel,
-                    limit=remaining or limit,
-                    min_id=last_id if reverse else min_id,
-                    reverse=reverse,
-                ):
-                    if isinstance(msg, Message):
-                        last_id = msg.id
-                        fetched += 1
-                        yield {
-                            "chat_id": msg.chat_id,
-                            "msg_id": msg.id,
-                            "text": msg.text or "",
-                            "date": msg.date,
-                        }
-                break
+                page = [
+                    msg
+                    async for msg in self._client.iter_messages(
+                        channel, limit=page_limit, **params
+                    )
+                ]
             except FloodWaitError as e:
                 wait_for = max(int(e.seconds), 1)
                 logger.warning(
@@ -112,8 +210,25 @@ class TelethonCrawler:
                     seconds=wait_for,
                     channel=channel,
                 )
-                await asyncio.sleep(wait_for)
+                # Pauses every fetch of this session, not just this channel
+                limiter.record_flood_wait(wait_for)
                 continue
             except Exception as e:
                 logger.error("telegram_fetch_error", channel=channel, **safe_error(e))
                 raise
+
+            limiter.record_success()
+            for msg in page:
+                last_id = msg.id
+                if isinstance(msg, Message):
+                    fetched += 1
+                    yield await self.entities.enrich(
+                        {
+                            "chat_id": msg.chat_id,
+                            "msg_id": msg.id,
+                            "text": msg.text or "",
+                            "date": msg.date,
+                        }
+                    )
+            if len(page) < page_limit:
+                break
@@ -1,5 +1,6 @@
 """Data models."""
 
 from .message import MessageDoc
+from .schema import IndexSchema
 
-__all__ = ["MessageDoc"]
+__all__ = ["MessageDoc", "IndexSchema"]
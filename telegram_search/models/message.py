@@ -3,9 +3,9 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class MessageDoc(BaseModel):
@@ -22,10 +22,20 @@ class MessageDoc(BaseModel):
     pinyin: str = Field(default="", description="Pinyin representation")
     trad: str = Field(default="", description="Traditional Chinese")
     simp: str = Field(default="", description="Simplified Chinese")
-    simhash: str = Field(default="", description="Simhash fingerprint")
+    simhash: int = Field(default=0, description="Simhash fingerprint (hex in the index)")
+    script: str = Field(default="other", description="Script class: han, mixed or other")
+    han_count: int = Field(default=0, description="Number of Han characters")
     url: Optional[str] = Field(default=None, description="Message URL")
     media_type: Optional[str] = Field(default=None)
 
+    @field_validator("simhash", mode="before")
+    @classmethod
+    def _parse_simhash(cls, value: Any) -> Any:
+        """Accept the hex form produced for the index."""
+        if isinstance(value, str):
+            return int(value, 16) if value not in ("", "0") else 0
+        return value
+
     def to_index_dict(self) -> dict:
         """Convert to dictionary for Meilisearch indexing."""
         return {
@@ -40,7 +50,9 @@ class MessageDoc(BaseModel):
             "pinyin": self.pinyin,
             "trad": self.trad,
             "simp": self.simp,
-            "simhash": self.simhash,
+            "simhash": hex(self.simhash) if self.simhash else "0",
+            "script": self.script,
+            "han_count": self.han_count,
             "url": self.url,
             "media_type": self.media_type,
         }
@@ -0,0 +1,97 @@
+"""Index document schema: which text variants are stored and searchable."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from telegram_search.config import MeilisearchConfig
+from telegram_search.pipeline import deduper
+
+# Derived text fields, in searchableAttributes order
+VARIANT_FIELDS = ("pinyin", "trad", "simp")
+SCHEMA_MODES = ("full", "lean")
+
+
+class IndexSchema:
+    """Shape index documents and settings for the configured schema mode.
+
+    ``full`` ships every text field. ``lean`` drops variants that are not in
+    ``stored_variants`` or that equal ``text_norm``, and drops ``text_norm``
+    when it equals ``text``; a document missing a field is then matched
+    through the field it duplicates. Searches against a lean index convert
+    the query to Simplified and Traditional instead of relying on stored
+    variants (see SearchService).
+    """
+
+    def __init__(
+        self,
+        mode: str = "full",
+        stored_variants: Iterable[str] = VARIANT_FIELDS,
+        searchable_variants: Iterable[str] = VARIANT_FIELDS,
+    ) -> None:
+        """Initialize schema.
+
+        Args:
+            mode: "full" or "lean".
+            stored_variants: Variant fields written to documents in lean mode.
+            searchable_variants: Variant fields listed in searchableAttributes
+                in lean mode; must be stored.
+
+        Raises:
+            ValueError: On an unknown mode or variant, or a searchable variant
+                that is not stored.
+        """
+        if mode not in SCHEMA_MODES:
+            raise ValueError(f"Unknown schema mode: {mode}")
+        stored = set(stored_variants)
+        searchable = set(searchable_variants)
+        unknown = (stored | searchable) - set(VARIANT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown variant fields: {sorted(unknown)}")
+        if searchable - stored:
+            raise ValueError(f"Searchable variants not stored: {sorted(searchable - stored)}")
+
+        self.mode = mode
+        self.stored_variants = tuple(f for f in VARIANT_FIELDS if f in stored)
+        self.searchable_variants = tuple(f for f in VARIANT_FIELDS if f in searchable)
+
+    @classmethod
+    def from_config(cls, config: MeilisearchConfig) -> IndexSchema:
+        """Build the schema described by the Meilisearch configuration."""
+        return cls(config.schema_mode, config.stored_variants, config.searchable_variants)
+
+    @property
+    def lean(self) -> bool:
+        return self.mode == "lean"
+
+    def shape(self, doc: dict[str, Any]) -> dict[str, Any]:
+        """Return the document as it should be written to the index.
+
+        Integer SimHash fingerprints (as produced by
+        transformer.transform_messages) are written as hex strings.
+        """
+        if isinstance(doc.get("simhash"), int):
+            doc = {**doc, "simhash": deduper.format_simhash(doc["simhash"])}
+        if not self.lean:
+            return doc
+
+        text_norm = doc.get("text_norm", "")
+        shaped = dict(doc)
+        for field in VARIANT_FIELDS:
+            if field not in self.stored_variants or shaped.get(field) == text_norm:
+                shaped.pop(field, None)
+        if text_norm == doc.get("text"):
+            shaped.pop("text_norm", None)
+        return shaped
+
+    def searchable_attributes(self) -> list[str]:
+        """Searchable fields, in ranking order."""
+        variants = self.searchable_variants if self.lean else VARIANT_FIELDS
+        return ["text", "text_norm", *variants, "chat_title"]
+
+    def index_settings(self, base: dict[str, Any]) -> dict[str, Any]:
+        """Return ``base`` index settings adjusted to this schema."""
+        settings = dict(base)
+        settings["searchableAttributes"] = self.searchable_attributes()
+        return settings
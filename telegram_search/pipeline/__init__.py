@@ -1,5 +1,14 @@
 """Content processing pipeline."""
 
-from . import normalizer, tokenizer, deduper, transformer
+from . import zhconv, pinyin, normalizer, tokenizer, deduper, simhash_index, transformer, parallel
 
-__all__ = ["normalizer", "tokenizer", "deduper", "transformer"]
+__all__ = [
+    "zhconv",
+    "pinyin",
+    "normalizer",
+    "tokenizer",
+    "deduper",
+    "simhash_index",
+    "transformer",
+    "parallel",
+]
@@ -1,10 +1,41 @@
-"""Near-duplicate detection using Simhash."""
+"""Duplicate detection using content digests and Simhash."""
 
 from __future__ import annotations
 
+import hashlib
+from collections import deque
+
+import numpy as np
 from simhash import Simhash
 
 
+def simhash_value(text: str) -> int:
+    """Compute simhash fingerprint for text as an unsigned 64-bit integer.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Integer simhash value (0 for empty text)
+    """
+    if not text or not text.strip():
+        return 0
+
+    return int(Simhash(text).value)
+
+
+def format_simhash(value: int) -> str:
+    """Format an integer fingerprint as the hex string stored in the index.
+
+    Args:
+        value: Integer simhash value
+
+    Returns:
+        Hex string of simhash value
+    """
+    return hex(value) if value else "0"
+
+
 def compute_simhash(text: str) -> str:
     """Compute simhash fingerprint for text.
 
@@ -14,28 +45,53 @@ def compute_simhash(text: str) -> str:
     Returns:
         Hex string of simhash value
     """
-    if not text or not text.strip():
-        return "0"
+    return format_simhash(simhash_value(text))
+
 
-    return hex(Simhash(text).value)
+def parse_simhash(hash_value: str) -> int:
+    """Parse a simhash hex string into its integer value.
 
+    Args:
+        hash_value: Simhash hex string as returned by compute_simhash
 
-def hamming_distance(hash1: str, hash2: str) -> int:
+    Returns:
+        Unsigned integer fingerprint
+    """
+    return int(hash_value, 16) if hash_value != "0" else 0
+
+
+def hamming_distance(hash1: int | str, hash2: int | str) -> int:
     """Calculate Hamming distance between two simhash values.
 
     Args:
-        hash1: First simhash hex string
-        hash2: Second simhash hex string
+        hash1: First simhash, as an integer or hex string
+        hash2: Second simhash, as an integer or hex string
 
     Returns:
         Hamming distance (number of differing bits)
     """
-    val1 = int(hash1, 16) if hash1 != "0" else 0
-    val2 = int(hash2, 16) if hash2 != "0" else 0
-    return bin(val1 ^ val2).count("1")
+    if isinstance(hash1, str):
+        hash1 = parse_simhash(hash1)
+    if isinstance(hash2, str):
+        hash2 = parse_simhash(hash2)
+    return (hash1 ^ hash2).bit_count()
+
+
+def distances(window: np.ndarray, fingerprint: int) -> np.ndarray:
+    """Calculate Hamming distances from one fingerprint to many at once.
+
+    Args:
+        window: ``uint64`` array of fingerprints
+        fingerprint: Integer simhash to compare against the window
+
+    Returns:
+        ``uint8`` array of Hamming distances, aligned with ``window``
+    """
+    counts: np.ndarray = np.bitwise_count(window ^ np.uint64(fingerprint))
+    return counts
 
 
-def is_duplicate(hash1: str, hash2: str, threshold: int = 3) -> bool:
+def is_duplicate(hash1: int | str, hash2: int | str, threshold: int = 3) -> bool:
     """Check if two texts are near-duplicates.
 
     Args:
@@ -47,3 +103,48 @@ def is_duplicate(hash1: str, hash2: str, threshold: int = 3) -> bool:
         True if texts are near-duplicates
     """
     return hamming_distance(hash1, hash2) <= threshold
+
+
+def content_digest(text: str) -> int:
+    """Compute a 64-bit exact-content digest of (normalized) text.
+
+    Args:
+        text: Input text, normally the output of normalizer.normalize
+
+    Returns:
+        Integer BLAKE2b digest
+    """
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class DigestWindow:
+    """Bounded set of recent content digests with FIFO eviction."""
+
+    def __init__(self, max_size: int = 1000) -> None:
+        """Initialize window.
+
+        Args:
+            max_size: Maximum number of digests kept.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = max_size
+        self._order: deque[int] = deque()
+        self._counts: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, digest: int) -> bool:
+        return digest in self._counts
+
+    def add(self, digest: int) -> None:
+        """Add a digest, evicting the oldest one if the window is full."""
+        if len(self._order) >= self.max_size:
+            oldest = self._order.popleft()
+            if self._counts[oldest] > 1:
+                self._counts[oldest] -= 1
+            else:
+                del self._counts[oldest]
+        self._order.append(digest)
+        self._counts[digest] = self._counts.get(digest, 0) + 1
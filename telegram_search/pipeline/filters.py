@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Any
+
 from telegram_search.models.message import MessageDoc
 
 
@@ -70,3 +72,21 @@ class MessageFilter:
             and self.filter_service_messages(message)
             and self.filter_by_length(message, min_len=min_len)
         )
+
+    def apply_all_raw(self, msg_data: dict[str, Any], min_len: int = 5) -> bool:
+        """Apply all filters to a raw message dictionary.
+
+        Equivalent to apply_all on the transformed document, so messages can
+        be dropped before the transform pipeline runs.
+
+        Args:
+            msg_data: Raw message dictionary.
+            min_len: Minimum text length for length filter.
+
+        Returns:
+            True if message passes all filters.
+        """
+        text = msg_data.get("text")
+        if not isinstance(text, str) or len(text.strip()) < max(min_len, 1):
+            return False
+        return msg_data.get("media_type") != "service"
@@ -4,14 +4,38 @@ from __future__ import annotations
 
 import re
 import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
 
-from opencc import OpenCC
-from pypinyin import lazy_pinyin, Style
+from telegram_search.pipeline.pinyin import PinyinEngine
+from telegram_search.pipeline.zhconv import ChineseConverter
 
 
 # Initialize converters
-_s2t = OpenCC("s2t")  # Simplified to Traditional
-_t2s = OpenCC("t2s")  # Traditional to Simplified
+_s2t = ChineseConverter.from_opencc("s2t")  # Simplified to Traditional
+_t2s = ChineseConverter.from_opencc("t2s")  # Traditional to Simplified
+
+# Loaded on first use unless configure_pinyin is called
+_pinyin: PinyinEngine | None = None
+
+# CJK ideographs, radicals and ideographic marks; covers every character the
+# Traditional/Simplified and pinyin tables map
+_HAN_RE = re.compile(
+    r"[\u2e80-\u2fdf\u3005\u3007\u3021-\u3029\u3038-\u303b\u3400-\u4dbf\u4e00-\u9fff"
+    r"\ue815-\ue864\uf900-\ufaff\U00020000-\U0003ffff]+"
+)
+
+
+@dataclass(frozen=True)
+class ScriptInfo:
+    """Han character content of a text."""
+
+    han_count: int
+    script: str  # "han", "mixed" or "other"
+
+    @property
+    def has_han(self) -> bool:
+        return self.han_count > 0
 
 
 def normalize_unicode(text: str) -> str:
@@ -24,6 +48,22 @@ def normalize_whitespace(text: str) -> str:
     return re.sub(r"\s+", " ", text).strip()
 
 
+def classify_script(text: str) -> ScriptInfo:
+    """Count Han characters in text and classify it.
+
+    Text without Han characters is "other"; text where at least half of the
+    non-space characters are Han is "han"; anything in between is "mixed".
+    to_simplified and to_traditional leave "other" text unchanged and
+    to_pinyin has nothing to expand in it, so callers can skip them.
+    """
+    han_count = sum(len(run) for run in _HAN_RE.findall(text))
+    if not han_count:
+        return ScriptInfo(0, "other")
+    if 2 * han_count >= len(text) - text.count(" "):
+        return ScriptInfo(han_count, "han")
+    return ScriptInfo(han_count, "mixed")
+
+
 def to_simplified(text: str) -> str:
     """Convert Traditional Chinese to Simplified."""
     return _t2s.convert(text)
@@ -34,9 +74,31 @@ def to_traditional(text: str) -> str:
     return _s2t.convert(text)
 
 
+def configure_pinyin(
+    table_path: str | Path | None = None,
+    max_chars: int = 0,
+    use_mmap: bool = True,
+) -> None:
+    """Set up the pinyin engine used by to_pinyin.
+
+    Call before forking worker processes so they inherit the loaded table.
+
+    Args:
+        table_path: Pinyin table file; built on first use if missing.
+            Defaults to a per-user cache file.
+        max_chars: Only convert the first ``max_chars`` characters (0 for all).
+        use_mmap: Share the table between processes through ``mmap``.
+    """
+    global _pinyin
+    _pinyin = PinyinEngine.from_file(table_path, use_mmap=use_mmap, max_chars=max_chars)
+
+
 def to_pinyin(text: str) -> str:
     """Convert Chinese text to pinyin."""
-    return " ".join(lazy_pinyin(text, style=Style.NORMAL))
+    if _pinyin is None:
+        configure_pinyin()
+    assert _pinyin is not None
+    return _pinyin.convert(text)
 
 
 def normalize(text: str) -> str:
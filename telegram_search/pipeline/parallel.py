@@ -0,0 +1,105 @@
+"""Process-pool fan-out for the CPU-bound transform stage."""
+
+from __future__ import annotations
+
+import gc
+import math
+import multiprocessing
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any
+
+from telegram_search.pipeline import transformer
+
+_WARMUP_MESSAGES = [
+    {"chat_id": 1, "msg_id": 1, "text": "預熱 warm up 词典 pinyin", "date": datetime(2024, 1, 1)},
+    {"chat_id": 1, "msg_id": 2, "text": "加载繁简转换与拼音词典", "date": datetime(2024, 1, 1)},
+]
+
+
+def _transform_chunk(messages: list[dict[str, Any]]) -> list[dict[str, Any] | Exception]:
+    """Worker entry point: transform a chunk, keeping failures in place."""
+    failed: dict[int, Exception] = {}
+
+    def on_error(msg: dict[str, Any], e: Exception) -> None:
+        failed[id(msg)] = e
+
+    docs = iter(list(transformer.transform_messages(messages, on_error=on_error)))
+    return [failed[id(msg)] if id(msg) in failed else next(docs) for msg in messages]
+
+
+def _noop() -> None:
+    return None
+
+
+class TransformPool:
+    """Run transformer.transform_messages across worker processes.
+
+    The dictionaries used by the pipeline are loaded in the parent before the
+    workers are forked, so workers share them copy-on-write instead of each
+    loading their own copy. Results are returned in input order.
+    """
+
+    def __init__(self, workers: int, min_chunk_size: int = 64) -> None:
+        """Initialize pool and fork the workers.
+
+        Create the pool before starting any threads; forking a process that
+        runs other threads can deadlock the children.
+
+        Args:
+            workers: Number of worker processes.
+            min_chunk_size: Smallest chunk handed to a worker; batches that
+                would not fill two chunks are transformed in-process.
+        """
+        if workers <= 0:
+            raise ValueError("workers must be a positive integer")
+
+        self.workers = workers
+        self.min_chunk_size = max(min_chunk_size, 1)
+
+        # Load converters and dictionaries, then freeze them across the fork so
+        # garbage collections in the workers don't dirty the shared pages
+        list(transformer.transform_messages(_WARMUP_MESSAGES))
+        gc.collect()
+        gc.freeze()
+
+        method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(method),
+        )
+        try:
+            # With fork, all workers start on the first submit; do it now
+            self._executor.submit(_noop).result()
+        finally:
+            gc.unfreeze()
+
+    def transform_messages(
+        self,
+        messages: Iterable[dict[str, Any]],
+        on_error: Callable[[dict[str, Any], Exception], None] | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Drop-in replacement for transformer.transform_messages."""
+        batch = list(messages)
+        if len(batch) < 2 * self.min_chunk_size:
+            yield from transformer.transform_messages(batch, on_error=on_error)
+            return
+
+        chunk_size = max(math.ceil(len(batch) / self.workers), self.min_chunk_size)
+        chunks = [batch[i : i + chunk_size] for i in range(0, len(batch), chunk_size)]
+
+        offset = 0
+        for results in self._executor.map(_transform_chunk, chunks):
+            for msg, result in zip(batch[offset : offset + len(results)], results, strict=True):
+                if isinstance(result, Exception):
+                    if on_error is None:
+                        raise result
+                    on_error(msg, result)
+                else:
+                    yield result
+            offset += len(results)
+
+    def close(self) -> None:
+        """Shut down worker processes."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
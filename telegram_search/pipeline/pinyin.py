@@ -0,0 +1,323 @@
+"""Table-driven pinyin generation.
+
+Produces the same output as ``" ".join(lazy_pinyin(text))`` without loading
+pypinyin at runtime. pypinyin's character and phrase dictionaries are
+precomputed once into a small hash-table file that is either read into a
+dict or memory-mapped, so several crawler processes share one copy.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib.metadata
+import mmap
+import os
+import re
+import struct
+import subprocess
+import sys
+import zlib
+from pathlib import Path
+from typing import Any, Protocol
+
+from telegram_search.logging import get_logger
+
+logger = get_logger(__name__)
+
+_MAGIC = b"TSPY"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIIII")  # magic, version, slot count, meta length, entry count
+_HEADER_SIZE = 64
+_SLOT = struct.Struct("<II")  # key crc32, entry offset + 1 (0 marks an empty slot)
+_ENTRY = struct.Struct("<BBH")  # flags, key length, value length (bytes)
+
+# Entry flags
+PREFIX = 1  # Proper prefix of a dictionary phrase
+PHRASE = 2  # Dictionary phrase (the value is the phrase reading)
+
+
+class PinyinTable(Protocol):
+    """Lookup interface shared by the in-memory and mapped tables."""
+
+    def get(self, key: str) -> tuple[int, str] | None: ...
+
+
+def default_table_path() -> Path:
+    """Per-user cache location of the table for the installed pypinyin."""
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    version = importlib.metadata.version("pypinyin")
+    return cache_dir / "telegram_search" / f"pinyin-v{_VERSION}-{version}.bin"
+
+
+def _table_entries() -> tuple[str, dict[str, tuple[int, str]]]:
+    """Compute (han character class, entries) from pypinyin's dictionaries."""
+    from pypinyin import Style
+    from pypinyin.constants import PHRASES_DICT, PINYIN_DICT, RE_HANS
+    from pypinyin.converter import UltimateConverter
+
+    converter = UltimateConverter()
+
+    def reading(word: str) -> str:
+        items = converter.convert(word, Style.NORMAL, False, "default", True)
+        return " ".join(item[0] for item in items)
+
+    entries: dict[str, tuple[int, str]] = {}
+    for code in PINYIN_DICT:
+        char = chr(code)
+        entries[char] = (0, reading(char))
+    for phrase in PHRASES_DICT:
+        for end in range(2, len(phrase)):
+            prefix = phrase[:end]
+            if prefix not in entries:
+                entries[prefix] = (PREFIX, "")
+        flags, _ = entries.get(phrase, (0, ""))
+        entries[phrase] = (flags | PHRASE, reading(phrase))
+
+    # "^(?:[...])+$" -> "[...]"
+    pattern = RE_HANS.pattern
+    han_class = pattern[pattern.index("[") : pattern.rindex("]") + 1]
+    return han_class, entries
+
+
+def build_table(path: str | Path) -> None:
+    """Write the pinyin table file for the installed pypinyin.
+
+    This is the only place pypinyin is imported; run it in a separate process
+    (see :meth:`PinyinEngine.from_file`) to keep its dictionaries out of the
+    caller's memory.
+    """
+    path = Path(path)
+    han_class, entries = _table_entries()
+
+    slot_count = 1
+    while slot_count < 2 * len(entries):
+        slot_count <<= 1
+    slots = bytearray(slot_count * _SLOT.size)
+    blob = bytearray()
+    mask = slot_count - 1
+    for key, (flags, value) in entries.items():
+        key_bytes = key.encode("utf-8")
+        value_bytes = value.encode("utf-8")
+        crc = zlib.crc32(key_bytes)
+        i = crc & mask
+        while _SLOT.unpack_from(slots, i * _SLOT.size)[1]:
+            i = (i + 1) & mask
+        _SLOT.pack_into(slots, i * _SLOT.size, crc, len(blob) + 1)
+        blob += _ENTRY.pack(flags, len(key_bytes), len(value_bytes))
+        blob += key_bytes + value_bytes
+
+    meta = han_class.encode("utf-8")
+    meta += bytes(-len(meta) % _SLOT.size)
+    header = _HEADER.pack(_MAGIC, _VERSION, slot_count, len(meta), len(entries))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(_HEADER_SIZE, b"\0"))
+        f.write(meta)
+        f.write(slots)
+        f.write(blob)
+    os.replace(tmp_path, path)
+    logger.info("pinyin_table_built", path=str(path), entries=len(entries))
+
+
+class MappedPinyinTable:
+    """Read-only view of a table file through ``mmap``."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Map a table file.
+
+        Args:
+            path: File written by :func:`build_table`.
+
+        Raises:
+            ValueError: If the file is not a valid table.
+        """
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < _HEADER_SIZE:
+                raise ValueError(f"Invalid pinyin table: {path}")
+            magic, version, slots, meta_len, self.entry_count = _HEADER.unpack_from(self._mm)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"Invalid pinyin table: {path}")
+        except ValueError:
+            self._mm.close()
+            raise
+
+        self.han_class = self._mm[_HEADER_SIZE : _HEADER_SIZE + meta_len].rstrip(b"\0").decode()
+        self._mask = slots - 1
+        self._slot_base = _HEADER_SIZE + meta_len
+        self._blob_base = self._slot_base + slots * _SLOT.size
+
+    def _entry(self, offset: int) -> tuple[int, bytes, str]:
+        flags, key_len, value_len = _ENTRY.unpack_from(self._mm, offset)
+        start = offset + _ENTRY.size
+        key = self._mm[start : start + key_len]
+        value = self._mm[start + key_len : start + key_len + value_len].decode("utf-8")
+        return flags, key, value
+
+    def get(self, key: str) -> tuple[int, str] | None:
+        """Return ``(flags, reading)`` for ``key``, or None if absent."""
+        key_bytes = key.encode("utf-8")
+        crc = zlib.crc32(key_bytes)
+        i = crc & self._mask
+        while True:
+            slot_crc, offset = _SLOT.unpack_from(self._mm, self._slot_base + i * _SLOT.size)
+            if not offset:
+                return None
+            if slot_crc == crc:
+                flags, found, value = self._entry(self._blob_base + offset - 1)
+                if found == key_bytes:
+                    return flags, value
+            i = (i + 1) & self._mask
+
+    def to_dict(self) -> dict[str, tuple[int, str]]:
+        """Read every entry into a dict."""
+        entries: dict[str, tuple[int, str]] = {}
+        offset = self._blob_base
+        for _ in range(self.entry_count):
+            flags, key, value = self._entry(offset)
+            entries[key.decode("utf-8")] = (flags, value)
+            offset += _ENTRY.size + len(key) + len(value.encode("utf-8"))
+        return entries
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mm.close()
+
+
+class PinyinEngine:
+    """Convert text to space-separated toneless pinyin.
+
+    Text is split into runs of Han characters and other text. Other text is
+    kept as is; Han runs are segmented by forward maximum matching against
+    the phrase dictionary (as pypinyin's ``mmseg`` does) and each word is
+    replaced by its reading. Converted runs are memoized.
+    """
+
+    def __init__(
+        self,
+        table: PinyinTable,
+        han_class: str,
+        max_chars: int = 0,
+        cache_size: int = 65536,
+    ) -> None:
+        """Initialize engine.
+
+        Args:
+            table: Word lookup table.
+            han_class: Regex character class of characters that have pinyin.
+            max_chars: Only the first ``max_chars`` characters of a text are
+                converted (0 for no limit).
+            cache_size: Number of converted Han runs to memoize.
+        """
+        self._table = table
+        self._split = re.compile(f"({han_class}+)").split
+        self.max_chars = max_chars
+        self._convert_run = functools.lru_cache(maxsize=cache_size)(self._convert_run_uncached)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | Path | None = None,
+        use_mmap: bool = True,
+        **kwargs: Any,
+    ) -> PinyinEngine:
+        """Load an engine from a table file, building the file if needed.
+
+        A missing or invalid file is rebuilt in a child process, so pypinyin
+        is never imported into this one.
+
+        Args:
+            path: Table file (defaults to :func:`default_table_path`).
+            use_mmap: Share the table through ``mmap`` instead of reading it
+                into a dict. Lookups are slower but the pages are shared
+                between processes.
+            **kwargs: Passed to the constructor.
+        """
+        path = Path(path) if path else default_table_path()
+        try:
+            mapped = MappedPinyinTable(path)
+        except (OSError, ValueError):
+            # The child must import this package however the parent found it
+            env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in sys.path if p)}
+            try:
+                subprocess.run(
+                    [
+                        sys.executable,
+                        "-c",
+                        "import sys; from telegram_search.pipeline.pinyin import build_table; "
+                        "build_table(sys.argv[1])",
+                        str(path),
+                    ],
+                    check=True,
+                    env=env,
+                    capture_output=True,
+                    text=True,
+                )
+            except subprocess.CalledProcessError as e:
+                logger.error(
+                    "pinyin_table_build_failed",
+                    path=str(path),
+                    returncode=e.returncode,
+                    stderr=e.stderr[-2000:],
+                )
+                raise
+            mapped = MappedPinyinTable(path)
+
+        if use_mmap:
+            return cls(mapped, mapped.han_class, **kwargs)
+        entries = mapped.to_dict()
+        mapped.close()
+        return cls(entries, mapped.han_class, **kwargs)
+
+    def convert(self, text: str) -> str:
+        """Convert text, matching ``" ".join(lazy_pinyin(text))``."""
+        if self.max_chars > 0:
+            text = text[: self.max_chars]
+        parts = self._split(text)
+        for i in range(1, len(parts), 2):
+            parts[i] = self._convert_run(parts[i])
+        return " ".join(part for part in parts if part)
+
+    def _convert_run_uncached(self, run: str) -> str:
+        get = self._table.get
+        out: list[str] = []
+
+        def emit(word: str) -> None:
+            entry = get(word)
+            reading = entry[1] if entry else word
+            if reading:
+                out.append(reading)
+
+        size = len(run)
+        start = 0
+        while start < size:
+            entry = get(run[start])
+            last_valid = start + 1 if entry and entry[0] & PHRASE else 0
+            end = start + 2
+            while end <= size:
+                entry = get(run[start:end])
+                if entry is None:
+                    break
+                if entry[0] & PHRASE:
+                    last_valid = end
+                end += 1
+
+            if last_valid:
+                emit(run[start:last_valid])
+                start = last_valid
+            elif end > size:
+                # The rest is a phrase prefix but holds no phrase: one word per char
+                for char in run[start:]:
+                    emit(char)
+                break
+            else:
+                emit(run[start])
+                start += 1
+        return " ".join(out)
+
+    def cache_clear(self) -> None:
+        """Drop memoized runs."""
+        self._convert_run.cache_clear()
@@ -0,0 +1,173 @@
+"""Multi-index lookup structure for Simhash near-duplicate queries."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from telegram_search.pipeline import deduper
+
+
+class SimhashIndex:
+    """Bounded window of fingerprints with sub-linear Hamming-radius lookups.
+
+    The 64-bit fingerprint is split into ``threshold + 1`` blocks. By the
+    pigeonhole principle, two fingerprints within ``threshold`` differing bits
+    must agree exactly on at least one block, so a query only needs to compare
+    against entries sharing one of its block values instead of the whole window.
+
+    Fingerprints are kept in a preallocated ``uint64`` ring buffer; entries
+    are evicted in insertion order once ``max_size`` is exceeded, mirroring a
+    ``deque(maxlen=max_size)``.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        threshold: int = 3,
+        bits: int = 64,
+        warm_step: int = 256,
+    ) -> None:
+        """Initialize index.
+
+        Args:
+            max_size: Maximum number of fingerprints kept in the window.
+            threshold: Max Hamming distance considered a duplicate.
+            bits: Fingerprint width in bits.
+            warm_step: Entries moved into the block tables per operation after
+                :meth:`load`.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+        if threshold < 0 or threshold >= bits:
+            raise ValueError("threshold must be in [0, bits)")
+
+        self.max_size = max_size
+        self.threshold = threshold
+        self.bits = bits
+        self.warm_step = max(warm_step, 1)
+
+        # (shift, mask) pairs covering all bits with threshold + 1 blocks
+        num_blocks = threshold + 1
+        base, extra = divmod(bits, num_blocks)
+        self._blocks: list[tuple[int, int]] = []
+        shift = 0
+        for i in range(num_blocks):
+            width = base + (1 if i < extra else 0)
+            self._blocks.append((shift, (1 << width) - 1))
+            shift += width
+
+        # One table per block: block value -> fingerprints sharing that block
+        self._tables: list[dict[int, list[int]]] = [{} for _ in self._blocks]
+        self._ring = np.zeros(max_size, dtype=np.uint64)
+        self._head = 0
+        self._count = 0
+        # Ring slots [_cold_start, _cold_end) are loaded but not yet in the tables
+        self._cold_start = 0
+        self._cold_end = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _keys(self, fingerprint: int) -> list[int]:
+        return [(fingerprint >> shift) & mask for shift, mask in self._blocks]
+
+    def add(self, fingerprint: int) -> None:
+        """Add a fingerprint, evicting the oldest one if the window is full."""
+        if self._count >= self.max_size:
+            if self._cold_start < self._cold_end and self._head == self._cold_start:
+                # Evicting a loaded entry that never made it into the tables
+                self._cold_start += 1
+            else:
+                self._remove(int(self._ring[self._head]))
+        else:
+            self._count += 1
+
+        self._ring[self._head] = fingerprint
+        self._head = (self._head + 1) % self.max_size
+        self._insert(fingerprint)
+        self._warm(self.warm_step)
+
+    def _insert(self, fingerprint: int) -> None:
+        for table, key in zip(self._tables, self._keys(fingerprint), strict=True):
+            bucket = table.get(key)
+            if bucket is None:
+                table[key] = [fingerprint]
+            else:
+                bucket.append(fingerprint)
+
+    def _remove(self, fingerprint: int) -> None:
+        for table, key in zip(self._tables, self._keys(fingerprint), strict=True):
+            bucket = table[key]
+            if len(bucket) > 1:
+                bucket.remove(fingerprint)
+            else:
+                del table[key]
+
+    def contains_near(self, fingerprint: int) -> bool:
+        """Check whether any fingerprint within ``threshold`` bits is indexed."""
+        threshold = self.threshold
+        for table, key in zip(self._tables, self._keys(fingerprint), strict=True):
+            bucket = table.get(key)
+            if not bucket:
+                continue
+            for candidate in bucket:
+                if (candidate ^ fingerprint).bit_count() <= threshold:
+                    return True
+
+        if self._cold_start < self._cold_end:
+            cold = self._ring[self._cold_start : self._cold_end]
+            found = bool(deduper.distances(cold, fingerprint).min() <= threshold)
+            self._warm(self.warm_step)
+            return found
+        return False
+
+    def load(self, fingerprints: np.ndarray) -> None:
+        """Replace the window with ``fingerprints`` (oldest first).
+
+        Loading is a single array copy. Entries are moved into the block tables
+        a few at a time by later :meth:`add` and :meth:`contains_near` calls;
+        until then they are covered by a vectorized scan, so lookups stay exact
+        while the index warms up.
+        """
+        self.clear()
+        fingerprints = np.asarray(fingerprints, dtype=np.uint64)[-self.max_size :]
+        count = len(fingerprints)
+        self._ring[:count] = fingerprints
+        self._count = count
+        self._head = count % self.max_size
+        self._cold_end = count
+
+    def _warm(self, step: int) -> None:
+        if self._cold_start >= self._cold_end:
+            return
+        stop = min(self._cold_start + step, self._cold_end)
+        for fingerprint in self._ring[self._cold_start : stop].tolist():
+            self._insert(fingerprint)
+        self._cold_start = stop
+
+    def warm(self) -> None:
+        """Move all loaded entries into the block tables now."""
+        self._warm(self._cold_end - self._cold_start)
+
+    def fingerprints(self) -> np.ndarray:
+        """Return the window as a ``uint64`` array, oldest first."""
+        if self._count < self.max_size:
+            return self._ring[: self._count]
+        return np.roll(self._ring, -self._head)
+
+    def distances(self, fingerprint: int) -> np.ndarray:
+        """Hamming distances from ``fingerprint`` to every entry in the window.
+
+        Unlike :meth:`contains_near`, this is a vectorized brute-force pass and
+        works for any radius, not just ``threshold``.
+        """
+        return deduper.distances(self._ring[: self._count], fingerprint)
+
+    def clear(self) -> None:
+        """Drop all indexed fingerprints."""
+        for table in self._tables:
+            table.clear()
+        self._head = 0
+        self._count = 0
+        self._cold_start = 0
+        self._cold_end = 0
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
+from typing import Any
 
 from telegram_search.models.message import MessageDoc
 from telegram_search.pipeline import normalizer, deduper
 
+# Never present in normalized text, which has all whitespace collapsed
+_BATCH_SEPARATOR = "\n"
+
 
 def transform_message(
     chat_id: int,
@@ -17,13 +22,23 @@ def transform_message(
     chat_username: str = "",
     url: str | None = None,
     media_type: str | None = None,
+    text_norm: str | None = None,
 ) -> MessageDoc:
-    """Transform raw message to MessageDoc."""
-    text_norm = normalizer.normalize(text)
-    simp = normalizer.to_simplified(text_norm)
-    trad = normalizer.to_traditional(text_norm)
-    pinyin = normalizer.to_pinyin(simp)
-    simhash = deduper.compute_simhash(text_norm)
+    """Transform raw message to MessageDoc.
+
+    ``text_norm`` may be passed when the caller already normalized ``text``.
+    """
+    if text_norm is None:
+        text_norm = normalizer.normalize(text)
+    script = normalizer.classify_script(text_norm)
+    if script.has_han:
+        simp = normalizer.to_simplified(text_norm)
+        trad = normalizer.to_traditional(text_norm)
+        pinyin = normalizer.to_pinyin(simp)
+    else:
+        # Nothing to convert
+        simp = trad = pinyin = text_norm
+    simhash = deduper.simhash_value(text_norm)
 
     # Generate permalink if username available
     if not url and chat_username:
@@ -42,6 +57,112 @@ def transform_message(
         trad=trad,
         simp=simp,
         simhash=simhash,
+        script=script.script,
+        han_count=script.han_count,
         url=url,
         media_type=media_type,
     )
+
+
+def _convert_batch(convert: Callable[[str], str], texts: list[str]) -> list[str]:
+    """Run a text conversion over many texts with a single call."""
+    if len(texts) > 1:
+        converted = convert(_BATCH_SEPARATOR.join(texts)).split(_BATCH_SEPARATOR)
+        if len(converted) == len(texts):
+            return converted
+    return [convert(text) for text in texts]
+
+
+def _timestamp(value: Any) -> int:
+    """Convert a message date to a Unix timestamp."""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def transform_messages(
+    messages: Iterable[dict[str, Any]],
+    on_error: Callable[[dict[str, Any], Exception], None] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Transform a batch of raw messages to index-ready dictionaries.
+
+    Produces the same documents as ``transform_message(...).to_index_dict()``,
+    except that ``simhash`` stays an integer for the dedup stage
+    (IndexSchema.shape formats it for the index), but normalizes the whole
+    batch up front, runs the Traditional/Simplified
+    conversions once over the joined Han-bearing texts, computes derived
+    fields once per distinct text and skips pydantic validation. Messages may
+    carry a precomputed ``text_norm``.
+
+    Args:
+        messages: Raw message dictionaries (as passed to transform_message).
+        on_error: Called with the message and exception when a message cannot
+            be transformed. If omitted, the exception is raised.
+
+    Yields:
+        Index dictionaries, in input order, skipping failed messages.
+    """
+    batch = list(messages)
+    norms = [
+        msg.get("text_norm") or normalizer.normalize(msg.get("text") or "")
+        for msg in batch
+    ]
+
+    scripts = {norm: normalizer.classify_script(norm) for norm in norms}
+    unique = [norm for norm, script in scripts.items() if script.has_han]
+    conversions = dict(
+        zip(
+            unique,
+            zip(
+                _convert_batch(normalizer.to_simplified, unique),
+                _convert_batch(normalizer.to_traditional, unique),
+                strict=True,
+            ),
+            strict=True,
+        )
+    )
+    variants: dict[str, tuple[str, str, str, int]] = {}
+
+    for msg, text_norm in zip(batch, norms, strict=True):
+        try:
+            chat_id = int(msg["chat_id"])
+            msg_id = int(msg["msg_id"])
+            script = scripts[text_norm]
+            if text_norm not in variants:
+                if script.has_han:
+                    simp, trad = conversions[text_norm]
+                    pinyin = normalizer.to_pinyin(simp)
+                else:
+                    simp = trad = pinyin = text_norm
+                variants[text_norm] = (simp, trad, pinyin, deduper.simhash_value(text_norm))
+            simp, trad, pinyin, simhash = variants[text_norm]
+            chat_username = msg.get("chat_username") or ""
+            url = msg.get("url")
+            if not url and chat_username:
+                url = f"https://t.me/{chat_username}/{msg_id}"
+            doc = {
+                "id": f"{chat_id}_{msg_id}",
+                "chat_id": chat_id,
+                "chat_title": msg.get("chat_title") or "",
+                "chat_username": chat_username,
+                "msg_id": msg_id,
+                "date": _timestamp(msg["date"]),
+                "text": msg.get("text") or "",
+                "text_norm": text_norm,
+                "pinyin": pinyin,
+                "trad": trad,
+                "simp": simp,
+                "simhash": simhash,
+                "script": script.script,
+                "han_count": script.han_count,
+                "url": url,
+                "media_type": msg.get("media_type"),
+            }
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(msg, e)
+            continue
+        yield doc
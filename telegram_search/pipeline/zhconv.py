@@ -0,0 +1,151 @@
+"""Table-driven Traditional/Simplified Chinese converter.
+
+Produces the same output as ``opencc-python-reimplemented`` from the same
+dictionaries, but the character mapping is a ``str.translate`` table and
+phrase matching only runs on segments that can contain a phrase.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import re
+from pathlib import Path
+
+import opencc
+
+_OPENCC_DIR = Path(opencc.__file__).parent
+
+# Sentence separators used by OpenCC; text is converted between them only
+_SEPARATOR_RE = re.compile(
+    r"(\s+|-|,|\.|\?|!|\*|　|，|。|、|；|：|？|！|…|“|”|‘|’|『|』|「|」|﹁|﹂|—|－|（|）|《|》|〈"
+    r"|〉|～|．|／|＼|︒|︑|︔|︓|︿|﹀|︹|︺|︙|︐|［|﹇|］|﹈|︕|︖|︰|︳|︴|︽|︾|︵|︶|｛|︷|｝"
+    r"|︸|﹃|﹄|【|︻|】|︼)"
+)
+
+
+def _load_dictionary(path: Path) -> dict[str, str]:
+    """Load an OpenCC text dictionary, keeping the first candidate per key."""
+    mapping: dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            key, value = line.strip().split("\t")
+            mapping[key] = value.split(" ")[0]
+    return mapping
+
+
+class ChineseConverter:
+    """Convert text with a phrase dictionary and a character table.
+
+    Within each separator-delimited segment, the longest phrase found anywhere
+    is replaced first (leftmost on ties) and the text on either side is
+    handled the same way; whatever no phrase covers is mapped per character.
+    This is the order OpenCC's parse tree applies a phrase/character group in.
+    """
+
+    def __init__(
+        self,
+        phrases: dict[str, str],
+        characters: dict[str, str],
+        cache_size: int = 65536,
+    ) -> None:
+        """Initialize converter.
+
+        Args:
+            phrases: Multi-character phrase mapping.
+            characters: Single-character mapping.
+            cache_size: Number of converted segments to memoize.
+        """
+        self._phrases = phrases
+        self._table = str.maketrans(characters)
+        # Longest phrase starting with each character
+        self._max_len: dict[str, int] = {}
+        for key in phrases:
+            if len(key) > self._max_len.get(key[0], 1):
+                self._max_len[key[0]] = len(key)
+        self._convert_segment = functools.lru_cache(maxsize=cache_size)(self._convert_uncached)
+
+    @classmethod
+    def from_opencc(cls, conversion: str, cache_size: int = 65536) -> ChineseConverter:
+        """Build a converter from a bundled OpenCC configuration (e.g. "s2t").
+
+        Only configurations made of a single phrase/character group, such as
+        ``s2t`` and ``t2s``, are supported.
+        """
+        with open(_OPENCC_DIR / "config" / f"{conversion}.json", encoding="utf-8") as f:
+            config = json.load(f)
+
+        chain = config["conversion_chain"]
+        if len(chain) != 1 or chain[0]["dict"].get("type") != "group":
+            raise ValueError(f"Unsupported OpenCC conversion: {conversion}")
+
+        phrases: dict[str, str] = {}
+        characters: dict[str, str] = {}
+        for item in chain[0]["dict"]["dicts"]:
+            mapping = _load_dictionary(_OPENCC_DIR / "dictionary" / item["file"])
+            if all(len(key) == 1 for key in mapping):
+                characters.update({k: v for k, v in mapping.items() if k not in characters})
+            elif not characters:
+                phrases.update({k: v for k, v in mapping.items() if k not in phrases})
+            else:
+                raise ValueError(f"Unsupported OpenCC conversion: {conversion}")
+        return cls(phrases, characters, cache_size=cache_size)
+
+    def convert(self, text: str) -> str:
+        """Convert text."""
+        parts = _SEPARATOR_RE.split(text)
+        for i in range(0, len(parts), 2):
+            if parts[i]:
+                parts[i] = self._convert_segment(parts[i])
+        return "".join(parts)
+
+    def _convert_uncached(self, segment: str) -> str:
+        max_len = self._max_len
+        phrases = self._phrases
+        size = len(segment)
+
+        # Phrase lengths matching at each position, longest first
+        matches: dict[int, list[int]] = {}
+        for i, char in enumerate(segment):
+            longest = max_len.get(char)
+            if longest is None:
+                continue
+            for length in range(min(longest, size - i), 1, -1):
+                if segment[i : i + length] in phrases:
+                    matches.setdefault(i, []).append(length)
+
+        if not matches:
+            return segment.translate(self._table)
+
+        spans: list[tuple[int, int]] = []
+        stack = [(0, size)]
+        while stack:
+            start, end = stack.pop()
+            best_pos, best_len = -1, 0
+            for pos in range(start, end):
+                for length in matches.get(pos, ()):
+                    if pos + length <= end:
+                        if length > best_len:
+                            best_pos, best_len = pos, length
+                        break
+            if best_pos < 0:
+                continue
+            spans.append((best_pos, best_pos + best_len))
+            stack.append((start, best_pos))
+            stack.append((best_pos + best_len, end))
+
+        spans.sort()
+        out: list[str] = []
+        cursor = 0
+        for start, end in spans:
+            if cursor < start:
+                out.append(segment[cursor:start].translate(self._table))
+            out.append(phrases[segment[start:end]])
+            cursor = end
+        if cursor < size:
+            out.append(segment[cursor:].translate(self._table))
+        return "".join(out)
+
+    def cache_clear(self) -> None:
+        """Drop memoized segments."""
+        self._convert_segment.cache_clear()
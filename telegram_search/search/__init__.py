@@ -1,6 +1,15 @@
 """Search module."""
 
-from .meili_client import MeiliClient
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+from .meili_client import AsyncMeiliClient, MeiliApiError, MeiliClient
 from .search_service import SearchService
 
-__all__ = ["MeiliClient", "SearchService"]
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CircuitState",
+    "AsyncMeiliClient",
+    "MeiliApiError",
+    "MeiliClient",
+    "SearchService",
+]
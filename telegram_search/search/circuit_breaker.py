@@ -0,0 +1,198 @@
+"""Circuit breaker for calls to the search backend."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from enum import StrEnum
+from typing import Any
+
+from telegram_search.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitState(StrEnum):
+    """Breaker state. Numeric codes are reported alongside for dashboards."""
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    @property
+    def code(self) -> int:
+        return _STATE_CODES[self]
+
+
+_STATE_CODES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the backend while the breaker is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fail fast once an operation's recent calls are mostly failing or slow.
+
+    Outcomes of the last ``window`` calls are kept; a call counts as bad if
+    it raised or took longer than ``slow_call_threshold`` seconds. Once at
+    least ``min_calls`` outcomes are recorded and the bad fraction reaches
+    ``failure_rate``, the breaker opens and :meth:`before_call` raises
+    CircuitOpenError for ``open_timeout`` seconds. After that it half-opens:
+    up to ``half_open_probes`` calls are let through, and the breaker closes
+    when they all succeed or re-opens on the first bad one.
+
+    The breaker is thread-safe so one instance can guard a client used from
+    several worker threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        slow_call_threshold: float = 2.0,
+        open_timeout: float = 30.0,
+        half_open_probes: int = 1,
+    ) -> None:
+        """Initialize breaker.
+
+        Args:
+            name: Operation name used in errors and logs.
+            failure_rate: Fraction of bad calls in the window that opens it.
+            window: Number of recent calls considered.
+            min_calls: Calls needed in the window before it can open.
+            slow_call_threshold: Seconds after which a successful call still
+                counts as bad. 0 disables the latency check.
+            open_timeout: Seconds to stay open before probing.
+            half_open_probes: Probe calls allowed while half-open.
+        """
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        if window <= 0 or half_open_probes <= 0:
+            raise ValueError("window and half_open_probes must be positive integers")
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min(max(min_calls, 1), window)
+        self.slow_call_threshold = slow_call_threshold
+        self.open_timeout = open_timeout
+        self.half_open_probes = half_open_probes
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._bad = 0
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def before_call(self) -> None:
+        """Reserve a call slot.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with all
+                probe slots taken.
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state is CircuitState.CLOSED:
+                return
+            if self._state is CircuitState.HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return
+            retry_after = max(self._opened_at + self.open_timeout - time.monotonic(), 0.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self, elapsed: float) -> None:
+        """Record a call that returned after ``elapsed`` seconds."""
+        slow = 0 < self.slow_call_threshold < elapsed
+        self._record(bad=slow)
+
+    def record_failure(self) -> None:
+        """Record a call that raised."""
+        self._record(bad=True)
+
+    def release(self) -> None:
+        """Give back the slot of a call that ended without an outcome.
+
+        For calls that were cancelled or interrupted (a BaseException other
+        than Exception): nothing is recorded, but a half-open probe slot is
+        freed so the next caller can probe instead of failing fast forever.
+        """
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current state and window statistics, for metrics and health checks."""
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._outcomes)
+            return {
+                "state": self._state.value,
+                "state_code": self._state.code,
+                "calls": calls,
+                "failure_rate": self._bad / calls if calls else 0.0,
+            }
+
+    def _record(self, bad: bool) -> None:
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN:
+                if bad:
+                    self._transition(CircuitState.OPEN)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(CircuitState.CLOSED)
+                return
+            if self._state is CircuitState.OPEN:
+                # Late result of a call started before the breaker opened
+                return
+
+            if len(self._outcomes) == self._outcomes.maxlen:
+                self._bad -= self._outcomes[0]
+            self._outcomes.append(bad)
+            self._bad += bad
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and self._bad / calls >= self.failure_rate:
+                self._transition(CircuitState.OPEN)
+
+    def _maybe_half_open(self) -> None:
+        if (
+            self._state is CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_timeout
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        """Switch state; the caller holds the lock."""
+        calls = len(self._outcomes)
+        failure_rate = self._bad / calls if calls else 0.0
+        self._state = state
+        self._probes = 0
+        self._probe_successes = 0
+        if state is CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        elif state is CircuitState.CLOSED:
+            self._outcomes.clear()
+            self._bad = 0
+        log = logger.warning if state is CircuitState.OPEN else logger.info
+        log(
+            "circuit_state_changed",
+            circuit=self.name,
+            state=state.value,
+            state_code=state.code,
+            failure_rate=round(failure_rate, 3),
+        )
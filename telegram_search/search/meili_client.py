@@ -2,48 +2,192 @@
 
 from __future__ import annotations
 
+import asyncio
 import functools
+import random
 import time
-from typing import Any, Callable, TypeVar
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, TypeVar
 
+import aiohttp
 import meilisearch
+import requests
 from telegram_search.config import MeilisearchConfig
 from telegram_search.logging import get_logger, safe_error
+from telegram_search.search.circuit_breaker import CircuitBreaker
+from telegram_search.search.payload import (
+    CONTENT_ENCODINGS,
+    NDJSON_CONTENT_TYPE,
+    encode_documents,
+)
 
 logger = get_logger(__name__)
 
 T = TypeVar("T")
 
+OPERATIONS = ("search", "write", "tasks")
 
-def with_retry(func: Callable[..., T]) -> Callable[..., T]:
-    """Retry decorator with exponential backoff."""
-    @functools.wraps(func)
-    def wrapper(self: MeiliClient, *args: Any, **kwargs: Any) -> T:
-        retries = 0
-        while True:
-            try:
-                return func(self, *args, **kwargs)
-            except Exception as e:
-                if retries >= self._max_retries:
-                    logger.error(
-                        "meili_request_failed",
+
+class MeiliApiError(Exception):
+    """Error response returned by the Meilisearch HTTP API."""
+
+    def __init__(self, status_code: int, code: str | None, message: str) -> None:
+        super().__init__(f"{status_code} {code}: {message}")
+        self.status_code = status_code
+        self.code = code
+
+
+def is_backend_failure(e: Exception) -> bool:
+    """Whether an error reflects backend health rather than a bad request."""
+    status = getattr(e, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return True
+
+
+def _is_transient(e: Exception) -> bool:
+    """Whether a failed async request is worth retrying."""
+    if isinstance(e, MeiliApiError):
+        return is_backend_failure(e)
+    return isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def _ndjson_headers(encoding: str) -> dict[str, str]:
+    headers = {"Content-Type": NDJSON_CONTENT_TYPE}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+def _upload_settings(config: MeilisearchConfig) -> tuple[str, str]:
+    """Validated (format, compression) for document uploads."""
+    if config.upload_format not in ("json", "ndjson"):
+        raise ValueError(f"Unsupported upload_format: {config.upload_format!r}")
+    if config.upload_compression not in CONTENT_ENCODINGS:
+        raise ValueError(f"Unsupported upload_compression: {config.upload_compression!r}")
+    if config.upload_compression and config.upload_format != "ndjson":
+        raise ValueError("upload_compression requires upload_format = 'ndjson'")
+    return config.upload_format, config.upload_compression
+
+
+def _make_breakers(config: MeilisearchConfig) -> dict[str, CircuitBreaker]:
+    """One breaker per operation type, so failing writes do not block search."""
+    return {
+        operation: CircuitBreaker(
+            f"meili_{operation}",
+            failure_rate=config.breaker_failure_rate,
+            window=config.breaker_window,
+            min_calls=config.breaker_min_calls,
+            slow_call_threshold=config.breaker_slow_call,
+            open_timeout=config.breaker_open_timeout,
+        )
+        for operation in OPERATIONS
+    }
+
+
+def with_retry(operation: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Retry decorator with exponential backoff, guarded by a circuit breaker.
+
+    Requests Meilisearch rejected (4xx other than 429) are not retried. Every
+    attempt is recorded on the breaker for ``operation``; while it is
+    open the call fails fast with CircuitOpenError instead of retrying.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(self: MeiliClient, *args: Any, **kwargs: Any) -> T:
+            breaker = self._breakers[operation]
+            retries = 0
+            while True:
+                breaker.before_call()
+                start = time.monotonic()
+                try:
+                    result = func(self, *args, **kwargs)
+                except Exception as e:
+                    if is_backend_failure(e):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success(time.monotonic() - start)
+                    if retries >= self._max_retries or not is_backend_failure(e):
+                        logger.error(
+                            "meili_request_failed",
+                            method=func.__name__,
+                            **safe_error(e),
+                            retries=retries,
+                        )
+                        raise
+
+                    wait_time = (2 ** retries) * 0.1
+                    logger.warning(
+                        "meili_retry_attempt",
                         method=func.__name__,
+                        attempt=retries + 1,
+                        wait_time=wait_time,
                         **safe_error(e),
-                        retries=retries,
                     )
+                    time.sleep(wait_time)
+                    retries += 1
+                except BaseException:
+                    breaker.release()
                     raise
+                else:
+                    breaker.record_success(time.monotonic() - start)
+                    return result
+        return wrapper
+    return decorator
+
 
-                wait_time = (2 ** retries) * 0.1
-                logger.warning(
-                    "meili_retry_attempt",
-                    method=func.__name__,
-                    attempt=retries + 1,
-                    wait_time=wait_time,
-                    **safe_error(e),
-                )
-                time.sleep(wait_time)
-                retries += 1
-    return wrapper
+def with_async_retry(
+    operation: str,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Async retry decorator with jittered exponential backoff.
+
+    Only transient failures (connection errors, timeouts, 429 and 5xx) are
+    retried; the wait is drawn uniformly from ``[0, 0.1 * 2**attempt]`` so
+    concurrent callers do not retry in lockstep. Attempts are guarded by the
+    circuit breaker for ``operation`` like :func:`with_retry`.
+    """
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(self: AsyncMeiliClient, *args: Any, **kwargs: Any) -> T:
+            breaker = self._breakers[operation]
+            retries = 0
+            while True:
+                breaker.before_call()
+                start = time.monotonic()
+                try:
+                    result = await func(self, *args, **kwargs)
+                except Exception as e:
+                    if is_backend_failure(e):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success(time.monotonic() - start)
+                    if retries >= self._max_retries or not _is_transient(e):
+                        logger.error(
+                            "meili_request_failed",
+                            method=func.__name__,
+                            **safe_error(e),
+                            retries=retries,
+                        )
+                        raise
+
+                    wait_time = random.uniform(0, (2 ** retries) * 0.1)
+                    logger.warning(
+                        "meili_retry_attempt",
+                        method=func.__name__,
+                        attempt=retries + 1,
+                        wait_time=wait_time,
+                        **safe_error(e),
+                    )
+                    await asyncio.sleep(wait_time)
+                    retries += 1
+                except BaseException:
+                    breaker.release()
+                    raise
+                else:
+                    breaker.record_success(time.monotonic() - start)
+                    return result
+        return wrapper
+    return decorator
 
 
 class MeiliClient:
@@ -59,24 +203,110 @@ class MeiliClient:
         self._index_name = config.index_name
         self._index = self._client.index(self._index_name)
         self._max_retries = config.max_retries
+        self._breakers = _make_breakers(config)
+        self._host = config.host.rstrip("/")
+        self._timeout = config.timeout
+        self._upload_format, self._upload_compression = _upload_settings(config)
+        # The SDK shares one header dict across calls, so compressed uploads
+        # go through a session of our own
+        self._http = requests.Session()
+        if config.api_key:
+            self._http.headers["Authorization"] = f"Bearer {config.api_key}"
+
+    def breaker_states(self) -> dict[str, dict[str, Any]]:
+        """Circuit breaker state per operation type."""
+        return {op: breaker.snapshot() for op, breaker in self._breakers.items()}
 
-    @with_retry
+    @with_retry("write")
     def create_index(self) -> None:
         """Create index if not exists."""
         self._client.create_index(self._index_name, {"primaryKey": "id"})
 
-    @with_retry
+    @with_retry("write")
     def configure_index(self, settings: dict[str, Any]) -> None:
         """Update index settings."""
         self._index.update_settings(settings)
 
-    @with_retry
-    def add_documents(self, docs: list[dict]) -> None:
-        """Add documents to index."""
-        if docs:
-            self._index.add_documents(docs)
+    def add_documents(self, docs: Iterable[dict[str, Any]]) -> int | None:
+        """Add documents to index.
+
+        Documents are sent as a JSON array, or as NDJSON when
+        ``upload_format`` is ``"ndjson"`` (see :meth:`add_documents_ndjson`).
+
+        Returns:
+            Uid of the enqueued indexing task, or None if there was nothing
+            to add. The documents are searchable once the task has succeeded.
+        """
+        if self._upload_format == "ndjson":
+            return self.add_documents_ndjson(docs)
+        docs = docs if isinstance(docs, list) else list(docs)
+        if not docs:
+            return None
+        return self._add_documents_json(docs)
+
+    @with_retry("write")
+    def _add_documents_json(self, docs: list[dict[str, Any]]) -> int:
+        return self._index.add_documents(docs).task_uid
 
-    @with_retry
+    def add_documents_ndjson(
+        self,
+        docs: Iterable[dict[str, Any]],
+        encoding: str | None = None,
+    ) -> int | None:
+        """Add documents to index as a (compressed) NDJSON upload.
+
+        Documents are serialized incrementally, so ``docs`` may be a
+        generator; only the finished, compressed body is held in memory.
+
+        Args:
+            docs: Documents to add.
+            encoding: ``"gzip"``, ``"deflate"`` or ``""``; defaults to the
+                configured ``upload_compression``.
+
+        Returns:
+            Uid of the enqueued indexing task, or None if ``docs`` was empty.
+        """
+        encoding = self._upload_compression if encoding is None else encoding
+        body, count = encode_documents(docs, encoding)
+        if not count:
+            return None
+        return self._post_ndjson(body, encoding)
+
+    @with_retry("write")
+    def _post_ndjson(self, body: bytes, encoding: str) -> int:
+        resp = self._http.post(
+            f"{self._host}/indexes/{self._index_name}/documents",
+            data=body,
+            headers=_ndjson_headers(encoding),
+            timeout=self._timeout,
+        )
+        if resp.status_code >= 400:
+            try:
+                error = resp.json()
+            except ValueError:
+                error = {}
+            raise MeiliApiError(resp.status_code, error.get("code"), error.get("message", ""))
+        return int(resp.json()["taskUid"])
+
+    @with_retry("tasks")
+    def get_task_statuses(self, task_uids: list[int]) -> dict[int, dict[str, Any]]:
+        """Fetch the status of several tasks with one request.
+
+        Returns:
+            Mapping of task uid to ``{"status": ..., "error": ...}`` for every
+            task Meilisearch knows about.
+        """
+        if not task_uids:
+            return {}
+        page = self._client.get_tasks(
+            {"uids": [str(uid) for uid in task_uids], "limit": len(task_uids)}
+        )
+        return {
+            task.uid: {"status": task.status, "error": task.error}
+            for task in page.results
+        }
+
+    @with_retry("search")
     def search(
         self,
         query: str,
@@ -95,3 +325,226 @@ class MeiliClient:
         if sort:
             params["sort"] = sort
         return self._index.search(query, params)
+
+    @with_retry("search")
+    def federated_search(
+        self,
+        queries: list[str],
+        limit: int = 20,
+        offset: int = 0,
+        filters: str | list[str] | None = None,
+        sort: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Search several query strings and merge the hits into one page.
+
+        Meilisearch ranks the merged hits and returns each document once.
+        """
+        params: dict[str, Any] = {"indexUid": self._index_name}
+        if filters:
+            params["filter"] = filters
+        if sort:
+            params["sort"] = sort
+        return self._client.multi_search(
+            [{**params, "q": query} for query in queries],
+            federation={"limit": limit, "offset": offset},
+        )
+
+
+class AsyncMeiliClient:
+    """Asyncio-native Meilisearch client with the same surface as MeiliClient.
+
+    Requests go through one aiohttp session whose connector keeps up to
+    ``pool_size`` keep-alive connections open, so concurrent callers share
+    connections instead of each blocking a worker thread. The session is
+    created on first use inside the running event loop; call :meth:`close`
+    (or use ``async with``) when done.
+    """
+
+    def __init__(self, config: MeilisearchConfig) -> None:
+        """Initialize client with config."""
+        self._host = config.host.rstrip("/")
+        self._headers = {"Content-Type": "application/json"}
+        if config.api_key:
+            self._headers["Authorization"] = f"Bearer {config.api_key}"
+        self._timeout = aiohttp.ClientTimeout(total=config.timeout)
+        self._pool_size = config.pool_size
+        self._keepalive_timeout = config.keepalive_timeout
+        self._index_name = config.index_name
+        self._max_retries = config.max_retries
+        self._breakers = _make_breakers(config)
+        self._upload_format, self._upload_compression = _upload_settings(config)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> AsyncMeiliClient:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_size,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self._headers,
+                timeout=self._timeout,
+            )
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        payload: Any = None,
+        params: dict[str, str] | None = None,
+        data: bytes | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Any:
+        """Send a request and return the decoded JSON body.
+
+        ``payload`` is sent as JSON; ``data`` is sent as-is with ``headers``.
+        """
+        async with self._get_session().request(
+            method,
+            f"{self._host}{path}",
+            json=payload,
+            params=params,
+            data=data,
+            headers=headers,
+        ) as resp:
+            body = await resp.json(content_type=None) if resp.content_length != 0 else None
+            if resp.status >= 400:
+                body = body if isinstance(body, dict) else {}
+                raise MeiliApiError(resp.status, body.get("code"), body.get("message", ""))
+            return body
+
+    def breaker_states(self) -> dict[str, dict[str, Any]]:
+        """Circuit breaker state per operation type."""
+        return {op: breaker.snapshot() for op, breaker in self._breakers.items()}
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @with_async_retry("write")
+    async def create_index(self) -> None:
+        """Create index if not exists."""
+        await self._request("POST", "/indexes", {"uid": self._index_name, "primaryKey": "id"})
+
+    @with_async_retry("write")
+    async def configure_index(self, settings: dict[str, Any]) -> None:
+        """Update index settings."""
+        await self._request("PATCH", f"/indexes/{self._index_name}/settings", settings)
+
+    async def add_documents(self, docs: Iterable[dict[str, Any]]) -> int | None:
+        """Add documents to index.
+
+        Returns:
+            Uid of the enqueued indexing task, or None if there was nothing
+            to add.
+        """
+        if self._upload_format == "ndjson":
+            return await self.add_documents_ndjson(docs)
+        docs = docs if isinstance(docs, list) else list(docs)
+        if not docs:
+            return None
+        return await self._add_documents_json(docs)
+
+    @with_async_retry("write")
+    async def _add_documents_json(self, docs: list[dict[str, Any]]) -> int:
+        task = await self._request("POST", f"/indexes/{self._index_name}/documents", docs)
+        return int(task["taskUid"])
+
+    async def add_documents_ndjson(
+        self,
+        docs: Iterable[dict[str, Any]],
+        encoding: str | None = None,
+    ) -> int | None:
+        """Add documents to index as a (compressed) NDJSON upload.
+
+        See :meth:`MeiliClient.add_documents_ndjson`.
+        """
+        encoding = self._upload_compression if encoding is None else encoding
+        body, count = encode_documents(docs, encoding)
+        if not count:
+            return None
+        return await self._post_ndjson(body, encoding)
+
+    @with_async_retry("write")
+    async def _post_ndjson(self, body: bytes, encoding: str) -> int:
+        task = await self._request(
+            "POST",
+            f"/indexes/{self._index_name}/documents",
+            data=body,
+            headers=_ndjson_headers(encoding),
+        )
+        return int(task["taskUid"])
+
+    @with_async_retry("tasks")
+    async def get_task_statuses(self, task_uids: list[int]) -> dict[int, dict[str, Any]]:
+        """Fetch the status of several tasks with one request."""
+        if not task_uids:
+            return {}
+        page = await self._request(
+            "GET",
+            "/tasks",
+            params={"uids": ",".join(map(str, task_uids)), "limit": str(len(task_uids))},
+        )
+        return {
+            task["uid"]: {"status": task["status"], "error": task.get("error")}
+            for task in page["results"]
+        }
+
+    @with_async_retry("search")
+    async def search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        filters: str | list[str] | None = None,
+        sort: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Search documents."""
+        params: dict[str, Any] = {
+            "q": query,
+            "limit": limit,
+            "offset": offset,
+        }
+        if filters:
+            params["filter"] = filters
+        if sort:
+            params["sort"] = sort
+        result: dict[str, Any] = await self._request(
+            "POST", f"/indexes/{self._index_name}/search", params
+        )
+        return result
+
+    @with_async_retry("search")
+    async def federated_search(
+        self,
+        queries: list[str],
+        limit: int = 20,
+        offset: int = 0,
+        filters: str | list[str] | None = None,
+        sort: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Search several query strings and merge the hits into one page."""
+        params: dict[str, Any] = {"indexUid": self._index_name}
+        if filters:
+            params["filter"] = filters
+        if sort:
+            params["sort"] = sort
+        result: dict[str, Any] = await self._request(
+            "POST",
+            "/multi-search",
+            {
+                "federation": {"limit": limit, "offset": offset},
+                "queries": [{**params, "q": query} for query in queries],
+            },
+        )
+        return result
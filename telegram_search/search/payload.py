@@ -0,0 +1,89 @@
+"""Incremental NDJSON encoding of document uploads."""
+
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+# wbits selecting the container zlib writes for each HTTP Content-Encoding
+# ("deflate" in HTTP means the zlib format, not raw deflate)
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+CONTENT_ENCODINGS = ("", *_WBITS)
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def iter_ndjson(docs: Iterable[dict[str, Any]], chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """Serialize documents one per line, yielding chunks of about ``chunk_size`` bytes.
+
+    Only one chunk's worth of serialized text is alive at a time, so a
+    generator of documents is never materialized as a list or one big string.
+    """
+    lines: list[str] = []
+    size = 0
+    for doc in docs:
+        line = _encoder.encode(doc)
+        lines.append(line)
+        lines.append("\n")
+        size += len(line) + 1
+        if size >= chunk_size:
+            yield "".join(lines).encode("utf-8")
+            lines.clear()
+            size = 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+def compress_chunks(chunks: Iterable[bytes], encoding: str, level: int = 1) -> Iterator[bytes]:
+    """Compress a chunk stream with a gzip or deflate Content-Encoding.
+
+    An empty ``encoding`` passes the chunks through unchanged.
+    """
+    if not encoding:
+        yield from chunks
+        return
+    if encoding not in _WBITS:
+        raise ValueError(f"Unsupported content encoding: {encoding!r}")
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def encode_documents(
+    docs: Iterable[dict[str, Any]],
+    encoding: str = "",
+    level: int = 1,
+) -> tuple[bytes, int]:
+    """Build a complete NDJSON upload body from a document stream.
+
+    The body is assembled from compressed chunks, so peak memory is the size
+    of the (compressed) payload rather than the documents plus a JSON array
+    string plus its encoded copy. Keeping the finished body in memory lets a
+    failed upload be retried.
+
+    Args:
+        docs: Documents to encode; may be a generator.
+        encoding: ``"gzip"``, ``"deflate"`` or ``""`` for no compression.
+        level: zlib level. Level 1 already shrinks message batches several
+            times over at close to plain serialization speed.
+
+    Returns:
+        Tuple of (body, number of documents).
+    """
+    count = 0
+
+    def counted() -> Iterator[dict[str, Any]]:
+        nonlocal count
+        for doc in docs:
+            count += 1
+            yield doc
+
+    body = b"".join(compress_chunks(iter_ndjson(counted()), encoding, level))
+    return body, count
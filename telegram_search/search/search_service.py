@@ -2,13 +2,51 @@
 
 from __future__ import annotations
 
+import asyncio
+from dataclasses import dataclass
 from typing import Any
 
 from telegram_search.config import AppConfig
-from telegram_search.search.meili_client import MeiliClient
+from telegram_search.models.schema import IndexSchema
+from telegram_search.pipeline import normalizer
+from telegram_search.logging import get_logger, safe_error
+from telegram_search.search.meili_client import AsyncMeiliClient, MeiliClient, is_backend_failure
 from telegram_search.search.query_parser import parse_query
 from telegram_search.cache.redis_cache import RedisCache
 
+logger = get_logger(__name__)
+
+
+@dataclass
+class _SearchRequest:
+    """Normalized search arguments shared by the sync and async paths."""
+
+    query: str
+    variants: list[str]
+    limit: int
+    offset: int
+    filters: list[str]
+    sort: list[str] | None
+
+    @property
+    def params(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "offset": self.offset,
+            "filters": self.filters,
+            "sort": self.sort,
+        }
+
+    @property
+    def cache_key(self) -> dict[str, Any]:
+        # Sorting filters list to ensure stability
+        return {
+            "limit": self.limit,
+            "offset": self.offset,
+            "sort": str(self.sort),  # Convert list to string for cache key
+            "filters": f"{sorted(self.filters)}:{self.sort}",
+        }
+
 
 class SearchService:
     """Search service with cache-aside pattern."""
@@ -16,19 +54,32 @@ class SearchService:
     def __init__(self, config: AppConfig) -> None:
         """Initialize search service."""
         self._meili = MeiliClient(config.meilisearch)
+        self._meili_config = config.meilisearch
+        self._async_meili: AsyncMeiliClient | None = None
         self._cache = RedisCache(config.redis)
         self._config = config.search
+        self._schema = IndexSchema.from_config(config.meilisearch)
 
-    def search(
+    def _query_variants(self, query: str) -> list[str]:
+        """Query strings to search for.
+
+        A lean index does not store every Traditional/Simplified variant, so
+        Chinese queries are also searched in the other script.
+        """
+        if not self._schema.lean or not normalizer.classify_script(query).has_han:
+            return [query]
+        variants = [query, normalizer.to_simplified(query), normalizer.to_traditional(query)]
+        return list(dict.fromkeys(variants))
+
+    def _prepare(
         self,
         query: str,
-        limit: int | None = None,
-        offset: int = 0,
-        filters: str | None = None,
-        sort: str | None = None,
-        use_cache: bool = True,
-    ) -> dict[str, Any]:
-        """Search with cache-aside pattern."""
+        limit: int | None,
+        offset: int,
+        filters: str | None,
+        sort: str | None,
+    ) -> _SearchRequest:
+        """Validate arguments and build the Meilisearch request."""
         if not isinstance(query, str):
             raise TypeError("query must be a string")
 
@@ -61,33 +112,114 @@ class SearchService:
             else:
                 search_sort = [parsed.sort]
 
-        # Prepare cache key components
-        # We need a stable string representation for the cache key
-        # Sorting filters list to ensure stability
-        cache_filters = f"{sorted(search_filters)}:{search_sort}"
+        return _SearchRequest(
+            query=search_query,
+            variants=self._query_variants(search_query),
+            limit=limit_value,
+            offset=offset,
+            filters=search_filters,
+            sort=search_sort,
+        )
+
+    def search(
+        self,
+        query: str,
+        limit: int | None = None,
+        offset: int = 0,
+        filters: str | None = None,
+        sort: str | None = None,
+        use_cache: bool = True,
+    ) -> dict[str, Any]:
+        """Search with cache-aside pattern.
+
+        While Meilisearch is failing (or its circuit breaker is open), a
+        cached result that has outlived ``cache_ttl`` is served instead,
+        flagged with ``"stale": True``.
+        """
+        request = self._prepare(query, limit, offset, filters, sort)
 
         def compute() -> dict[str, Any]:
-            return self._meili.search(
-                search_query,
-                limit=limit_value,
-                offset=offset,
-                filters=search_filters,
-                sort=search_sort,
-            )
+            if len(request.variants) > 1:
+                return self._meili.federated_search(request.variants, **request.params)
+            return self._meili.search(request.query, **request.params)
+
+        if not use_cache:
+            return compute()
 
         # Check cache first
-        if use_cache:
+        try:
             return self._cache.get_or_compute(
-                query=search_query,
+                query=request.query,
                 compute_func=compute,
-                limit=limit_value,
-                offset=offset,
-                sort=str(search_sort), # Convert list to string for cache key
-                filters=cache_filters,
+                **request.cache_key,
             )
+        except Exception as e:
+            if not is_backend_failure(e):
+                raise
+            return self._serve_stale(e, self._cache.get_stale(request.query, **request.cache_key))
 
-        return compute()
+    async def asearch(
+        self,
+        query: str,
+        limit: int | None = None,
+        offset: int = 0,
+        filters: str | None = None,
+        sort: str | None = None,
+        use_cache: bool = True,
+    ) -> dict[str, Any]:
+        """Async variant of :meth:`search` using the pooled async client.
+
+        The Meilisearch request runs on the event loop; only the (fast)
+        Redis lookups are handed to a thread.
+        """
+        request = self._prepare(query, limit, offset, filters, sort)
+
+        if use_cache:
+            cached = await asyncio.to_thread(
+                self._cache.get, request.query, **request.cache_key
+            )
+            if cached is not None:
+                return cached
+
+        if self._async_meili is None:
+            self._async_meili = AsyncMeiliClient(self._meili_config)
+        try:
+            if len(request.variants) > 1:
+                result = await self._async_meili.federated_search(
+                    request.variants, **request.params
+                )
+            else:
+                result = await self._async_meili.search(request.query, **request.params)
+        except Exception as e:
+            if not use_cache or not is_backend_failure(e):
+                raise
+            stale = await asyncio.to_thread(
+                self._cache.get_stale, request.query, **request.cache_key
+            )
+            return self._serve_stale(e, stale)
+
+        if use_cache:
+            await asyncio.to_thread(self._cache.set, request.query, result, **request.cache_key)
+        return result
+
+    @staticmethod
+    def _serve_stale(error: Exception, stale: dict[str, Any] | None) -> dict[str, Any]:
+        """Answer from an expired cache entry while the backend is failing.
+
+        The result is flagged with ``"stale": True``; without a cached copy
+        the original error is re-raised.
+        """
+        if stale is None:
+            raise error
+        logger.warning("search_served_stale", **safe_error(error))
+        return {**stale, "stale": True}
 
     def close(self) -> None:
         """Close underlying resources."""
         self._cache.close()
+
+    async def aclose(self) -> None:
+        """Close the async client's connection pool."""
+        if self._async_meili is not None:
+            await self._async_meili.close()
+            self._async_meili = None
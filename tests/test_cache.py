@@ -51,6 +51,24 @@ class TestRedisCache:
         cache.set("query", {"hits": []}, filters="f")
         mock_redis.return_value.setex.assert_called_once()
 
+    @patch("telegram_search.cache.redis_cache.redis.Redis")
+    def test_stale_copy(self, mock_redis):
+        """Test set keeps a longer-lived copy that get_stale reads."""
+        cache = RedisCache(RedisConfig(cache_ttl=60, stale_ttl=600))
+        cache.set("query", {"hits": []}, filters="f")
+
+        key = cache._make_key("query", filters="f")
+        mock_redis.return_value.set.assert_called_once_with(
+            f"stale:{key}", '{"hits": []}', ex=600
+        )
+
+        mock_redis.return_value.get.return_value = '{"hits": []}'
+        assert cache.get_stale("query", filters="f") == {"hits": []}
+        mock_redis.return_value.get.assert_called_with(f"stale:{key}")
+
+        mock_redis.return_value.get.side_effect = RedisError("Fail")
+        assert cache.get_stale("query", filters="f") is None
+
     @patch("telegram_search.cache.redis_cache.redis.Redis")
     def test_get_or_compute_hit(self, mock_redis):
         """Test get_or_compute cache hit."""
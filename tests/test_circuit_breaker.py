@@ -0,0 +1,185 @@
+"""Tests for CircuitBreaker."""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from telegram_search.config import AppConfig, MeilisearchConfig, RedisConfig, SearchConfig
+from telegram_search.search.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+from telegram_search.search.meili_client import AsyncMeiliClient, MeiliClient
+from telegram_search.search.search_service import SearchService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch("telegram_search.search.circuit_breaker.time.monotonic", clock):
+        yield clock
+
+
+def test_opens_on_failure_rate(clock):
+    """Test the breaker opens once enough recent calls failed."""
+    breaker = CircuitBreaker("op", failure_rate=0.5, window=10, min_calls=4)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED  # below min_calls
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert exc.value.retry_after == pytest.approx(30.0)
+
+
+def test_slow_calls_count_as_failures(clock):
+    """Test successful calls slower than the threshold trip the breaker."""
+    breaker = CircuitBreaker("op", window=4, min_calls=4, slow_call_threshold=1.0)
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record_success(1.5)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_window_forgets_old_failures(clock):
+    """Test only the last ``window`` calls are considered."""
+    breaker = CircuitBreaker("op", failure_rate=0.75, window=4, min_calls=4)
+    for bad in (True, True, False, False, False):
+        breaker.before_call()
+        breaker.record_failure() if bad else breaker.record_success(0.01)
+    assert breaker.snapshot()["failure_rate"] == 0.25
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_probe(clock):
+    """Test the breaker lets one probe through after open_timeout."""
+    breaker = CircuitBreaker("op", window=2, min_calls=2, open_timeout=10)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now += 10
+    assert breaker.snapshot()["state_code"] == 1
+    breaker.before_call()  # the probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # concurrent callers still fail fast
+
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_success(0.01)
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.snapshot() == {
+        "state": "closed",
+        "state_code": 0,
+        "calls": 0,
+        "failure_rate": 0.0,
+    }
+
+
+async def test_cancelled_probe_frees_its_slot(clock):
+    """Test a half-open probe that is cancelled does not leave the breaker stuck."""
+    config = MeilisearchConfig(
+        max_retries=0, breaker_window=2, breaker_min_calls=2, breaker_open_timeout=10
+    )
+    client = AsyncMeiliClient(config)
+    hang = asyncio.Event()
+
+    async def request(*args, **kwargs):
+        if hang.is_set():
+            await asyncio.sleep(3600)
+        raise ConnectionError("down")
+
+    with patch.object(client, "_request", request):
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await client.search("test")
+        clock.now += 10
+
+        hang.set()
+        probe = asyncio.ensure_future(client.search("test"))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        hang.clear()
+        with pytest.raises(ConnectionError):
+            await client.search("test")  # probes again instead of failing fast
+    assert client.breaker_states()["search"]["state"] == "open"
+
+
+@patch("telegram_search.search.meili_client.meilisearch.Client")
+def test_meili_client_fails_fast(mock_client, clock):
+    """Test MeiliClient stops calling Meilisearch while its breaker is open."""
+    mock_index = Mock()
+    mock_index.search.side_effect = Exception("timeout")
+    mock_client.return_value.index.return_value = mock_index
+    config = MeilisearchConfig(max_retries=3, breaker_window=4, breaker_min_calls=4)
+    client = MeiliClient(config)
+
+    with patch("time.sleep"), pytest.raises(Exception):
+        client.search("test")
+    assert mock_index.search.call_count == 4
+    assert client.breaker_states()["search"]["state"] == "open"
+    assert client.breaker_states()["write"]["state"] == "closed"
+
+    with pytest.raises(CircuitOpenError):
+        client.search("test")
+    assert mock_index.search.call_count == 4
+
+    # Writes have their own breaker
+    client.add_documents([{"id": "1"}])
+
+
+@patch("telegram_search.search.meili_client.meilisearch.Client")
+def test_client_errors_do_not_trip(mock_client, clock):
+    """Test 4xx responses are not counted as backend failures."""
+    error = Exception("bad filter")
+    error.status_code = 400
+    mock_client.return_value.index.return_value.search.side_effect = error
+    client = MeiliClient(MeilisearchConfig(max_retries=0, breaker_window=2, breaker_min_calls=2))
+
+    for _ in range(3):
+        with pytest.raises(Exception):
+            client.search("test")
+    assert client.breaker_states()["search"]["state"] == "closed"
+
+
+@patch("telegram_search.search.search_service.RedisCache")
+@patch("telegram_search.search.search_service.MeiliClient")
+def test_search_service_serves_stale(mock_meili, mock_cache):
+    """Test SearchService falls back to an expired cache entry."""
+    config = Mock(spec=AppConfig)
+    config.meilisearch = MeilisearchConfig()
+    config.redis = RedisConfig()
+    config.search = SearchConfig()
+    service = SearchService(config)
+    cache = mock_cache.return_value
+    cache.get_or_compute.side_effect = CircuitOpenError("meili_search", 5.0)
+    cache.get_stale.return_value = {"hits": [{"id": "1_1"}]}
+
+    assert service.search("test") == {"hits": [{"id": "1_1"}], "stale": True}
+    cache.get_stale.assert_called_once()
+
+    cache.get_stale.return_value = None
+    with pytest.raises(CircuitOpenError):
+        service.search("test")
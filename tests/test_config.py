@@ -66,6 +66,9 @@ class TestAppConfig:
         assert config.name == "telegram-search-engine"
         assert config.debug is False
         assert config.indexer.state_flush_interval == 1.0
+        # Optional on-disk stores are off unless configured
+        assert config.indexer.spool_dir == ""
+        assert config.indexer.dead_letter_path == ""
 
     def test_from_toml(self, tmp_path):
         """Test loading from TOML file."""
@@ -0,0 +1,98 @@
+"""Tests for DedupStore."""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from telegram_search.indexer.dedup_store import DedupStore
+
+
+def test_dedup_store_empty(tmp_path: Path) -> None:
+    """Test a new store starts empty."""
+    store = DedupStore(tmp_path / "dedup.bin", capacity=10)
+    assert len(store) == 0
+    assert store.fingerprints().tolist() == []
+    store.close()
+
+
+def test_dedup_store_persists(tmp_path: Path) -> None:
+    """Test records survive reopening the file."""
+    path = tmp_path / "dedup.bin"
+    store = DedupStore(path, capacity=10)
+    store.append([(1, 100, -1001), (2**64 - 1, 200, -1002)])
+    store.close()
+
+    reopened = DedupStore(path, capacity=10)
+    assert reopened.fingerprints().tolist() == [1, 2**64 - 1]
+    reopened.close()
+
+
+def test_dedup_store_window(tmp_path: Path) -> None:
+    """Test only the last capacity records are returned."""
+    store = DedupStore(tmp_path / "dedup.bin", capacity=3)
+    store.append((i, 0, 1) for i in range(5))
+    assert store.fingerprints().tolist() == [2, 3, 4]
+    store.close()
+
+
+def test_dedup_store_grows_file(tmp_path: Path) -> None:
+    """Test appends beyond the preallocated size remap the file."""
+    store = DedupStore(tmp_path / "dedup.bin", capacity=5000)
+    store.append((i, 0, 1) for i in range(3000))
+    store.append((i, 0, 1) for i in range(3000, 4000))
+    assert store.fingerprints().tolist() == list(range(4000))
+    store.close()
+
+
+def test_dedup_store_compact(tmp_path: Path) -> None:
+    """Test compaction drops records outside the window."""
+    path = tmp_path / "dedup.bin"
+    store = DedupStore(path, capacity=4)
+    store.append((i, 0, 1) for i in range(6))
+    size_before = path.stat().st_size
+
+    store.compact()
+    assert store.fingerprints().tolist() == [2, 3, 4, 5]
+    assert path.stat().st_size < size_before
+
+    store.append([(6, 0, 1)])
+    store.close()
+    assert DedupStore(path, capacity=4).fingerprints().tolist() == [3, 4, 5, 6]
+
+
+def test_dedup_store_background_compaction(tmp_path: Path) -> None:
+    """Test appending past twice the capacity compacts in the background."""
+    store = DedupStore(tmp_path / "dedup.bin", capacity=2)
+    store.append((i, 0, 1) for i in range(4))
+    store.close()  # Waits for the compactor
+
+    reopened = DedupStore(tmp_path / "dedup.bin", capacity=2)
+    assert len(reopened) == 2
+    assert not reopened.needs_compaction
+    assert reopened.fingerprints().tolist() == [2, 3]
+    reopened.close()
+
+
+def test_dedup_store_max_age(tmp_path: Path) -> None:
+    """Test expired records are not loaded."""
+    now = int(time.time())
+    store = DedupStore(tmp_path / "dedup.bin", capacity=10, max_age=60)
+    store.append([(1, now - 3600, 1), (2, now, 1)])
+    assert store.fingerprints().tolist() == [2]
+    store.close()
+
+
+def test_dedup_store_invalid_file(tmp_path: Path) -> None:
+    """Test a corrupted file is reset instead of failing."""
+    path = tmp_path / "dedup.bin"
+    path.write_bytes(b"garbage" * 100)
+    store = DedupStore(path, capacity=10)
+    assert len(store) == 0
+    store.close()
+
+
+def test_dedup_store_invalid_capacity(tmp_path: Path) -> None:
+    """Test capacity must be positive."""
+    with pytest.raises(ValueError):
+        DedupStore(tmp_path / "dedup.bin", capacity=0)
@@ -0,0 +1,122 @@
+"""Tests for EntityCache."""
+
+import asyncio
+
+import pytest
+
+from telegram_search.indexer.channel_registry import Channel
+from telegram_search.indexer.entity_cache import ChatInfo, EntityCache
+from telegram_search.indexer.state_store import StateStore
+
+
+class FakeResolver:
+    """Resolver counting calls, optionally failing."""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, chat_id):
+        self.calls.append(chat_id)
+        await asyncio.sleep(0)
+        if self.fail:
+            raise ConnectionError("telegram down")
+        return ChatInfo(f"Title {len(self.calls)}", "news", 1e12)
+
+
+@pytest.mark.asyncio
+async def test_resolve_once_per_chat():
+    """Test concurrent lookups of one chat share a single refresh."""
+    resolver = FakeResolver()
+    cache = EntityCache(resolver=resolver)
+
+    infos = await asyncio.gather(*(cache.resolve(-1001234567890) for _ in range(5)))
+    await cache.resolve(1234567890)
+
+    assert resolver.calls == [-1001234567890]
+    assert {info.title for info in infos} == {"Title 1"}
+
+
+@pytest.mark.asyncio
+async def test_seeded_entries_skip_resolver():
+    """Test channels from the registry need no lookup until they expire."""
+    resolver = FakeResolver()
+    cache = EntityCache(resolver=resolver)
+    cache.seed([Channel(channel_id=1234567890, username="news", title="新闻")])
+
+    info = await cache.resolve(-1001234567890)
+
+    assert info.title == "新闻"
+    assert resolver.calls == []
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_refreshed():
+    """Test an entry older than the TTL is refreshed."""
+    resolver = FakeResolver()
+    cache = EntityCache(ttl=60, resolver=resolver)
+    cache.put(42, ChatInfo("Old", "old", updated_at=0.0))
+
+    info = await cache.resolve(42)
+
+    assert info.title == "Title 1"
+    assert resolver.calls == [42]
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_entry():
+    """Test a failed refresh falls back to the stale entry and is not retried at once."""
+    resolver = FakeResolver(fail=True)
+    cache = EntityCache(ttl=60, resolver=resolver, retry_interval=60)
+    cache.put(42, ChatInfo("Old", "old", updated_at=0.0))
+
+    assert (await cache.resolve(42)).title == "Old"
+    assert (await cache.resolve(42)).title == "Old"
+    assert resolver.calls == [42]
+    assert await cache.resolve(43) is None
+
+
+@pytest.mark.asyncio
+async def test_entries_persisted(tmp_path):
+    """Test resolved entries survive a restart through the state store."""
+    state = StateStore(tmp_path / "state.json")
+    await EntityCache(state, resolver=FakeResolver()).resolve(-1001234567890)
+
+    resolver = FakeResolver()
+    cache = EntityCache(StateStore(tmp_path / "state.json"), resolver=resolver)
+
+    assert (await cache.resolve(-1001234567890)).title == "Title 1"
+    assert resolver.calls == []
+
+
+@pytest.mark.asyncio
+async def test_registry_entries_persisted_under_channel_id(tmp_path):
+    """Test registry channels are stored under their registry id, like their ranges."""
+    state = StateStore(tmp_path / "state.json")
+    cache = EntityCache(state, ttl=60, resolver=FakeResolver())
+    cache.seed([Channel(channel_id=-1001234567890, username="news", title="新闻")])
+    cache.put(1234567890, ChatInfo("Old", "news", updated_at=0.0))
+
+    await cache.resolve(1234567890)
+
+    assert state.get_entity(-1001234567890)["title"] == "Title 1"
+    assert state.get_entity(1234567890) is None
+
+
+@pytest.mark.asyncio
+async def test_enrich():
+    """Test messages get title, username and permalink without overriding set fields."""
+    cache = EntityCache()
+    cache.put(1234567890, ChatInfo("新闻", "news", 1e12))
+    cache.put(9876543210, ChatInfo("Private", "", 1e12))
+
+    msg = await cache.enrich({"chat_id": -1001234567890, "msg_id": 7})
+    assert msg["chat_title"] == "新闻"
+    assert msg["url"] == "https://t.me/news/7"
+
+    msg = await cache.enrich({"chat_id": -1009876543210, "msg_id": 7, "chat_title": "Kept"})
+    assert msg["chat_title"] == "Kept"
+    assert msg["url"] == "https://t.me/c/9876543210/7"
+
+    msg = await cache.enrich({"chat_id": 99, "msg_id": 1})
+    assert "chat_title" not in msg
@@ -78,3 +78,12 @@ def test_apply_all(filter_service: MessageFilter, sample_message: MessageDoc):
     sample_message.text = "Valid text"
     sample_message.media_type = "service"
     assert filter_service.apply_all(sample_message) is False
+
+
+def test_apply_all_raw(filter_service: MessageFilter):
+    """Test filters on raw message dictionaries."""
+    assert filter_service.apply_all_raw({"text": "Hello world"}) is True
+    assert filter_service.apply_all_raw({"text": "Hi"}) is False
+    assert filter_service.apply_all_raw({"text": "   "}) is False
+    assert filter_service.apply_all_raw({"text": None}) is False
+    assert filter_service.apply_all_raw({"text": "Valid text", "media_type": "service"}) is False
@@ -89,3 +89,38 @@ async def test_sync_channel_progress_callback() -> None:
     assert callback.call_count == 2
     callback.assert_any_call(1)
     callback.assert_any_call(2)
+
+
+@pytest.mark.asyncio
+async def test_plan_gaps_newest_first(tmp_path) -> None:
+    """Test unsynced id ranges are planned from the newest down."""
+    mock_crawler = MagicMock(spec=TelethonCrawler)
+
+    async def latest(channel_id):
+        return 100
+
+    mock_crawler.get_latest_message_id.side_effect = latest
+    state = StateStore(tmp_path / "state.json")
+    state.add_range("ch1", 11, 20)
+    state.add_range("ch1", 41, 60)
+
+    sync = HistoricalSync(mock_crawler, state)
+
+    assert await sync.plan_gaps("ch1") == [(61, 100), (21, 40), (1, 10)]
+
+
+@pytest.mark.asyncio
+async def test_sync_range() -> None:
+    """Test a range is fetched newest first within its bounds."""
+    mock_crawler = MagicMock(spec=TelethonCrawler)
+
+    async def async_gen(*args, **kwargs):
+        yield {"msg_id": 40}
+
+    mock_crawler.fetch_messages.side_effect = async_gen
+    sync = HistoricalSync(mock_crawler, MagicMock(spec=StateStore))
+
+    processed = [msg async for msg in sync.sync_range("ch1", 21, 40, limit=5)]
+
+    assert processed == [{"msg_id": 40}]
+    mock_crawler.fetch_messages.assert_called_with("ch1", limit=5, min_id=20, offset_id=41)
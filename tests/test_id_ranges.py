@@ -0,0 +1,40 @@
+"""Tests for IdRangeSet."""
+
+from telegram_search.indexer.id_ranges import IdRangeSet
+
+
+def test_add_merges_overlapping_and_adjacent() -> None:
+    """Test touching intervals collapse into one."""
+    ranges = IdRangeSet([(10, 20), (40, 50)])
+    ranges.add(21, 25)
+    assert ranges.to_list() == [[10, 25], [40, 50]]
+    ranges.add(30, 45)
+    assert ranges.to_list() == [[10, 25], [30, 50]]
+    ranges.add(1, 100)
+    assert ranges.to_list() == [[1, 100]]
+    assert len(ranges) == 1
+
+
+def test_add_ignores_empty_interval() -> None:
+    """Test an interval with start above end is ignored."""
+    ranges = IdRangeSet()
+    ranges.add(5, 4)
+    assert ranges.to_list() == []
+
+
+def test_gaps() -> None:
+    """Test uncovered intervals are reported in ascending order."""
+    ranges = IdRangeSet([(5, 10), (20, 30)])
+    assert ranges.gaps(1, 40) == [(1, 4), (11, 19), (31, 40)]
+    assert ranges.gaps(6, 25) == [(11, 19)]
+    assert ranges.gaps(21, 29) == []
+    assert IdRangeSet().gaps(1, 3) == [(1, 3)]
+
+
+def test_contains() -> None:
+    """Test membership of single ids."""
+    ranges = IdRangeSet([(5, 10)])
+    assert 5 in ranges
+    assert 10 in ranges
+    assert 4 not in ranges
+    assert 11 not in ranges
@@ -0,0 +1,190 @@
+"""Tests for the realtime ingest queue."""
+
+import asyncio
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from telegram_search.indexer.ingest_queue import IngestQueue
+from telegram_search.indexer.ingest_service import IngestResult, IngestService
+from telegram_search.indexer.spool import Spool
+from telegram_search.indexer.task_tracker import IndexTask, TaskTracker
+from telegram_search.search.meili_client import MeiliClient
+
+
+def _msg(msg_id):
+    return {"chat_id": 1, "msg_id": msg_id, "text": f"message {msg_id}", "date": 0}
+
+
+@pytest.fixture
+def ingest():
+    service = Mock(spec=IngestService)
+    service.ingest_batch_results.side_effect = lambda msgs: [
+        IngestResult.INDEXED if m["msg_id"] % 2 else IngestResult.SKIPPED for m in msgs
+    ]
+    return service
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced(ingest):
+    """Test a burst becomes one batch and each caller gets its own result."""
+    queue = IngestQueue(ingest, max_batch_size=100, max_latency=0.05)
+    results = await asyncio.gather(*(queue.ingest(_msg(i)) for i in range(50)))
+    await queue.close()
+
+    assert ingest.ingest_batch_results.call_count == 1
+    assert results == [
+        IngestResult.INDEXED if i % 2 else IngestResult.SKIPPED for i in range(50)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_flush_on_size(ingest):
+    """Test a full batch is flushed without waiting for the deadline."""
+    queue = IngestQueue(ingest, max_batch_size=10, max_latency=60)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(queue.ingest(_msg(i)) for i in range(20))), timeout=5
+    )
+    await queue.close()
+
+    assert len(results) == 20
+    assert [len(c.args[0]) for c in ingest.ingest_batch_results.call_args_list] == [10, 10]
+
+
+@pytest.mark.asyncio
+async def test_flush_on_deadline(ingest):
+    """Test a partial batch is flushed once max_latency has passed."""
+    queue = IngestQueue(ingest, max_batch_size=100, max_latency=0.01)
+    assert await asyncio.wait_for(queue.ingest(_msg(1)), timeout=5) == IngestResult.INDEXED
+    assert await asyncio.wait_for(queue.ingest(_msg(2)), timeout=5) == IngestResult.SKIPPED
+    await queue.close()
+
+    assert ingest.ingest_batch_results.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_backpressure(ingest):
+    """Test submit waits while the queue is full and indexing is stalled."""
+    release = threading.Event()
+    ingest.ingest_batch_results.side_effect = lambda msgs: (
+        release.wait(5),
+        [IngestResult.INDEXED] * len(msgs),
+    )[1]
+    queue = IngestQueue(ingest, max_batch_size=1, max_latency=0, max_pending=1)
+
+    first = await queue.submit(_msg(1))
+    await asyncio.sleep(0.05)  # first batch is now being ingested
+    await queue.submit(_msg(2))  # fills the queue
+    blocked = asyncio.create_task(queue.submit(_msg(3)))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    release.set()
+    await asyncio.wait_for(blocked, timeout=5)
+    assert await first == IngestResult.INDEXED
+    await queue.close()
+    assert ingest.ingest_batch_results.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending(ingest):
+    """Test closing flushes queued messages and rejects new ones."""
+    queue = IngestQueue(ingest, max_batch_size=100, max_latency=60)
+    futures = [await queue.submit(_msg(i)) for i in range(3)]
+    await queue.close()
+
+    assert all(f.done() for f in futures)
+    with pytest.raises(RuntimeError):
+        await queue.submit(_msg(4))
+
+
+@pytest.mark.asyncio
+async def test_flush_error_resolves_futures(ingest):
+    """Test an ingest failure resolves every future in the batch as an error."""
+    ingest.ingest_batch_results.side_effect = RuntimeError("meili down")
+    queue = IngestQueue(ingest, max_latency=0.01)
+    results = await asyncio.gather(queue.ingest(_msg(1)), queue.ingest(_msg(2)))
+    await queue.close()
+
+    assert results == [IngestResult.ERROR, IngestResult.ERROR]
+
+
+def _tracker(statuses):
+    client = Mock(spec=MeiliClient)
+    client.get_task_statuses.side_effect = lambda uids: {
+        uid: {"status": statuses.get(uid, "enqueued"), "error": None} for uid in uids
+    }
+    return TaskTracker(client, poll_interval=0.01)
+
+
+@pytest.fixture
+def tasked(ingest):
+    """Service returning one task per batch, numbered from 1."""
+    ingest.ingest_batch_tasks.side_effect = lambda msgs: (
+        ingest.ingest_batch_results(msgs),
+        [IndexTask(ingest.ingest_batch_tasks.call_count)],
+    )
+    return ingest
+
+
+@pytest.mark.asyncio
+async def test_results_wait_for_tasks(tasked):
+    """Test results are only resolved once the batch's task succeeded."""
+    statuses = {}
+    queue = IngestQueue(tasked, max_latency=0.01, tracker=_tracker(statuses))
+    future = await queue.submit(_msg(1))
+    await asyncio.sleep(0.1)
+    assert not future.done()
+
+    statuses[1] = "succeeded"
+    assert await asyncio.wait_for(future, timeout=5) == IngestResult.INDEXED
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_task_reports_error(tasked):
+    """Test a failed task turns its own batch's results into errors only."""
+    statuses = {1: "failed", 2: "succeeded"}
+    queue = IngestQueue(tasked, max_latency=0.01, tracker=_tracker(statuses))
+    first = await asyncio.wait_for(
+        asyncio.gather(queue.ingest(_msg(1)), queue.ingest(_msg(2))), timeout=5
+    )
+    second = await asyncio.wait_for(queue.ingest(_msg(3)), timeout=5)
+    await queue.close()
+
+    # Skipped messages were not indexed, so the failure does not concern them
+    assert first == [IngestResult.ERROR, IngestResult.SKIPPED]
+    assert second == IngestResult.INDEXED
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_tasks(tasked):
+    """Test closing resolves futures whose tasks were still pending."""
+    statuses = {}
+    queue = IngestQueue(tasked, max_latency=0.01, tracker=_tracker(statuses))
+    future = await queue.submit(_msg(1))
+    await asyncio.sleep(0.05)
+
+    closing = asyncio.create_task(queue.close())
+    await asyncio.sleep(0.05)
+    assert not closing.done()
+    statuses[1] = "succeeded"
+    await asyncio.wait_for(closing, timeout=5)
+    assert future.result() == IngestResult.INDEXED
+
+
+@pytest.mark.asyncio
+async def test_spool_synced_before_results(ingest):
+    """Test the spool is fsynced before indexed results are resolved."""
+    synced = []
+    spool = Mock(spec=Spool)
+    spool.sync.side_effect = lambda: synced.append(ingest.ingest_batch_results.call_count)
+    queue = IngestQueue(ingest, max_latency=0.01, spool=spool)
+
+    assert await queue.ingest(_msg(1)) == IngestResult.INDEXED
+    assert synced == [1]
+    # Nothing indexed: nothing to sync
+    assert await queue.ingest(_msg(2)) == IngestResult.SKIPPED
+    await queue.close()
+    assert synced == [1]
@@ -1,13 +1,18 @@
 """Tests for ingest service."""
 
 from datetime import datetime
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 
+from telegram_search.indexer.dead_letter import DeadLetterFile
+from telegram_search.indexer.dedup_store import DedupStore
 from telegram_search.indexer.ingest_service import IngestService, IngestResult
+from telegram_search.indexer.spool import Spool
+from telegram_search.indexer.task_tracker import IndexTask, TaskFailedError
+from telegram_search.models.schema import IndexSchema
 from telegram_search.pipeline.filters import MessageFilter
-from telegram_search.search.meili_client import MeiliClient
+from telegram_search.search.meili_client import MeiliApiError, MeiliClient
 
 
 @pytest.fixture
@@ -41,6 +46,7 @@ def test_ingest_message_success(ingest_service, mock_meili_client):
     args, _ = mock_meili_client.add_documents.call_args
     assert len(args[0]) == 1
     assert args[0][0]["text"] == "Unique message content here"
+    assert args[0][0]["simhash"].startswith("0x")
 
 
 def test_ingest_message_duplicate(ingest_service, mock_meili_client):
@@ -63,6 +69,40 @@ def test_ingest_message_duplicate(ingest_service, mock_meili_client):
     
     assert ingest_service.ingest_message(msg_data_2) == IngestResult.SKIPPED
     mock_meili_client.add_documents.assert_not_called()
+    assert ingest_service.stats.exact_duplicates == 1
+    assert ingest_service.stats.near_duplicates == 0
+
+
+def test_ingest_message_exact_duplicate_skips_transform(ingest_service, mock_meili_client):
+    """Test verbatim reposts are rejected before transform runs."""
+    msg_data = {
+        "chat_id": 123,
+        "msg_id": 1,
+        "text": "Forwarded  announcement text",
+        "date": datetime.now(),
+    }
+    assert ingest_service.ingest_message(msg_data) == IngestResult.INDEXED
+
+    repost = {**msg_data, "chat_id": 456, "text": "Forwarded announcement text "}
+    with patch(
+        "telegram_search.indexer.ingest_service.transformer.transform_message"
+    ) as mock_transform:
+        assert ingest_service.ingest_message(repost) == IngestResult.SKIPPED
+        mock_transform.assert_not_called()
+
+
+def test_ingest_message_near_duplicate_counted(ingest_service, mock_meili_client):
+    """Test near-duplicates are counted separately from exact ones."""
+    base = "Breaking news: the quick brown fox jumps over the lazy dog today"
+    assert ingest_service.ingest_message(
+        {"chat_id": 1, "msg_id": 1, "text": base, "date": datetime.now()}
+    ) == IngestResult.INDEXED
+    assert ingest_service.ingest_message(
+        {"chat_id": 1, "msg_id": 2, "text": base + "!", "date": datetime.now()}
+    ) == IngestResult.SKIPPED
+
+    assert ingest_service.stats.exact_duplicates == 0
+    assert ingest_service.stats.near_duplicates == 1
 
 
 def test_ingest_message_filtered(ingest_service, mock_meili_client):
@@ -110,12 +150,15 @@ def test_ingest_batch(ingest_service, mock_meili_client):
     count = ingest_service.ingest_batch(msgs_data)
 
     assert count == 2 # 1st and 3rd are valid and unique
+    assert ingest_service.stats.exact_duplicates == 1
     mock_meili_client.add_documents.assert_called_once()
     args, _ = mock_meili_client.add_documents.call_args
     docs = args[0]
     assert len(docs) == 2
     assert docs[0]["msg_id"] == 1
     assert docs[1]["msg_id"] == 3
+    # Fingerprints stay integers until the documents are shaped for the index
+    assert all(doc["simhash"].startswith("0x") for doc in docs)
 
 
 def test_ingest_batch_dedup_against_history(ingest_service, mock_meili_client):
@@ -226,3 +269,202 @@ def test_ingest_message_empty_text(ingest_service, mock_meili_client):
     ) == IngestResult.SKIPPED
 
     mock_meili_client.add_documents.assert_not_called()
+
+
+def test_dedup_window_survives_restart(tmp_path, mock_meili_client, message_filter):
+    """Test a persisted dedup window still rejects reposts after a restart."""
+    path = tmp_path / "dedup.bin"
+    msg_data = {
+        "chat_id": 123,
+        "msg_id": 1,
+        "text": "Message posted before the restart",
+        "date": datetime.now(),
+    }
+
+    service = IngestService(
+        mock_meili_client, message_filter, dedup_store=DedupStore(path, capacity=10)
+    )
+    assert service.ingest_message(msg_data) == IngestResult.INDEXED
+    service.close()
+
+    restarted = IngestService(
+        mock_meili_client, message_filter, dedup_store=DedupStore(path, capacity=10)
+    )
+    repost = {**msg_data, "chat_id": 456}
+    assert restarted.ingest_message(repost) == IngestResult.SKIPPED
+    restarted.close()
+
+
+def test_ingest_batch_applies_schema(mock_meili_client, message_filter):
+    """Test documents are shaped by the configured schema before indexing."""
+    service = IngestService(mock_meili_client, message_filter, schema=IndexSchema("lean"))
+    count = service.ingest_batch(
+        [{"chat_id": 123, "msg_id": 1, "text": "English only message", "date": datetime.now()}]
+    )
+
+    assert count == 1
+    (doc,) = mock_meili_client.add_documents.call_args[0][0]
+    assert doc["text"] == "English only message"
+    for field in ("text_norm", "pinyin", "trad", "simp"):
+        assert field not in doc
+
+
+def test_ingest_batch_results(ingest_service, mock_meili_client):
+    """Test per-message results line up with the input batch."""
+    now = datetime.now()
+    msgs = [
+        {"chat_id": 123, "msg_id": 1, "text": "First realtime message", "date": now},
+        {"chat_id": 123, "msg_id": 2, "text": "", "date": now},
+        {"chat_id": 123, "msg_id": 3, "text": "First realtime message", "date": now},
+        {"chat_id": 123, "msg_id": 4, "text": "Another unrelated message text", "date": now},
+    ]
+
+    results = ingest_service.ingest_batch_results(msgs)
+
+    assert results == [
+        IngestResult.INDEXED,
+        IngestResult.SKIPPED,
+        IngestResult.SKIPPED,
+        IngestResult.INDEXED,
+    ]
+    mock_meili_client.add_documents.assert_called_once()
+
+    mock_meili_client.add_documents.side_effect = Exception("fail")
+    msgs = [{"chat_id": 123, "msg_id": 5, "text": "Message while meili is down", "date": now}]
+    assert ingest_service.ingest_batch_results(msgs) == [IngestResult.ERROR]
+
+
+def test_submit_batch_returns_task_uid(ingest_service, mock_meili_client):
+    """Test submit_batch hands back the indexing task of the batch."""
+    now = datetime.now()
+    mock_meili_client.add_documents.return_value = 42
+    msgs = [{"chat_id": 123, "msg_id": 1, "text": "Message with a task", "date": now}]
+
+    (task,) = ingest_service.submit_batch(msgs)
+    assert task.uid == 42
+    assert [doc["id"] for doc in task.docs] == ["123_1"]
+    # Everything is a duplicate now, so no task is created
+    assert ingest_service.submit_batch(msgs) == []
+    mock_meili_client.add_documents.assert_called_once()
+
+    mock_meili_client.add_documents.side_effect = Exception("fail")
+    with pytest.raises(Exception):
+        ingest_service.submit_batch(
+            [{"chat_id": 123, "msg_id": 2, "text": "Message while meili is down", "date": now}]
+        )
+
+
+def _distinct_batch(count):
+    now = datetime.now()
+    words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"]
+
+    def text(i):
+        return " ".join(words[(i * 3 + j) % 8] * (j + 1) for j in range(6))
+
+    return [
+        {"chat_id": 123, "msg_id": i, "text": f"{words[i % 8]} {i} {text(i)}", "date": now}
+        for i in range(count)
+    ]
+
+
+def test_failed_batch_is_bisected(mock_meili_client, message_filter, tmp_path):
+    """Test a rejected batch is split until the bad document is isolated."""
+    dead_letter = DeadLetterFile(tmp_path / "dead_letter.jsonl")
+    service = IngestService(
+        mock_meili_client, message_filter, dedup_threshold=0, dead_letter=dead_letter
+    )
+    uids = iter(range(100, 200))
+
+    def add_documents(docs):
+        if any(doc["id"] == "123_5" for doc in docs):
+            raise MeiliApiError(400, "invalid_document_fields", "bad document")
+        return next(uids)
+
+    mock_meili_client.add_documents.side_effect = add_documents
+    msgs = _distinct_batch(8)
+
+    tasks = service.submit_batch(msgs)
+
+    indexed = sorted(doc["id"] for task in tasks for doc in task.docs)
+    assert indexed == sorted(f"123_{i}" for i in range(8) if i != 5)
+    assert [r["doc"]["id"] for r in dead_letter] == ["123_5"]
+    assert service.stats.rejected == 1
+
+
+def test_bisection_results(mock_meili_client, message_filter):
+    """Test per-message results mark only the rejected document as an error."""
+    service = IngestService(mock_meili_client, message_filter, dedup_threshold=0)
+
+    def add_documents(docs):
+        if any(doc["id"] == "123_2" for doc in docs):
+            raise MeiliApiError(413, "payload_too_large", "too large")
+        return 1
+
+    mock_meili_client.add_documents.side_effect = add_documents
+    results = service.ingest_batch_results(_distinct_batch(4))
+    assert results == [
+        IngestResult.INDEXED,
+        IngestResult.INDEXED,
+        IngestResult.ERROR,
+        IngestResult.INDEXED,
+    ]
+
+
+def test_backend_failure_is_not_bisected(ingest_service, mock_meili_client):
+    """Test a 5xx fails the batch without splitting it."""
+    mock_meili_client.add_documents.side_effect = MeiliApiError(503, None, "unavailable")
+    with pytest.raises(MeiliApiError):
+        ingest_service.submit_batch(_distinct_batch(4))
+    mock_meili_client.add_documents.assert_called_once()
+
+
+def test_resubmit_failed_task(mock_meili_client, message_filter, tmp_path):
+    """Test a failed task is re-sent in halves down to the bad document."""
+    dead_letter = DeadLetterFile(tmp_path / "dead_letter.jsonl")
+    service = IngestService(mock_meili_client, message_filter, dead_letter=dead_letter)
+    mock_meili_client.add_documents.side_effect = [7, 8]
+    docs = [{"id": "1_1"}, {"id": "1_2"}, {"id": "1_3"}]
+    error = {"type": "invalid_request", "code": "invalid_document_id"}
+
+    tasks = service.resubmit_failed(IndexTask(3, docs), error)
+    assert [(t.uid, [d["id"] for d in t.docs]) for t in tasks] == [
+        (7, ["1_1"]),
+        (8, ["1_2", "1_3"]),
+    ]
+
+    assert service.resubmit_failed(IndexTask(7, docs[:1]), error) == []
+    assert [r["doc"]["id"] for r in dead_letter] == ["1_1"]
+
+    with pytest.raises(TaskFailedError):
+        service.resubmit_failed(IndexTask(9, docs), {"type": "system", "code": "no_space_left"})
+
+
+def test_submit_batch_appends_to_spool(tmp_path, mock_meili_client, message_filter):
+    """Test documents go to the spool instead of Meilisearch when one is set."""
+    spool = Spool(tmp_path)
+    service = IngestService(mock_meili_client, message_filter, spool=spool)
+    msgs = [
+        {"chat_id": 1, "msg_id": 1, "text": "第一条消息内容", "date": datetime.now()},
+        {"chat_id": 1, "msg_id": 2, "text": "Another message entirely", "date": datetime.now()},
+    ]
+
+    assert service.submit_batch(msgs) == []
+    mock_meili_client.add_documents.assert_not_called()
+    records = spool.read(spool.acked)
+    assert [doc["msg_id"] for doc in records[0].docs] == [1, 2]
+
+
+def test_dedupe_batch_checks_pending_batches(ingest_service):
+    """Test a batch is deduped against earlier batches not yet indexed."""
+    first = ingest_service.dedupe_batch(ingest_service.prepare_batch([
+        {"chat_id": 1, "msg_id": 1, "text": "Pending message body", "date": datetime.now()},
+    ]))
+    second = ingest_service.prepare_batch([
+        {"chat_id": 1, "msg_id": 2, "text": "Pending message body", "date": datetime.now()},
+        {"chat_id": 1, "msg_id": 3, "text": "Something else entirely", "date": datetime.now()},
+    ])
+
+    deduped = ingest_service.dedupe_batch(second, pending=[first])
+
+    assert [doc["msg_id"] for doc in deduped.docs] == [3]
+    assert ingest_service.stats.exact_duplicates == 1
@@ -0,0 +1,82 @@
+"""Tests for NDJSON upload payloads."""
+
+import gzip
+import json
+import zlib
+from unittest.mock import Mock, patch
+
+import pytest
+
+from telegram_search.config import MeilisearchConfig
+from telegram_search.search.meili_client import MeiliApiError, MeiliClient
+from telegram_search.search.payload import compress_chunks, encode_documents, iter_ndjson
+
+DOCS = [{"id": f"1_{i}", "text": f"消息 {i}", "date": 1700000000 + i} for i in range(500)]
+
+
+def _lines(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in data.decode("utf-8").splitlines()]
+
+
+def test_iter_ndjson_chunks():
+    """Test documents are written one per line in bounded chunks."""
+    chunks = list(iter_ndjson(iter(DOCS), chunk_size=1024))
+    assert len(chunks) > 1
+    assert all(len(c) < 2 * 1024 for c in chunks)
+    assert _lines(b"".join(chunks)) == DOCS
+    assert "消息".encode("utf-8") in chunks[0]  # not \\u-escaped
+    assert list(iter_ndjson([])) == []
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress",
+    [("", lambda b: b), ("gzip", gzip.decompress), ("deflate", zlib.decompress)],
+)
+def test_encode_documents(encoding, decompress):
+    """Test encoded bodies decompress back to the documents."""
+    body, count = encode_documents((doc for doc in DOCS), encoding)
+    assert count == len(DOCS)
+    assert _lines(decompress(body)) == DOCS
+    if encoding:
+        assert len(body) < len(decompress(body)) / 3
+
+
+def test_unknown_encoding():
+    """Test unsupported encodings are rejected."""
+    with pytest.raises(ValueError):
+        list(compress_chunks([b"x"], "br"))
+
+
+@patch("telegram_search.search.meili_client.meilisearch.Client")
+def test_meili_client_ndjson_upload(mock_client):
+    """Test MeiliClient posts compressed NDJSON when configured."""
+    config = MeilisearchConfig(upload_format="ndjson", upload_compression="gzip", api_key="k")
+    client = MeiliClient(config)
+    client._http = Mock()
+    client._http.post.return_value.status_code = 202
+    client._http.post.return_value.json.return_value = {"taskUid": 5}
+
+    assert client.add_documents(doc for doc in DOCS) == 5
+    assert client.add_documents(iter([])) is None
+
+    _, kwargs = client._http.post.call_args
+    assert kwargs["headers"] == {
+        "Content-Type": "application/x-ndjson",
+        "Content-Encoding": "gzip",
+    }
+    assert _lines(gzip.decompress(kwargs["data"])) == DOCS
+    mock_client.return_value.index.return_value.add_documents.assert_not_called()
+
+    client._http.post.return_value.status_code = 400
+    client._http.post.return_value.json.return_value = {"code": "malformed_payload"}
+    with pytest.raises(MeiliApiError):
+        client.add_documents_ndjson(DOCS[:1])
+
+
+def test_invalid_upload_settings():
+    """Test compression without NDJSON is rejected."""
+    with patch("telegram_search.search.meili_client.meilisearch.Client"):
+        with pytest.raises(ValueError):
+            MeiliClient(MeilisearchConfig(upload_compression="gzip"))
+        with pytest.raises(ValueError):
+            MeiliClient(MeilisearchConfig(upload_format="csv"))
@@ -1,7 +1,20 @@
 """Tests for content processing pipeline."""
 
 
-from telegram_search.pipeline import normalizer, tokenizer, deduper
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+from opencc import OpenCC
+from pypinyin import lazy_pinyin
+
+from telegram_search.models.schema import IndexSchema
+from telegram_search.pipeline import normalizer, tokenizer, deduper, transformer, pinyin
+from telegram_search.pipeline.parallel import TransformPool
+from telegram_search.pipeline.pinyin import MappedPinyinTable, PinyinEngine, build_table
+from telegram_search.pipeline.simhash_index import SimhashIndex
+from telegram_search.pipeline.zhconv import ChineseConverter
 
 
 class TestNormalizer:
@@ -41,6 +54,151 @@ class TestNormalizer:
         """Test normalize with empty string."""
         assert normalizer.normalize("") == ""
 
+    def test_classify_script(self):
+        """Test Han character counting and script classes."""
+        assert normalizer.classify_script("Hello world") == normalizer.ScriptInfo(0, "other")
+        assert normalizer.classify_script("") == normalizer.ScriptInfo(0, "other")
+        assert normalizer.classify_script("你好 world") == normalizer.ScriptInfo(2, "mixed")
+        assert normalizer.classify_script("電腦 ok") == normalizer.ScriptInfo(2, "han")
+        assert normalizer.classify_script("\U00020000〇") == normalizer.ScriptInfo(2, "han")
+
+    def test_other_script_is_not_converted(self):
+        """Test conversions are identities on text without Han characters."""
+        text = "Привет мир - https://example.com/a?b=1 ©"
+        assert not normalizer.classify_script(text).has_han
+        assert normalizer.to_simplified(text) == text
+        assert normalizer.to_traditional(text) == text
+        assert normalizer.to_pinyin(text) == text
+
+
+class TestChineseConverter:
+    """Tests for the table-driven converter against OpenCC."""
+
+    @staticmethod
+    def _corpus(converter: ChineseConverter, seed: int, count: int) -> list[str]:
+        """Random strings spliced from dictionary phrases, characters and separators."""
+        rng = random.Random(seed)
+        phrases = list(converter._phrases)
+        characters = [chr(c) for c in converter._table]
+        fillers = [" ", "，", "。", "-", "．", "\n", "！", "abc", "123"]
+        texts = []
+        for _ in range(count):
+            parts = []
+            for _ in range(rng.randint(1, 12)):
+                roll = rng.random()
+                if roll < 0.4:
+                    parts.append(rng.choice(phrases))
+                elif roll < 0.8:
+                    parts.append(rng.choice(characters))
+                else:
+                    parts.append(rng.choice(fillers))
+            texts.append("".join(parts))
+        return texts
+
+    @pytest.mark.parametrize("conversion", ["s2t", "t2s"])
+    def test_matches_opencc(self, conversion):
+        """Output is identical to OpenCC on a regression corpus."""
+        reference = OpenCC(conversion)
+        converter = ChineseConverter.from_opencc(conversion)
+        texts = self._corpus(converter, seed=7, count=2000)
+        texts += [
+            "今天天气不错，我们去公园散步吧",
+            "銀行行長表示利率將保持穩定。電腦軟體的發展歷史非常悠久",
+            "Breaking: 长江流域 v2.3.1 https://example.com/发展",
+            "",
+        ]
+        for text in texts:
+            assert converter.convert(text) == reference.convert(text), text
+
+    def test_longest_phrase_wins(self):
+        """The longest phrase anywhere in a segment is replaced first."""
+        converter = ChineseConverter({"ab": "X", "bcd": "Y"}, {"a": "1", "b": "2"})
+        assert converter.convert("abcd") == "1Y"
+        assert converter.convert("ab cd") == "X cd"
+
+    def test_memoizes_segments(self):
+        """Repeated segments are served from the cache."""
+        converter = ChineseConverter.from_opencc("s2t")
+        converter.convert("电脑，电脑")
+        info = converter._convert_segment.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    def test_unsupported_conversion(self):
+        """Multi-stage OpenCC configurations are rejected."""
+        with pytest.raises(ValueError):
+            ChineseConverter.from_opencc("s2twp")
+
+
+@pytest.fixture(scope="module")
+def pinyin_table(tmp_path_factory):
+    """Pinyin table file built from the installed pypinyin."""
+    path = tmp_path_factory.mktemp("pinyin") / "pinyin.bin"
+    build_table(path)
+    return path
+
+
+class TestPinyinEngine:
+    """Tests for the table-driven pinyin engine against pypinyin."""
+
+    @pytest.mark.parametrize("use_mmap", [True, False])
+    def test_matches_lazy_pinyin(self, pinyin_table, use_mmap):
+        """Output is identical to lazy_pinyin on a regression corpus."""
+        engine = PinyinEngine.from_file(pinyin_table, use_mmap=use_mmap)
+        table = MappedPinyinTable(pinyin_table).to_dict()
+        phrases = [key for key, (flags, _) in table.items() if flags & pinyin.PHRASE]
+        characters = [key for key in table if len(key) == 1]
+        fillers = ["abc", " ", "，", "123", "〇", "x y", "\U00020000"]
+
+        rng = random.Random(11)
+        texts = [
+            "你好，世界",
+            "银行行长表示利率将保持稳定",
+            "中国人民银行 PBOC 2024年",
+            "",
+        ]
+        for _ in range(2000):
+            parts = []
+            for _ in range(rng.randint(1, 10)):
+                roll = rng.random()
+                if roll < 0.3:
+                    parts.append(rng.choice(phrases))
+                elif roll < 0.85:
+                    parts.append(rng.choice(characters))
+                else:
+                    parts.append(rng.choice(fillers))
+            texts.append("".join(parts))
+
+        for text in texts:
+            assert engine.convert(text) == " ".join(lazy_pinyin(text)), text
+
+    def test_max_chars(self, pinyin_table):
+        """Only the first max_chars characters are converted."""
+        engine = PinyinEngine.from_file(pinyin_table, max_chars=2)
+        assert engine.convert("你好世界") == "ni hao"
+
+    def test_memoizes_runs(self, pinyin_table):
+        """Repeated Han runs are served from the cache."""
+        engine = PinyinEngine.from_file(pinyin_table)
+        assert engine.convert("你好 abc 你好") == "ni hao  abc  ni hao"
+        info = engine._convert_run.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    def test_rebuilds_invalid_table(self, tmp_path):
+        """An invalid table file is rebuilt instead of failing."""
+        path = tmp_path / "pinyin.bin"
+        path.write_bytes(b"not a table")
+        engine = PinyinEngine.from_file(path)
+        assert engine.convert("中国") == "zhong guo"
+
+    def test_rebuilds_outside_repo(self, tmp_path, monkeypatch):
+        """The build child imports the package from another working directory."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("PYTHONPATH", raising=False)
+        engine = PinyinEngine.from_file(tmp_path / "pinyin.bin")
+        assert engine.convert("中国") == "zhong guo"
+
 
 class TestTokenizer:
     """Tests for tokenizer module."""
@@ -95,3 +253,276 @@ class TestDeduper:
         h1 = deduper.compute_simhash("完全不同的内容")
         h2 = deduper.compute_simhash("Another text")
         assert deduper.is_duplicate(h1, h2, threshold=3) is False
+
+    def test_parse_simhash(self):
+        """Test parsing simhash hex strings."""
+        assert deduper.parse_simhash("0") == 0
+        assert deduper.parse_simhash("0xff") == 255
+
+    def test_simhash_value_roundtrip(self):
+        """Test integer fingerprints match the hex form."""
+        value = deduper.simhash_value("这是一段测试文本")
+        assert isinstance(value, int)
+        assert deduper.format_simhash(value) == deduper.compute_simhash("这是一段测试文本")
+        assert deduper.simhash_value("") == 0
+        assert deduper.format_simhash(0) == "0"
+
+    def test_hamming_distance_int(self):
+        """Test Hamming distance on integer fingerprints."""
+        assert deduper.hamming_distance(0b1011, 0b0001) == 2
+        assert deduper.hamming_distance("0xb", 0b0001) == 2
+
+    def test_content_digest(self):
+        """Test exact-content digests."""
+        digest = deduper.content_digest("同一段内容")
+        assert digest == deduper.content_digest("同一段内容")
+        assert digest != deduper.content_digest("另一段内容")
+        assert 0 <= digest < 2**64
+
+    def test_digest_window_eviction(self):
+        """Test the digest window is bounded and FIFO."""
+        window = deduper.DigestWindow(max_size=2)
+        window.add(1)
+        window.add(1)
+        window.add(2)
+        assert len(window) == 2
+        assert 1 in window
+        window.add(3)
+        assert 1 not in window
+        assert 2 in window and 3 in window
+
+    def test_distances_vectorized(self):
+        """Test distance-to-all matches pairwise distances."""
+        window = np.array([0, 0xFF, 2**64 - 1], dtype=np.uint64)
+        result = deduper.distances(window, 0x0F)
+        assert result.tolist() == [4, 4, 60]
+
+
+class TestSimhashIndex:
+    """Tests for SimhashIndex."""
+
+    def test_contains_near_within_threshold(self):
+        """Test lookups find fingerprints within the Hamming radius."""
+        index = SimhashIndex(max_size=10, threshold=3)
+        base = 0x0123456789ABCDEF
+        index.add(base)
+
+        assert index.contains_near(base)
+        # Flip three bits spread over different blocks
+        assert index.contains_near(base ^ (1 << 0) ^ (1 << 20) ^ (1 << 63))
+        # Four flipped bits exceed the threshold
+        assert not index.contains_near(base ^ 0b1111)
+
+    def test_eviction_is_fifo(self):
+        """Test that the oldest fingerprints are evicted first."""
+        index = SimhashIndex(max_size=2, threshold=3)
+        index.add(0)
+        index.add(0xFFFF_FFFF_FFFF_FFFF)
+        index.add(0xFFFF_0000_FFFF_0000)
+
+        assert len(index) == 2
+        assert not index.contains_near(0)
+        assert index.contains_near(0xFFFF_FFFF_FFFF_FFFF)
+
+    def test_duplicate_fingerprints_refcounted(self):
+        """Test evicting one copy keeps other copies of the same fingerprint."""
+        index = SimhashIndex(max_size=2, threshold=3)
+        index.add(42)
+        index.add(42)
+        index.add(0xFFFF_FFFF_FFFF_FFFF)
+
+        assert index.contains_near(42)
+
+    def test_matches_linear_scan(self):
+        """Test the index agrees with a brute-force scan."""
+        import random
+
+        rng = random.Random(0)
+        window = [rng.getrandbits(64) for _ in range(200)]
+        index = SimhashIndex(max_size=len(window), threshold=3)
+        for fp in window:
+            index.add(fp)
+
+        queries = [fp ^ (1 << rng.randrange(64)) for fp in window[:50]]
+        queries += [rng.getrandbits(64) for _ in range(50)]
+        for query in queries:
+            expected = any((query ^ fp).bit_count() <= 3 for fp in window)
+            assert index.contains_near(query) is expected
+
+    def test_fingerprints_and_distances(self):
+        """Test the ring buffer view and vectorized distances."""
+        index = SimhashIndex(max_size=3, threshold=3)
+        for fp in (1, 2, 3, 4):
+            index.add(fp)
+
+        assert index.fingerprints().tolist() == [2, 3, 4]
+        assert sorted(index.distances(0).tolist()) == [1, 1, 2]
+
+    def test_load_is_exact_before_warm(self):
+        """Test loaded fingerprints are found before and after warming."""
+        index = SimhashIndex(max_size=4, threshold=3, warm_step=1)
+        index.load(np.array([10, 20, 30, 40, 50], dtype=np.uint64))
+
+        assert len(index) == 4
+        assert index.fingerprints().tolist() == [20, 30, 40, 50]
+        assert not index.contains_near(10 ^ 0xF000_0000_0000_0000)
+        assert index.contains_near(50)
+        assert index.contains_near(50 ^ (1 << 40))
+
+        index.warm()
+        assert index.contains_near(20)
+
+    def test_load_then_evict(self):
+        """Test cold entries are evicted correctly while warming."""
+        index = SimhashIndex(max_size=3, threshold=0, warm_step=1)
+        index.load(np.array([1, 2, 3], dtype=np.uint64))
+        for fp in (100, 200, 300):
+            index.add(fp)
+
+        assert index.fingerprints().tolist() == [100, 200, 300]
+        for fp in (1, 2, 3):
+            assert not index.contains_near(fp)
+        for fp in (100, 200, 300):
+            assert index.contains_near(fp)
+
+    def test_invalid_arguments(self):
+        """Test invalid constructor arguments."""
+        with pytest.raises(ValueError):
+            SimhashIndex(max_size=0)
+        with pytest.raises(ValueError):
+            SimhashIndex(threshold=64)
+
+
+class TestTransformer:
+    """Tests for transformer module."""
+
+    TEXTS = [
+        "今天天气不错，我们去公园散步吧！",
+        "電腦軟體很好用。",
+        "Hello   world\nsecond line",
+        "Привет мир 中国",
+        "重庆 长大了 行长 乾隆 干燥",
+        "今天天气不错，我们去公园散步吧！",
+    ]
+
+    def _messages(self):
+        return [
+            {
+                "chat_id": -100123,
+                "msg_id": i,
+                "text": text,
+                "date": datetime(2024, 1, 1, 12, 0, i),
+                "chat_username": "channel" if i % 2 else "",
+            }
+            for i, text in enumerate(self.TEXTS)
+        ]
+
+    def test_transform_messages_matches_single(self):
+        """Test batch output equals per-message transform output."""
+        messages = self._messages()
+        expected = [transformer.transform_message(**m).to_index_dict() for m in messages]
+        docs = list(transformer.transform_messages(messages))
+        assert all(isinstance(doc["simhash"], int) for doc in docs)
+        assert [IndexSchema().shape(doc) for doc in docs] == expected
+
+    def test_transform_skips_conversions_without_han(self, monkeypatch):
+        """Test non-Chinese messages bypass the conversions."""
+        def fail(text):
+            raise AssertionError(f"converted {text!r}")
+
+        monkeypatch.setattr(normalizer, "to_simplified", fail)
+        monkeypatch.setattr(normalizer, "to_traditional", fail)
+        monkeypatch.setattr(normalizer, "to_pinyin", fail)
+        message = {**self._messages()[2], "text": "Breaking: markets rally"}
+
+        doc = transformer.transform_message(**message)
+        assert doc.simp == doc.trad == doc.pinyin == "Breaking: markets rally"
+        assert (doc.script, doc.han_count) == ("other", 0)
+        (batch_doc,) = transformer.transform_messages([message])
+        assert IndexSchema().shape(batch_doc) == doc.to_index_dict()
+
+    def test_transform_records_script(self):
+        """Test the script classification is carried on the document."""
+        doc = transformer.transform_message(**self._messages()[3])
+        assert (doc.script, doc.han_count) == ("mixed", 2)
+
+    def test_transform_messages_uses_text_norm(self):
+        """Test a precomputed text_norm is used as-is."""
+        message = {**self._messages()[0], "text_norm": "预先规范化"}
+        (doc,) = transformer.transform_messages([message])
+        assert doc["text_norm"] == "预先规范化"
+
+    def test_transform_messages_iso_date(self):
+        """Test string dates from file imports are accepted."""
+        message = {**self._messages()[0], "date": "2024-01-01T12:00:00"}
+        (doc,) = transformer.transform_messages([message])
+        assert doc["date"] == int(datetime(2024, 1, 1, 12).timestamp())
+
+    def test_transform_messages_on_error(self):
+        """Test failed messages are reported and skipped."""
+        messages = self._messages()[:2]
+        del messages[0]["msg_id"]
+        errors = []
+        docs = list(
+            transformer.transform_messages(
+                messages, on_error=lambda m, e: errors.append((m, e))
+            )
+        )
+        assert [d["msg_id"] for d in docs] == [1]
+        assert len(errors) == 1 and isinstance(errors[0][1], KeyError)
+
+    def test_transform_messages_raises_without_handler(self):
+        """Test errors propagate when no handler is given."""
+        message = self._messages()[0]
+        del message["date"]
+        with pytest.raises(KeyError):
+            list(transformer.transform_messages([message]))
+
+
+class TestTransformPool:
+    """Tests for TransformPool."""
+
+    @pytest.fixture
+    def pool(self):
+        pool = TransformPool(workers=2, min_chunk_size=2)
+        yield pool
+        pool.close()
+
+    def _messages(self, count):
+        return [
+            {
+                "chat_id": 1,
+                "msg_id": i,
+                "text": f"第{i}条消息 電腦 message {i}",
+                "date": datetime(2024, 1, 1),
+            }
+            for i in range(count)
+        ]
+
+    def test_matches_in_process_order(self, pool):
+        """Test pooled output equals in-process output, in order."""
+        messages = self._messages(20)
+        expected = list(transformer.transform_messages(messages))
+        assert list(pool.transform_messages(messages)) == expected
+
+    def test_errors_reported_in_place(self, pool):
+        """Test worker failures are reported with their message."""
+        messages = self._messages(10)
+        del messages[3]["date"]
+        errors = []
+        docs = list(pool.transform_messages(messages, on_error=lambda m, e: errors.append(m)))
+
+        assert [d["msg_id"] for d in docs] == [i for i in range(10) if i != 3]
+        assert [m["msg_id"] for m in errors] == [3]
+
+    def test_small_batch_in_process(self, pool):
+        """Test tiny batches skip the workers."""
+        messages = self._messages(3)
+        assert list(pool.transform_messages(messages)) == list(
+            transformer.transform_messages(messages)
+        )
+
+    def test_invalid_workers(self):
+        """Test workers must be positive."""
+        with pytest.raises(ValueError):
+            TransformPool(workers=0)
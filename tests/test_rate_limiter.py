@@ -0,0 +1,158 @@
+"""Tests for rate limiters and paged Telegram fetching."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from telethon.errors import FloodWaitError
+from telethon.tl.types import Message
+
+from telegram_search.config import TelegramConfig
+from telegram_search.indexer.rate_limiter import AdaptiveRateLimiter, TokenBucket
+from telegram_search.indexer.state_store import StateStore
+from telegram_search.indexer.telethon_client import HISTORY_METHOD, TelethonCrawler
+
+
+@pytest.mark.asyncio
+async def test_burst_is_immediate_then_metered():
+    """Test a full bucket serves its burst at once and then waits for refills."""
+    bucket = TokenBucket(rate=50, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+    assert time.monotonic() - start < 0.02
+
+    await bucket.acquire()
+    await bucket.acquire()
+    assert time.monotonic() - start >= 0.035
+
+
+@pytest.mark.asyncio
+async def test_zero_rate_disables_limiting():
+    """Test a non-positive rate never waits."""
+    bucket = TokenBucket(rate=0)
+    assert [await bucket.acquire() for _ in range(100)] == [0.0] * 100
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_in_arrival_order():
+    """Test concurrent consumers take turns instead of one starving the others."""
+    bucket = TokenBucket(rate=200, burst=1)
+    await bucket.acquire()  # empty the bucket so every consumer has to queue
+    order = []
+
+    async def consumer(name):
+        for _ in range(3):
+            await bucket.acquire()
+            order.append(name)
+
+    await asyncio.gather(consumer("a"), consumer("b"), consumer("c"))
+    assert order == ["a", "b", "c"] * 3
+
+
+def _message(msg_id):
+    msg = MagicMock(spec=Message)
+    msg.id = msg_id
+    msg.chat_id = -100
+    msg.text = f"message {msg_id}"
+    msg.date = None
+    return msg
+
+
+@pytest.mark.asyncio
+async def test_fetch_messages_meters_pages():
+    """Test history is requested page by page, one token per page."""
+    history = [_message(i) for i in range(1, 251)]
+    calls = []
+
+    def iter_messages(channel, limit, min_id=0, reverse=False, offset_id=0):
+        calls.append((limit, min_id))
+
+        async def page():
+            for msg in [m for m in history if m.id > min_id][:limit]:
+                yield msg
+
+        return page()
+
+    crawler = TelethonCrawler(TelegramConfig(page_size=100, request_rate=20, request_burst=10))
+    bucket = crawler.limiter(HISTORY_METHOD)
+    bucket.acquire = MagicMock(wraps=bucket.acquire)
+    crawler._client = MagicMock()
+    crawler._client.iter_messages.side_effect = iter_messages
+
+    ids = [m["msg_id"] async for m in crawler.fetch_messages(-100, limit=230, reverse=True)]
+
+    assert ids == list(range(1, 231))
+    assert calls == [(100, 0), (100, 100), (30, 200)]
+    assert bucket.acquire.call_count == 3
+
+
+def test_aimd_increases_additively_and_decreases_multiplicatively():
+    """Test successes add to the rate and a flood wait halves it within bounds."""
+    changes = []
+    limiter = AdaptiveRateLimiter(
+        2.0, min_rate=0.5, max_rate=2.2, increase=0.1, decrease=0.5, on_change=changes.append
+    )
+    for _ in range(5):
+        limiter.record_success()
+    assert limiter.rate == pytest.approx(2.2)
+
+    limiter.record_flood_wait(0)
+    assert limiter.rate == pytest.approx(1.1)
+    limiter.record_flood_wait(0)
+    limiter.record_flood_wait(0)
+    assert limiter.rate == 0.5
+    assert changes == pytest.approx([2.1, 2.2, 1.1, 0.55, 0.5])
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_pauses_all_acquirers():
+    """Test a flood wait holds every caller until it has passed."""
+    limiter = AdaptiveRateLimiter(100.0, burst=5)
+    limiter.record_flood_wait(0.05)
+    start = time.monotonic()
+    await asyncio.gather(limiter.acquire(), limiter.acquire())
+    assert time.monotonic() - start >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_learned_rate_is_persisted_per_session_and_method(tmp_path):
+    """Test the crawler resumes from the rate learned in an earlier run."""
+    state = StateStore(tmp_path / "state.json")
+    config = TelegramConfig(request_rate=1.0, rate_increase=0.5)
+    crawler = TelethonCrawler(config, state_store=state, session="alice")
+    crawler.limiter(HISTORY_METHOD).record_success()
+
+    reloaded = StateStore(tmp_path / "state.json")
+    assert reloaded.get_rate("alice", HISTORY_METHOD) == 1.5
+    assert reloaded.get_rate("bob", HISTORY_METHOD) is None
+    assert TelethonCrawler(config, reloaded, "alice").limiter(HISTORY_METHOD).rate == 1.5
+    assert TelethonCrawler(config, reloaded, "bob").limiter(HISTORY_METHOD).rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_fetch_messages_backs_off_on_flood_wait():
+    """Test a flood wait lowers the rate and the same page is requested again."""
+    attempts = []
+
+    def iter_messages(channel, limit, min_id=0, reverse=False, offset_id=0):
+        attempts.append(min_id)
+
+        async def page():
+            if len(attempts) == 1:
+                raise FloodWaitError(request=None, capture=0)
+            for i in range(1, 4):
+                yield _message(i)
+
+        return page()
+
+    crawler = TelethonCrawler(TelegramConfig(request_rate=4.0, rate_decrease=0.5))
+    crawler._client = MagicMock()
+    crawler._client.iter_messages.side_effect = iter_messages
+
+    ids = [m["msg_id"] async for m in crawler.fetch_messages(-100, limit=10, reverse=True)]
+
+    assert ids == [1, 2, 3]
+    assert attempts == [0, 0]
+    assert crawler.limiter(HISTORY_METHOD).rate == pytest.approx(2.0 + 0.05)
@@ -1,5 +1,7 @@
 """Tests for realtime listener."""
 
+import asyncio
+
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from datetime import datetime
@@ -9,8 +11,20 @@ from telethon.tl.types import Message
 
 from telegram_search.indexer.telethon_client import TelethonCrawler
 from telegram_search.indexer.realtime_listener import RealtimeListener
+from telegram_search.indexer.channel_registry import Channel
+from telegram_search.indexer.entity_cache import EntityCache
+from telegram_search.indexer.historical_sync import HistoricalSync
+from telegram_search.indexer.ingest_service import IngestResult, IngestService
+from telegram_search.indexer.state_store import StateStore
+from telegram_search.indexer.sync_pipeline import SyncPipeline
+from telegram_search.indexer.task_tracker import TaskTracker
+from telegram_search.pipeline.filters import MessageFilter
+from telegram_search.search.meili_client import MeiliClient
 from telegram_search.config import TelegramConfig
 
+# Registry id of the test channel; Telethon reports it in this marked form
+CHANNEL_ID = -1001234567890
+
 
 @pytest.fixture
 def mock_config():
@@ -107,6 +121,17 @@ class TestRealtimeListener:
         assert isinstance(call_args[0][1], events.NewMessage)
         assert call_args[0][1].chats == channels
 
+    @pytest.mark.asyncio
+    async def test_stop_disconnects(self, mock_config):
+        """Test stop disconnects the client so start returns."""
+        crawler = TelethonCrawler(mock_config)
+        crawler.disconnect = AsyncMock()
+
+        listener = RealtimeListener(crawler, AsyncMock())
+        await listener.stop()
+
+        crawler.disconnect.assert_awaited_once()
+
     @pytest.mark.asyncio
     async def test_handle_new_message_async(self, mock_config):
         """Test handling new message with async callback."""
@@ -173,3 +198,179 @@ class TestRealtimeListener:
         await listener._handle_new_message(event)
         
         callback.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_handle_new_message_enriched(self, mock_config):
+        """Test messages carry the chat title, username and permalink."""
+        crawler = TelethonCrawler(mock_config)
+        crawler.entities.seed([Channel(channel_id=1234567890, username="news", title="新闻")])
+        callback = AsyncMock()
+        listener = RealtimeListener(crawler, callback)
+
+        event = MagicMock(spec=events.NewMessage.Event)
+        message = MagicMock(spec=Message)
+        message.text = "Hello"
+        message.chat_id = -1001234567890
+        message.id = 7
+        message.date = datetime.now()
+        event.message = message
+
+        await listener._handle_new_message(event)
+
+        data = callback.call_args[0][0]
+        assert data["chat_title"] == "新闻"
+        assert data["chat_username"] == "news"
+        assert data["url"] == "https://t.me/news/7"
+
+
+class FakeCrawler:
+    """TelethonCrawler stand-in serving a canned channel history."""
+
+    def __init__(self, messages, connected=(True,)):
+        self.messages = messages
+        self.entities = EntityCache()
+        self.fetches = []
+        self.connected = list(connected)
+
+    async def connect(self):
+        pass
+
+    def add_event_handler(self, callback, event):
+        pass
+
+    async def run_until_disconnected(self):
+        await asyncio.sleep(0.05)
+
+    def is_connected(self):
+        return self.connected.pop(0) if len(self.connected) > 1 else self.connected[0]
+
+    async def get_latest_message_id(self, channel_id):
+        return max(m["msg_id"] for m in self.messages)
+
+    async def fetch_messages(self, channel_id, limit=100, min_id=0, reverse=False, offset_id=0):
+        self.fetches.append((min_id, offset_id))
+        for msg in sorted(self.messages, key=lambda m: m["msg_id"], reverse=True):
+            if min_id < msg["msg_id"] < offset_id:
+                yield msg
+
+
+def _history(count):
+    return [
+        {"chat_id": CHANNEL_ID, "msg_id": i, "text": f"msg {i}", "date": datetime.now()}
+        for i in range(1, count + 1)
+    ]
+
+
+def _event(msg_id, text="Hello"):
+    event = MagicMock(spec=events.NewMessage.Event)
+    message = MagicMock(spec=Message)
+    message.text = text
+    message.chat_id = CHANNEL_ID
+    message.id = msg_id
+    message.date = datetime.now()
+    event.message = message
+    return event
+
+
+class TestCatchUp:
+    """Tests for RealtimeListener gap catch-up."""
+
+    @pytest.mark.asyncio
+    async def test_live_messages_recorded(self, tmp_path):
+        """Test handled live messages are recorded, failed ones are not."""
+        state = StateStore(tmp_path / "state.json")
+        crawler = FakeCrawler([])
+        results = {1: IngestResult.INDEXED, 2: IngestResult.ERROR, 3: IngestResult.SKIPPED}
+        listener = RealtimeListener(
+            crawler,
+            AsyncMock(side_effect=lambda msg: results[msg["msg_id"]]),
+            sync=HistoricalSync(crawler, state),
+            state_store=state,
+        )
+
+        listener._keys = {1234567890: CHANNEL_ID}
+
+        for msg_id in (1, 2, 3):
+            await listener._handle_new_message(_event(msg_id))
+        await listener._handle_new_message(_event(4, text=""))
+
+        assert state.get_ranges(CHANNEL_ID).to_list() == [[1, 1], [3, 4]]
+
+    @pytest.mark.asyncio
+    async def test_catch_up_backfills_missed_messages(self, tmp_path):
+        """Test ids missed since the last synced message are backfilled once."""
+        state = StateStore(tmp_path / "state.json")
+        state.add_range(CHANNEL_ID, 1, 10)
+        crawler = FakeCrawler(_history(30))
+        received = []
+
+        async def callback(msg):
+            received.append(msg["msg_id"])
+            return IngestResult.INDEXED
+
+        listener = RealtimeListener(
+            crawler, callback, sync=HistoricalSync(crawler, state), state_store=state,
+            batch_size=5,
+        )
+        listener._keys = {1234567890: CHANNEL_ID}
+        listener._floors = listener._load_floors()
+        # Arrived live before the catch-up reached it
+        await listener._handle_new_message(_event(20, text="msg 20"))
+
+        await listener.catch_up()
+
+        # Both gaps backfilled, without fetching message 20 a second time
+        assert received[0] == 20
+        assert sorted(received[1:]) == list(range(11, 20)) + list(range(21, 31))
+        assert state.get_ranges(CHANNEL_ID).to_list() == [[1, 30]]
+
+        crawler.messages += _history(33)[30:]
+        received.clear()
+        await listener.catch_up()
+        assert received == [33, 32, 31]
+
+    @pytest.mark.asyncio
+    async def test_start_catches_up_after_historical_sync(self, tmp_path):
+        """Test a channel checkpointed by historical sync is caught up on at start."""
+        state = StateStore(tmp_path / "state.json")
+        crawler = FakeCrawler(_history(20))
+        meili = Mock(spec=MeiliClient)
+        meili.add_documents.return_value = 1
+        meili.get_task_statuses.return_value = {1: {"status": "succeeded", "error": None}}
+        sync = HistoricalSync(crawler, state)
+        pipeline = SyncPipeline(
+            sync,
+            IngestService(meili, MessageFilter()),
+            TaskTracker(meili, poll_interval=0),
+            state,
+        )
+        await pipeline.run([Channel(channel_id=CHANNEL_ID, username="news", title="新闻")])
+        assert state.get_ranges(CHANNEL_ID).to_list() == [[1, 20]]
+
+        crawler.messages += _history(25)[20:]
+        received = []
+
+        async def callback(msg):
+            received.append(msg["msg_id"])
+            return IngestResult.INDEXED
+
+        listener = RealtimeListener(crawler, callback, sync=sync, state_store=state)
+        await listener.start([CHANNEL_ID])
+
+        assert received == [25, 24, 23, 22, 21]
+        assert state.get_ranges(CHANNEL_ID).to_list() == [[1, 25]]
+
+    @pytest.mark.asyncio
+    async def test_catch_up_after_reconnect(self):
+        """Test catch-up runs on start and again after a reconnect."""
+        crawler = FakeCrawler([], connected=[True, True, False, True, True])
+        listener = RealtimeListener(
+            crawler, AsyncMock(), sync=MagicMock(), state_store=MagicMock(), check_interval=0
+        )
+        listener.catch_up = AsyncMock()
+
+        watcher = asyncio.create_task(listener._watch_connection())
+        await asyncio.sleep(0.05)
+        watcher.cancel()
+
+        assert listener.catch_up.await_count == 2
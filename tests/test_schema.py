@@ -0,0 +1,82 @@
+"""Tests for the index document schema."""
+
+import pytest
+
+from telegram_search.config import MeilisearchConfig
+from telegram_search.models.schema import IndexSchema
+
+
+def _doc(**fields):
+    doc = {
+        "id": "1_1",
+        "chat_id": 1,
+        "date": 0,
+        "text": "电脑 软件",
+        "text_norm": "电脑 软件",
+        "pinyin": "dian nao ruan jian",
+        "trad": "電腦 軟體",
+        "simp": "电脑 软件",
+        "simhash": "0",
+    }
+    doc.update(fields)
+    return doc
+
+
+def test_full_schema_keeps_document():
+    """Full mode ships every field."""
+    doc = _doc()
+    assert IndexSchema().shape(doc) == doc
+
+
+def test_shape_formats_integer_simhash():
+    """Integer fingerprints from the batch transform are written as hex."""
+    doc = _doc(simhash=255)
+    assert IndexSchema().shape(doc)["simhash"] == "0xff"
+    assert IndexSchema("lean").shape(doc)["simhash"] == "0xff"
+    assert doc["simhash"] == 255
+
+
+def test_lean_schema_drops_duplicates():
+    """Lean mode drops variants equal to text_norm and text_norm equal to text."""
+    shaped = IndexSchema("lean").shape(_doc())
+    assert "simp" not in shaped
+    assert "text_norm" not in shaped
+    assert shaped["trad"] == "電腦 軟體"
+    assert shaped["pinyin"] == "dian nao ruan jian"
+
+
+def test_lean_schema_stored_variants():
+    """Variants that are not stored are dropped even when they differ."""
+    schema = IndexSchema("lean", stored_variants=["pinyin"], searchable_variants=["pinyin"])
+    shaped = schema.shape(_doc(text="电脑  软件"))
+    assert "trad" not in shaped
+    assert shaped["text_norm"] == "电脑 软件"
+    assert schema.searchable_attributes() == ["text", "text_norm", "pinyin", "chat_title"]
+
+
+def test_index_settings():
+    """Searchable attributes follow the schema; other settings are kept."""
+    base = {"searchableAttributes": ["text"], "sortableAttributes": ["date"]}
+    settings = IndexSchema("lean", searchable_variants=["simp"]).index_settings(base)
+    assert settings["searchableAttributes"] == ["text", "text_norm", "simp", "chat_title"]
+    assert settings["sortableAttributes"] == ["date"]
+    assert base["searchableAttributes"] == ["text"]
+
+
+def test_invalid_schema():
+    """Unknown modes and unstored searchable variants are rejected."""
+    with pytest.raises(ValueError):
+        IndexSchema("tiny")
+    with pytest.raises(ValueError):
+        IndexSchema("lean", stored_variants=["simp"], searchable_variants=["trad"])
+    with pytest.raises(ValueError):
+        IndexSchema("lean", stored_variants=["text"])
+
+
+def test_from_config():
+    """Schema is built from the Meilisearch configuration."""
+    config = MeilisearchConfig(schema_mode="lean", stored_variants=["trad"], searchable_variants=[])
+    schema = IndexSchema.from_config(config)
+    assert schema.lean
+    assert schema.stored_variants == ("trad",)
+    assert schema.searchable_variants == ()
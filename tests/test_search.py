@@ -1,10 +1,14 @@
 """Tests for search module."""
 
+import json
+
 import pytest
-from unittest.mock import Mock, patch, call
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import AsyncMock, Mock, patch, call
 
 from telegram_search.config import MeilisearchConfig, AppConfig, SearchConfig, RedisConfig
-from telegram_search.search.meili_client import MeiliClient
+from telegram_search.search.meili_client import AsyncMeiliClient, MeiliApiError, MeiliClient
 from telegram_search.search.search_service import SearchService
 from telegram_search.search.query_parser import ParsedQuery
 
@@ -27,10 +31,32 @@ class TestMeiliClient:
 
         config = MeilisearchConfig()
         client = MeiliClient(config)
-        client.add_documents([{"id": "1", "text": "test"}])
+        mock_index.add_documents.return_value.task_uid = 7
+        assert client.add_documents([{"id": "1", "text": "test"}]) == 7
+        assert client.add_documents([]) is None
 
         mock_index.add_documents.assert_called_once()
 
+    @patch("telegram_search.search.meili_client.meilisearch.Client")
+    def test_get_task_statuses(self, mock_client):
+        """Test task statuses are fetched in one request."""
+        mock_client.return_value.get_tasks.return_value.results = [
+            Mock(uid=1, status="succeeded", error=None),
+            Mock(uid=2, status="failed", error={"code": "invalid_document_id"}),
+        ]
+
+        client = MeiliClient(MeilisearchConfig())
+        statuses = client.get_task_statuses([1, 2])
+
+        assert statuses == {
+            1: {"status": "succeeded", "error": None},
+            2: {"status": "failed", "error": {"code": "invalid_document_id"}},
+        }
+        mock_client.return_value.get_tasks.assert_called_once_with(
+            {"uids": ["1", "2"], "limit": 2}
+        )
+        assert client.get_task_statuses([]) == {}
+
     @patch("telegram_search.search.meili_client.meilisearch.Client")
     def test_search(self, mock_client):
         """Test search."""
@@ -88,6 +114,98 @@ class TestMeiliClient:
         assert mock_index.search.call_count == 3
 
 
+class TestAsyncMeiliClient:
+    """Tests for AsyncMeiliClient against a stub Meilisearch server."""
+
+    @pytest.fixture
+    async def server(self):
+        app = web.Application()
+        state = {"requests": [], "failures": 0}
+
+        async def search(request):
+            state["requests"].append((request.path, await request.json(), request.headers))
+            if state["failures"]:
+                state["failures"] -= 1
+                return web.json_response({"code": "internal"}, status=503)
+            return web.json_response({"hits": [{"id": "1_1"}]})
+
+        async def documents(request):
+            if request.content_type == "application/x-ndjson":
+                body = [json.loads(line) for line in (await request.text()).splitlines()]
+            else:
+                body = await request.json()
+            state["requests"].append((request.path, body, request.headers))
+            return web.json_response({"taskUid": 12}, status=202)
+
+        async def tasks(request):
+            uids = [int(u) for u in request.query["uids"].split(",")]
+            return web.json_response(
+                {"results": [{"uid": u, "status": "succeeded", "error": None} for u in uids]}
+            )
+
+        async def bad_request(request):
+            state["requests"].append((request.path, await request.json(), request.headers))
+            return web.json_response(
+                {"code": "invalid_search_filter", "message": "bad filter"}, status=400
+            )
+
+        app.router.add_post("/indexes/telegram_messages/search", search)
+        app.router.add_post("/indexes/telegram_messages/documents", documents)
+        app.router.add_get("/tasks", tasks)
+        app.router.add_post("/multi-search", bad_request)
+        async with TestServer(app) as srv:
+            srv.state = state
+            yield srv
+
+    @pytest.fixture
+    async def client(self, server):
+        config = MeilisearchConfig(host=str(server.make_url("")), api_key="secret")
+        async with AsyncMeiliClient(config) as client:
+            yield client
+
+    async def test_search_and_add(self, server, client):
+        """Test requests are sent with auth over one pooled session."""
+        result = await client.search("test", filters="chat_id=1", sort=["date:desc"])
+        assert result == {"hits": [{"id": "1_1"}]}
+        assert await client.add_documents([{"id": "1_1"}]) == 12
+        assert await client.add_documents([]) is None
+        assert await client.get_task_statuses([12, 13]) == {
+            12: {"status": "succeeded", "error": None},
+            13: {"status": "succeeded", "error": None},
+        }
+
+        (_, body, headers), _ = server.state["requests"]
+        assert body == {
+            "q": "test", "limit": 20, "offset": 0, "filter": "chat_id=1", "sort": ["date:desc"]
+        }
+        assert headers["Authorization"] == "Bearer secret"
+
+    async def test_ndjson_upload(self, server, client):
+        """Test gzip-compressed NDJSON uploads are decoded by the server."""
+        docs = [{"id": f"1_{i}", "text": "消息"} for i in range(3)]
+        assert await client.add_documents_ndjson(iter(docs), encoding="gzip") == 12
+
+        (_, body, headers), = server.state["requests"]
+        assert body == docs
+        assert headers["Content-Encoding"] == "gzip"
+
+    async def test_retry_transient(self, server, client):
+        """Test 5xx responses are retried with async backoff."""
+        server.state["failures"] = 2
+        with patch("asyncio.sleep", AsyncMock()) as sleep:
+            assert await client.search("test") == {"hits": [{"id": "1_1"}]}
+        assert sleep.await_count == 2
+        assert len(server.state["requests"]) == 3
+
+    async def test_client_error_not_retried(self, server, client):
+        """Test 4xx responses raise immediately."""
+        with pytest.raises(MeiliApiError) as exc:
+            await client.federated_search(["a", "b"])
+        assert exc.value.status_code == 400
+        assert exc.value.code == "invalid_search_filter"
+        assert len(server.state["requests"]) == 1
+
+
 class TestSearchService:
     """Tests for SearchService."""
 
@@ -160,3 +278,43 @@ class TestSearchService:
         assert "['chat_id=1', 'date >= 1000']" in kwargs['filters'] or "['date >= 1000', 'chat_id=1']" in kwargs['filters']
         
         assert result == expected_result
+
+    def test_lean_schema_searches_converted_query(self, mock_config, mock_meili, mock_cache):
+        """Chinese queries against a lean index also search the other script."""
+        mock_config.meilisearch = MeilisearchConfig(schema_mode="lean")
+        service = SearchService(mock_config)
+        meili_instance = mock_meili.return_value
+        meili_instance.federated_search.return_value = {"hits": [{"id": "1_1"}]}
+
+        result = service.search("电脑", use_cache=False)
+
+        assert result == {"hits": [{"id": "1_1"}]}
+        queries = meili_instance.federated_search.call_args.args[0]
+        assert queries == ["电脑", "電腦"]
+        meili_instance.search.assert_not_called()
+
+        service.search("laptop", use_cache=False)
+        meili_instance.search.assert_called_once()
+
+    async def test_asearch(self, mock_config, mock_meili, mock_cache):
+        """Test the async path uses the async client and the cache."""
+        service = SearchService(mock_config)
+        cache_instance = mock_cache.return_value
+        cache_instance.get.return_value = None
+
+        with patch("telegram_search.search.search_service.AsyncMeiliClient") as mock_async:
+            mock_async.return_value.search = AsyncMock(return_value={"hits": [{"id": 1}]})
+            mock_async.return_value.close = AsyncMock()
+            result = await service.asearch("keyword", limit=5)
+            await service.aclose()
+
+        assert result == {"hits": [{"id": 1}]}
+        mock_async.return_value.search.assert_awaited_once_with(
+            "keyword", limit=5, offset=0, filters=[], sort=None
+        )
+        cache_instance.set.assert_called_once()
+        mock_async.return_value.close.assert_awaited_once()
+        mock_meili.return_value.search.assert_not_called()
+
+        cache_instance.get.return_value = {"hits": []}
+        assert await service.asearch("keyword", limit=5) == {"hits": []}
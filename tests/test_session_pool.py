@@ -0,0 +1,104 @@
+"""Tests for SessionPool and HashRing."""
+
+from collections import Counter
+from unittest.mock import Mock
+
+import pytest
+from telethon import events
+
+from telegram_search.config import TelegramConfig
+from telegram_search.indexer.session_pool import HashRing, SessionPool
+
+
+@pytest.fixture
+def config():
+    return TelegramConfig(api_id=1, api_hash="hash", sessions=["a", "b", "c"])
+
+
+def test_hash_ring_spreads_keys():
+    """Test keys are spread roughly evenly between nodes."""
+    ring = HashRing(["a", "b", "c", "d"])
+    counts = Counter(ring.node_for(str(key)) for key in range(10000))
+    assert set(counts) == {"a", "b", "c", "d"}
+    assert min(counts.values()) > 1500
+
+
+def test_hash_ring_moves_few_keys():
+    """Test adding and removing a node only moves the keys it gains or loses."""
+    keys = [str(key) for key in range(10000)]
+    ring = HashRing(["a", "b", "c"])
+    before = {key: ring.node_for(key) for key in keys}
+
+    ring.add("d")
+    after = {key: ring.node_for(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert all(after[key] == "d" for key in moved)
+    assert len(moved) < 4000
+
+    ring.remove("d")
+    assert {key: ring.node_for(key) for key in keys} == before
+
+
+def test_hash_ring_empty():
+    """Test an empty ring cannot assign keys."""
+    with pytest.raises(LookupError):
+        HashRing().node_for("x")
+
+
+def test_pool_routes_channel_to_one_session(config):
+    """Test marked and bare ids of a channel use the same session and limiter."""
+    pool = SessionPool(config)
+
+    crawler = pool.crawler_for(1234567890)
+    assert pool.crawler_for(-1001234567890) is crawler
+    assert crawler.session in {"a", "b", "c"}
+    assert crawler.entities is pool.entities
+
+    limiters = {pool.crawler_for(c).limiter("messages.getHistory") for c in range(1, 200)}
+    assert len(limiters) == 3
+
+
+def test_pool_rebalances_on_session_change(config):
+    """Test channels of a removed session move and others stay put."""
+    channels = range(1, 500)
+    before = {c: SessionPool(config).crawler_for(c).session for c in channels}
+    pool = SessionPool(config, sessions=["a", "c"])
+    after = {c: pool.crawler_for(c).session for c in channels}
+
+    assert pool.sessions == ["a", "c"]
+    assert all(after[c] == before[c] for c in channels if before[c] != "b")
+    assert "b" not in after.values()
+
+
+@pytest.mark.asyncio
+async def test_pool_fetch_uses_owning_session(config):
+    """Test history is fetched through the session owning the channel."""
+    pool = SessionPool(config)
+    owner = pool.crawler_for(42)
+
+    async def fetch(channel, **kwargs):
+        yield {"chat_id": channel, "msg_id": 1, "session": owner.session}
+
+    owner.fetch_messages = fetch
+    msgs = [msg async for msg in pool.fetch_messages(42, limit=10)]
+
+    assert msgs == [{"chat_id": 42, "msg_id": 1, "session": owner.session}]
+
+
+def test_pool_splits_new_message_handler(config):
+    """Test each session only listens to the channels it owns."""
+    pool = SessionPool(config)
+    for crawler in pool._crawlers.values():
+        crawler.add_event_handler = Mock()
+    channels = list(range(1, 50))
+    callback = Mock()
+
+    pool.add_event_handler(callback, events.NewMessage(chats=channels))
+
+    seen = []
+    for session, crawler in pool._crawlers.items():
+        for (handler, event), _ in crawler.add_event_handler.call_args_list:
+            assert handler is callback
+            assert all(pool.crawler_for(chat).session == session for chat in event.chats)
+            seen.extend(event.chats)
+    assert sorted(seen) == channels
@@ -0,0 +1,168 @@
+"""Tests for Spool and SpoolDrainer."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from telegram_search.indexer.ingest_service import IngestService
+from telegram_search.indexer.spool import Spool, SpoolDrainer, SpoolPosition
+from telegram_search.indexer.task_tracker import TaskFailedError, TaskTracker
+from telegram_search.search.meili_client import MeiliClient
+
+
+def _docs(*ids):
+    return [{"id": i, "text": f"消息 {i}"} for i in ids]
+
+
+def _read_ids(spool, position=None):
+    records = spool.read(position or spool.acked, max_docs=10_000)
+    return [doc["id"] for record in records for doc in record.docs]
+
+
+def test_append_and_read(tmp_path):
+    """Test records are read back in order with their end positions."""
+    spool = Spool(tmp_path)
+    first = spool.append(_docs("a", "b"))
+    second = spool.append(_docs("c"))
+    records = spool.read(spool.acked)
+    assert [r.end for r in records] == [first, second]
+    assert _read_ids(spool) == ["a", "b", "c"]
+    assert _read_ids(spool, first) == ["c"]
+    assert spool.read(second) == []
+
+
+def test_read_stops_at_max_docs(tmp_path):
+    """Test a read returns whole records until the document limit is reached."""
+    spool = Spool(tmp_path)
+    for i in range(5):
+        spool.append(_docs(f"{i}a", f"{i}b"))
+    assert len(spool.read(spool.acked, max_docs=3)) == 2
+
+
+def test_segments_roll_and_are_deleted_when_acked(tmp_path):
+    """Test segments roll over at the size limit and finished ones are removed."""
+    spool = Spool(tmp_path, segment_bytes=200)
+    positions = [spool.append(_docs(f"doc{i}" * 5)) for i in range(6)]
+    segments = sorted(tmp_path.glob("*.seg"))
+    assert len(segments) > 2
+    assert _read_ids(spool) == [f"doc{i}" * 5 for i in range(6)]
+
+    spool.ack(positions[3])
+    remaining = sorted(tmp_path.glob("*.seg"))
+    assert all(int(p.stem) >= positions[3].segment for p in remaining)
+    assert _read_ids(spool) == [f"doc{i}" * 5 for i in range(4, 6)]
+
+    spool.ack(positions[-1])
+    assert spool.pending_bytes() == 0
+    assert len(list(tmp_path.glob("*.seg"))) == 1
+
+
+def test_restart_replays_unacknowledged(tmp_path):
+    """Test a reopened spool resumes after the last acknowledged record."""
+    spool = Spool(tmp_path)
+    first = spool.append(_docs("a"))
+    spool.append(_docs("b"))
+    spool.ack(first)
+    spool.close()
+
+    reopened = Spool(tmp_path)
+    assert reopened.acked == first
+    assert _read_ids(reopened) == ["b"]
+    reopened.append(_docs("c"))
+    assert _read_ids(reopened) == ["b", "c"]
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    """Test a partially written record is cut off when the spool is reopened."""
+    spool = Spool(tmp_path)
+    end = spool.append(_docs("a"))
+    spool.close()
+    segment = next(tmp_path.glob("*.seg"))
+    with open(segment, "ab") as f:
+        f.write(b"\x40\x00\x00\x00\x00\x00\x00\x00{\"id\"")
+
+    reopened = Spool(tmp_path)
+    assert segment.stat().st_size == end.offset
+    assert reopened.append(_docs("b")) > end
+    assert _read_ids(reopened) == ["a", "b"]
+
+
+def test_ack_is_monotonic(tmp_path):
+    """Test acknowledging an older position does not move the cursor back."""
+    spool = Spool(tmp_path)
+    first = spool.append(_docs("a"))
+    second = spool.append(_docs("b"))
+    spool.ack(second)
+    spool.ack(first)
+    assert spool.acked == second
+    assert spool.acked > SpoolPosition(second.segment, 0)
+
+
+@pytest.fixture
+def meili():
+    client = Mock(spec=MeiliClient)
+    client.statuses = {}
+    client.uploads = []
+
+    def add_documents(docs):
+        client.uploads.append([doc["id"] for doc in docs])
+        return len(client.uploads)
+
+    client.add_documents.side_effect = add_documents
+    client.get_task_statuses.side_effect = lambda uids: {
+        uid: {"status": client.statuses.get(uid, "succeeded"), "error": None} for uid in uids
+    }
+    return client
+
+
+def _drainer(spool, meili, **kwargs):
+    ingest = IngestService(meili, Mock(), spool=None)
+    tracker = TaskTracker(meili, poll_interval=0)
+    return SpoolDrainer(spool, ingest, tracker, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_drainer_indexes_and_acknowledges(tmp_path, meili):
+    """Test drained records are coalesced into requests and acknowledged."""
+    spool = Spool(tmp_path)
+    for i in range(5):
+        end = spool.append(_docs(i))
+    drainer = _drainer(spool, meili, max_docs=2)
+
+    assert await drainer.drain_once() == 5
+    assert meili.uploads == [[0, 1], [2, 3], [4]]
+    assert spool.acked == end
+    assert await drainer.drain_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_drainer_keeps_records_when_backend_is_down(tmp_path, meili):
+    """Test nothing is acknowledged until Meilisearch accepts the documents."""
+    spool = Spool(tmp_path)
+    spool.append(_docs("a"))
+    end = spool.append(_docs("b"))
+    drainer = _drainer(spool, meili)
+
+    meili.add_documents.side_effect = ConnectionError("meilisearch down")
+    with pytest.raises(ConnectionError):
+        await drainer.drain_once()
+    assert spool.acked < end
+
+    meili.add_documents.side_effect = lambda docs: meili.uploads.append(docs) or 1
+    assert await drainer.drain_once() == 2
+    assert spool.acked == end
+
+
+@pytest.mark.asyncio
+async def test_drainer_waits_for_tasks_before_ack(tmp_path, meili):
+    """Test a failed task leaves its records in the spool."""
+    spool = Spool(tmp_path)
+    spool.append(_docs("a"))
+    meili.statuses[1] = "canceled"
+    drainer = _drainer(spool, meili)
+
+    with pytest.raises(TaskFailedError):
+        await drainer.drain_once()
+    assert spool.acked == SpoolPosition(1, 0)
+    assert _read_ids(spool) == ["a"]
+
@@ -1,8 +1,13 @@
 """Tests for StateStore."""
 
 import json
+import sqlite3
+import threading
 from pathlib import Path
-from telegram_search.indexer.state_store import StateStore
+
+import pytest
+
+from telegram_search.indexer.state_store import SqliteStateStore, StateStore
 
 
 def test_state_store_init(tmp_path: Path) -> None:
@@ -22,7 +27,7 @@ def test_state_store_set_get(tmp_path: Path) -> None:
     # Should persist
     with open(f, "r", encoding="utf-8") as fp:
         data = json.load(fp)
-    assert data["ch1"]["last_msg_id"] == 100
+    assert data["ch1"] == {"ranges": [[1, 100]]}
 
 
 def test_state_store_load(tmp_path: Path) -> None:
@@ -43,3 +48,139 @@ def test_state_store_incremental_only(tmp_path: Path) -> None:
     store.set_state("ch1", 100)
     store.set_state("ch1", 50)  # Should be ignored
     assert store.get_state("ch1") == 100
+
+
+def test_state_store_ranges(tmp_path: Path) -> None:
+    """Test synced ranges are merged and persisted."""
+    f = tmp_path / "state.json"
+    store = StateStore(f, flush_interval=0)
+    store.add_range("ch1", 51, 100)
+    store.add_range("ch1", 1, 20)
+    store.add_range("ch1", 21, 30)
+    assert store.get_ranges("ch1").to_list() == [[1, 30], [51, 100]]
+
+    with open(f, "r", encoding="utf-8") as fp:
+        data = json.load(fp)
+    assert data["ch1"]["ranges"] == [[1, 30], [51, 100]]
+    assert StateStore(f).get_ranges("ch1").to_list() == [[1, 30], [51, 100]]
+
+
+def test_state_store_state_follows_ranges(tmp_path: Path) -> None:
+    """Test the last synced id is the newest range's end and extends it."""
+    store = StateStore(tmp_path / "state.json", flush_interval=0)
+    store.add_range("ch1", 1, 20)
+    store.add_range("ch1", 51, 100)
+    assert store.get_state("ch1") == 100
+
+    store.set_state("ch1", 150)
+    assert store.get_ranges("ch1").to_list() == [[1, 20], [51, 150]]
+
+
+def test_state_store_ranges_from_legacy_state(tmp_path: Path) -> None:
+    """Test a legacy last_msg_id counts as synced from the first message."""
+    f = tmp_path / "state.json"
+    with open(f, "w", encoding="utf-8") as fp:
+        json.dump({"ch1": {"last_msg_id": 50}}, fp)
+
+    store = StateStore(f, flush_interval=0)
+    assert store.get_ranges("ch1").to_list() == [[1, 50]]
+    store.add_range("ch1", 51, 60)
+    assert store.get_ranges("ch1").to_list() == [[1, 60]]
+    assert store.get_ranges("ch2").to_list() == []
+
+
+def test_sqlite_state_store_persists(tmp_path: Path) -> None:
+    """Test state written to SQLite survives reopening."""
+    f = tmp_path / "state.db"
+    store = SqliteStateStore(f, flush_interval=0)
+    store.set_state("ch1", 100)
+    store.add_range("ch2", 1, 20)
+    store.set_rate("session", "messages.getHistory", 3.5)
+    store.close()
+
+    store = SqliteStateStore(f)
+    assert store.get_state("ch1") == 100
+    assert store.get_ranges("ch2").to_list() == [[1, 20]]
+    assert store.get_rate("session", "messages.getHistory") == 3.5
+    assert store.get_state("ch3") == 0
+    store.close()
+
+
+def test_sqlite_state_store_writes_changed_rows(tmp_path: Path) -> None:
+    """Test a save rewrites only the keys changed since the last one."""
+    f = tmp_path / "state.db"
+    store = SqliteStateStore(f, flush_interval=60)
+    for i in range(100):
+        store.set_state(f"ch{i}", i + 1)
+    store.flush()
+
+    conn = sqlite3.connect(f)
+    conn.execute("UPDATE state SET value = '{}' WHERE key = 'ch1'")
+    conn.commit()
+    store.set_state("ch2", 500)
+    store.flush()
+
+    rows = dict(conn.execute("SELECT key, value FROM state"))
+    conn.close()
+    store.close()
+    assert len(rows) == 100
+    assert json.loads(rows["ch2"]) == {"ranges": [[1, 500]]}
+    # Untouched by the second save
+    assert rows["ch1"] == "{}"
+
+
+def test_sqlite_state_store_writes_off_caller_thread(tmp_path: Path) -> None:
+    """Test changes are committed by the writer thread, not the caller."""
+    store = SqliteStateStore(tmp_path / "state.db", flush_interval=0)
+    threads = set()
+    store._conn.set_trace_callback(lambda _: threads.add(threading.current_thread().name))
+    store.set_state("ch1", 100)
+    store.add_range("ch1", 101, 200)
+    store.flush()
+    store.close()
+    assert threads == {"state-store-writer"}
+
+
+def test_sqlite_state_store_closes_after_writer_died(tmp_path: Path) -> None:
+    """Test close releases the database even if the writer thread is gone."""
+    store = SqliteStateStore(tmp_path / "state.db")
+    store._writes.put(None)
+    store._writer.join()
+
+    store.close()
+    store.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        store._conn.execute("SELECT 1")
+
+
+def test_sqlite_state_store_ignores_writes_after_close(tmp_path: Path) -> None:
+    """Test changes made after close neither block flush nor reach the database."""
+    store = SqliteStateStore(tmp_path / "state.db")
+    store.add_range("ch1", 1, 10)
+    store.close()
+
+    store.add_range("ch1", 11, 20)
+    store.flush()
+    store.close()
+
+    store = SqliteStateStore(tmp_path / "state.db")
+    assert store.get_ranges("ch1").to_list() == [[1, 10]]
+    store.close()
+
+
+def test_sqlite_state_store_migrates_json(tmp_path: Path) -> None:
+    """Test a legacy JSON state file is imported once and set aside."""
+    legacy = tmp_path / "state.json"
+    with open(legacy, "w", encoding="utf-8") as fp:
+        json.dump({"ch1": {"last_msg_id": 50}, "_rates": {"s": {"m": 1.5}}}, fp)
+
+    store = SqliteStateStore(tmp_path / "state.db", legacy_path=legacy)
+    assert store.get_ranges("ch1").to_list() == [[1, 50]]
+    assert store.get_rate("s", "m") == 1.5
+    store.close()
+    assert not legacy.exists()
+    assert (tmp_path / "state.json.migrated").exists()
+
+    store = SqliteStateStore(tmp_path / "state.db", legacy_path=legacy)
+    assert store.get_state("ch1") == 50
+    store.close()
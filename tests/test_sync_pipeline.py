@@ -0,0 +1,294 @@
+"""Tests for SyncPipeline."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from telegram_search.indexer.channel_registry import Channel
+from telegram_search.indexer.historical_sync import HistoricalSync
+from telegram_search.indexer.ingest_service import IngestService
+from telegram_search.indexer.state_store import StateStore
+from telegram_search.indexer.sync_pipeline import SyncPipeline
+from telegram_search.indexer.task_tracker import TaskTracker
+from telegram_search.pipeline.filters import MessageFilter
+from telegram_search.search.meili_client import MeiliClient
+
+
+class FakeCrawler:
+    """TelethonCrawler stand-in serving canned channel histories."""
+
+    def __init__(self, messages, events=None, delay=0.0):
+        self.messages = messages
+        self.events = events if events is not None else []
+        self.delay = delay
+
+    async def get_latest_message_id(self, channel_id):
+        return max((m["msg_id"] for m in self.messages[channel_id]), default=0)
+
+    async def fetch_messages(self, channel_id, limit=100, min_id=0, reverse=False, offset_id=0):
+        history = sorted(self.messages[channel_id], key=lambda m: m["msg_id"], reverse=True)
+        selected = [
+            m for m in history
+            if m["msg_id"] > min_id and (not offset_id or m["msg_id"] < offset_id)
+        ]
+        for msg in selected[:limit]:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self.events.append(("fetch", msg["msg_id"]))
+            yield msg
+
+
+def _messages(chat_id, count, start=1):
+    return [
+        {
+            "chat_id": chat_id,
+            "msg_id": i,
+            "text": f"频道 {chat_id} 的第 {i} 条消息，内容 {i * 7919} 各不相同",
+            "date": datetime(2024, 1, 1),
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def _channel(channel_id):
+    return Channel(channel_id=channel_id, username=f"ch{channel_id}", title=f"Channel {channel_id}")
+
+
+@pytest.fixture
+def meili():
+    client = Mock(spec=MeiliClient)
+    client.uploads = []
+
+    def add_documents(docs):
+        client.uploads.append([doc["msg_id"] for doc in docs])
+        return len(client.uploads)
+
+    client.add_documents.side_effect = add_documents
+    client.get_task_statuses.side_effect = lambda uids: {
+        uid: {"status": "succeeded", "error": None} for uid in uids
+    }
+    return client
+
+
+@pytest.fixture
+def state(tmp_path):
+    return StateStore(tmp_path / "state.json")
+
+
+def _pipeline(crawler, meili, state_store, **kwargs):
+    ingest = IngestService(meili, MessageFilter(), dedup_window_size=1000)
+    tracker = TaskTracker(meili, max_in_flight=2, poll_interval=0)
+    sync = HistoricalSync(crawler, state_store)
+    return SyncPipeline(sync, ingest, tracker, state_store, **kwargs)
+
+
+def _ids(start, stop):
+    """Message ids from ``start`` down to ``stop``."""
+    return list(range(start, stop - 1, -1))
+
+
+@pytest.mark.asyncio
+async def test_pipeline_indexes_and_checkpoints(state, meili):
+    """Test every channel is indexed newest first and its ranges recorded."""
+    crawler = FakeCrawler({1: _messages(1, 25), 2: _messages(2, 7, start=100)})
+    pipeline = _pipeline(crawler, meili, state, batch_size=10, transform_concurrency=2)
+
+    await pipeline.run([_channel(1), _channel(2)], limit=100)
+
+    assert meili.uploads == [_ids(25, 16), _ids(15, 6), _ids(5, 1), _ids(106, 100)]
+    assert state.get_ranges(1).to_list() == [[1, 25]]
+    # Ids below the oldest message do not exist and count as synced
+    assert state.get_ranges(2).to_list() == [[1, 106]]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_fills_head_and_gaps_without_refetching(state, meili):
+    """Test only ids outside the synced ranges are fetched, newest range first."""
+    crawler = FakeCrawler({1: _messages(1, 60)})
+    state.add_range(1, 21, 40)
+
+    pipeline = _pipeline(crawler, meili, state, batch_size=100)
+    await pipeline.run([_channel(1)])
+
+    fetched = [msg_id for _, msg_id in crawler.events]
+    assert fetched == _ids(60, 41) + _ids(20, 1)
+    assert state.get_ranges(1).to_list() == [[1, 60]]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_resumes_interrupted_range(state, meili):
+    """Test a run cut short by the limit continues below the last covered message."""
+    crawler = FakeCrawler({1: _messages(1, 30)})
+
+    await _pipeline(crawler, meili, state, batch_size=10).run([_channel(1)], limit=12)
+    assert state.get_ranges(1).to_list() == [[19, 30]]
+
+    crawler.messages[1] += _messages(1, 3, start=31)
+    crawler.events.clear()
+    await _pipeline(crawler, meili, state, batch_size=10).run([_channel(1)], limit=100)
+
+    fetched = [msg_id for _, msg_id in crawler.events]
+    assert fetched == _ids(33, 31) + _ids(18, 1)
+    assert state.get_ranges(1).to_list() == [[1, 33]]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_backfills_gaps_concurrently(state, meili):
+    """Test an old gap is backfilled while the head is still being fetched."""
+    crawler = FakeCrawler({1: _messages(1, 40)}, delay=0.001)
+    state.add_range(1, 11, 30)
+    pipeline = _pipeline(crawler, meili, state, batch_size=5, fetch_concurrency=2)
+
+    await pipeline.run([_channel(1)])
+
+    fetched = [msg_id for _, msg_id in crawler.events]
+    assert fetched.index(10) < fetched.index(31)
+    assert state.get_ranges(1).to_list() == [[1, 40]]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_shares_limit_between_concurrent_gaps(state, meili):
+    """Test gaps fetched side by side stay within the channel's limit together."""
+    crawler = FakeCrawler({1: _messages(1, 40)}, delay=0.001)
+    state.add_range(1, 21, 30)
+    pipeline = _pipeline(crawler, meili, state, batch_size=5, fetch_concurrency=2)
+
+    await pipeline.run([_channel(1)], limit=12)
+
+    indexed = sorted(msg_id for upload in meili.uploads for msg_id in upload)
+    assert len(indexed) == 12
+    covered = {i for low, high in state.get_ranges(1).to_list() for i in range(low, high + 1)}
+    assert covered == set(range(21, 31)) | set(indexed)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_dedupes_across_in_flight_batches(state, meili):
+    """Test a repost in a later batch is dropped although the first is not indexed yet."""
+    msgs = _messages(1, 4)
+    msgs[0]["text"] = msgs[3]["text"]
+    pipeline = _pipeline(
+        FakeCrawler({1: msgs}), meili, state, batch_size=2, transform_concurrency=2
+    )
+
+    await pipeline.run([_channel(1)])
+
+    assert meili.uploads == [[4, 3], [2]]
+    assert state.get_ranges(1).to_list() == [[1, 4]]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_overlaps_fetch_and_index(state, meili):
+    """Test later batches are fetched while earlier ones are being indexed."""
+    crawler = FakeCrawler({1: _messages(1, 30)}, delay=0.002)
+    events = crawler.events
+
+    def add_documents(docs):
+        events.append(("index", docs[-1]["msg_id"]))
+        return 1
+
+    meili.add_documents.side_effect = add_documents
+    pipeline = _pipeline(crawler, meili, state, batch_size=10)
+
+    await pipeline.run([_channel(1)])
+
+    first_index = events.index(("index", 21))
+    assert events.index(("fetch", 1)) > first_index
+    assert events[-1] == ("index", 1)
+
+
+@pytest.mark.asyncio
+async def test_pipeline_stops_failed_channel_only(state, meili):
+    """Test an indexing failure stops its channel without checkpointing past it."""
+    def add_documents(docs):
+        if docs[0]["chat_id"] == 1 and docs[0]["msg_id"] < 30:
+            raise ConnectionError("meilisearch down")
+        meili.uploads.append([doc["msg_id"] for doc in docs])
+        return len(meili.uploads)
+
+    meili.add_documents.side_effect = add_documents
+    crawler = FakeCrawler({1: _messages(1, 30), 2: _messages(2, 5, start=50)})
+    pipeline = _pipeline(crawler, meili, state, batch_size=10)
+
+    await pipeline.run([_channel(1), _channel(2)])
+
+    assert state.get_ranges(1).to_list() == [[21, 30]]
+    assert state.get_ranges(2).to_list() == [[1, 54]]
+    assert _ids(54, 50) in meili.uploads
+
+
+@pytest.mark.asyncio
+async def test_pipeline_failed_task_stops_its_channel_only(state, meili):
+    """Test a task failing in Meilisearch fails its own channel, not the one tracked next."""
+    failing = set()
+
+    def add_documents(docs):
+        meili.uploads.append([doc["msg_id"] for doc in docs])
+        if docs[0]["chat_id"] == 1 and docs[0]["msg_id"] < 30:
+            failing.add(len(meili.uploads))
+        return len(meili.uploads)
+
+    def get_task_statuses(uids):
+        return {uid: {"status": "failed" if uid in failing else "succeeded"} for uid in uids}
+
+    meili.add_documents.side_effect = add_documents
+    meili.get_task_statuses.side_effect = get_task_statuses
+    crawler = FakeCrawler({1: _messages(1, 30), 2: _messages(2, 25, start=50)})
+    pipeline = _pipeline(crawler, meili, state, batch_size=10, fetch_concurrency=2)
+
+    await pipeline.run([_channel(1), _channel(2)])
+
+    assert state.get_ranges(1).to_list() == [[21, 30]]
+    assert state.get_ranges(2).to_list() == [[1, 74]]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_transform_error_stops_its_channel_only(state, meili):
+    """Test a batch whose transform raised fails its channel while others finish."""
+    crawler = FakeCrawler({1: _messages(1, 30), 2: _messages(2, 5, start=50)})
+    pipeline = _pipeline(crawler, meili, state, batch_size=10)
+    prepare_batch = pipeline._ingest.prepare_batch
+
+    def failing_prepare(msgs):
+        if msgs[0]["chat_id"] == 1 and msgs[0]["msg_id"] < 30:
+            raise ValueError("bad message")
+        return prepare_batch(msgs)
+
+    pipeline._ingest.prepare_batch = failing_prepare
+    await pipeline.run([_channel(1), _channel(2)])
+
+    assert state.get_ranges(1).to_list() == [[21, 30]]
+    assert state.get_ranges(2).to_list() == [[1, 54]]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_should_stop(state, meili):
+    """Test fetching stops when asked while already fetched messages still finish."""
+    crawler = FakeCrawler({1: _messages(1, 30), 2: _messages(2, 5)})
+    pipeline = _pipeline(
+        crawler, meili, state, batch_size=10, should_stop=lambda: len(crawler.events) >= 15
+    )
+
+    await pipeline.run([_channel(1), _channel(2)])
+
+    assert meili.uploads == [_ids(30, 21), _ids(20, 17)]
+    assert state.get_ranges(1).to_list() == [[17, 30]]
+    assert state.get_ranges(2).to_list() == []
+
+
+@pytest.mark.asyncio
+async def test_pipeline_fetches_channels_concurrently(state, meili):
+    """Test channels are fetched side by side and each keeps its own ranges."""
+    crawler = FakeCrawler(
+        {1: _messages(1, 6), 2: _messages(2, 6, start=100), 3: _messages(3, 6, start=200)},
+        delay=0.001,
+    )
+    pipeline = _pipeline(crawler, meili, state, batch_size=4, fetch_concurrency=3)
+
+    await pipeline.run([_channel(1), _channel(2), _channel(3)])
+
+    fetched = [msg_id for _, msg_id in crawler.events]
+    assert fetched.index(105) < fetched.index(1)
+    assert fetched.index(205) < fetched.index(1)
+    assert [state.get_ranges(c).to_list() for c in (1, 2, 3)] == [[[1, 6]], [[1, 105]], [[1, 205]]]
@@ -0,0 +1,150 @@
+"""Tests for TaskTracker."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from telegram_search.indexer.task_tracker import IndexTask, TaskFailedError, TaskTracker
+from telegram_search.search.meili_client import MeiliClient
+
+
+@pytest.fixture
+def meili():
+    client = Mock(spec=MeiliClient)
+    client.statuses = {}
+    client.get_task_statuses.side_effect = lambda uids: {
+        uid: {"status": client.statuses.get(uid, "enqueued"), "error": None} for uid in uids
+    }
+    return client
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_wait_for_success(meili):
+    """Test callbacks only run once their task has succeeded."""
+    tracker = TaskTracker(meili, max_in_flight=4, poll_interval=0)
+    done = []
+    await tracker.track([IndexTask(1)], lambda: done.append(1))
+    await tracker.track([IndexTask(2)], lambda: done.append(2))
+    assert done == []
+    assert len(tracker) == 2
+
+    meili.statuses.update({1: "succeeded", 2: "succeeded"})
+    await tracker.drain()
+    assert done == [1, 2]
+    assert len(tracker) == 0
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_commit_in_order(meili):
+    """Test a finished task waits for the unfinished ones submitted before it."""
+    tracker = TaskTracker(meili, max_in_flight=1, poll_interval=0)
+    done = []
+    await tracker.track([IndexTask(1)], lambda: done.append(1))
+
+    meili.statuses[2] = "succeeded"
+    polls = 0
+
+    def statuses(uids):
+        nonlocal polls
+        polls += 1
+        if polls == 2:
+            meili.statuses[1] = "succeeded"
+        return {uid: {"status": meili.statuses.get(uid, "processing")} for uid in uids}
+
+    meili.get_task_statuses.side_effect = statuses
+    await tracker.track([IndexTask(2)], lambda: done.append(2))
+    assert done == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_in_flight_is_bounded(meili):
+    """Test track waits while max_in_flight tasks are pending."""
+    tracker = TaskTracker(meili, max_in_flight=2, poll_interval=0)
+    meili.get_task_statuses.side_effect = lambda uids: {
+        uid: {"status": "succeeded"} for uid in uids
+    }
+    for uid in range(5):
+        await tracker.track([IndexTask(uid)])
+        assert len(tracker) <= 2
+    # Statuses are fetched in bulk, not per task
+    assert all(len(c.args[0]) == 3 for c in meili.get_task_statuses.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_batch_without_task(meili):
+    """Test a batch with nothing to index still commits in order."""
+    tracker = TaskTracker(meili, poll_interval=0)
+    done = []
+    await tracker.track([], lambda: done.append(0))
+    assert done == [0]
+
+    await tracker.track([IndexTask(1)], lambda: done.append(1))
+    await tracker.track([], lambda: done.append(2))
+    assert done == [0]
+    meili.statuses[1] = "succeeded"
+    await tracker.drain()
+    assert done == [0, 1, 2]
+    assert all(c.args[0] == [1] for c in meili.get_task_statuses.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_failed_task_drops_later_checkpoints(meili):
+    """Test a failed task raises and no later checkpoint is committed."""
+    tracker = TaskTracker(meili, poll_interval=0)
+    done = []
+    await tracker.track([IndexTask(1)], lambda: done.append(1))
+    await tracker.track([IndexTask(2)], lambda: done.append(2))
+    await tracker.track([IndexTask(3)], lambda: done.append(3))
+    meili.statuses.update({1: "succeeded", 2: "failed", 3: "succeeded"})
+
+    with pytest.raises(TaskFailedError) as exc:
+        await tracker.drain()
+    assert exc.value.task_uid == 2
+    assert done == [1]
+    assert len(tracker) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_task_drops_its_key_only(meili):
+    """Test a failure only drops the pending batches tracked under its key."""
+    tracker = TaskTracker(meili, poll_interval=0)
+    done = []
+    await tracker.track([IndexTask(1)], lambda: done.append(1), key="a")
+    await tracker.track([IndexTask(2)], lambda: done.append(2), key="b")
+    await tracker.track([IndexTask(3)], lambda: done.append(3), key="a")
+    await tracker.track([IndexTask(4)], lambda: done.append(4), key="b")
+    meili.statuses.update({1: "failed", 2: "succeeded", 3: "succeeded", 4: "succeeded"})
+
+    with pytest.raises(TaskFailedError) as exc:
+        await tracker.drain()
+    assert exc.value.key == "a"
+
+    await tracker.drain()
+    assert done == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_failed_task_is_resubmitted(meili):
+    """Test a resubmit callback replaces a failed task before checkpointing."""
+    error = {"type": "invalid_request"}
+    resubmit = Mock(return_value=[IndexTask(4), IndexTask(5)])
+    tracker = TaskTracker(meili, poll_interval=0, resubmit=resubmit)
+    done = []
+    await tracker.track([IndexTask(1), IndexTask(2)], lambda: done.append(1))
+    meili.statuses.update({1: "succeeded", 2: "failed", 4: "succeeded", 5: "succeeded"})
+    meili.get_task_statuses.side_effect = lambda uids: {
+        uid: {"status": meili.statuses.get(uid, "enqueued"), "error": error} for uid in uids
+    }
+
+    await tracker.drain()
+    assert done == [1]
+    failed_task, reported = resubmit.call_args.args
+    assert failed_task.uid == 2
+    assert reported == error
+
+    resubmit.side_effect = TaskFailedError(6, "failed", error)
+    await tracker.track([IndexTask(6)], lambda: done.append(6))
+    meili.statuses[6] = "failed"
+    with pytest.raises(TaskFailedError):
+        await tracker.drain()
+    assert done == [1]